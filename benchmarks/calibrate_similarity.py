@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+類似度バックエンドの較正レポート
+投稿履歴の投稿ペアについて、従来の計算（exact）と各バックエンドの総合類似度を比べ、
+重複判定の閾値（0.65 / 0.50）で exact が重複とするペアに対する再現率・適合率と、
+1件 × 履歴全件の計算時間を表示する
+
+    python benchmarks/calibrate_similarity.py --db data/vet_assistant2_posts.db [--random-pairs 2000] [--json report.json]
+
+比較するペアは、LSHバケットを共有する同じ動物種の投稿ペア（実際に重複チェックで比較されるもの）と、
+同じ動物種からランダムに選んだペア
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from itertools import combinations
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "src"))
+
+from advanced_duplicate_monitor import FEATURE_COLUMNS, AdvancedDuplicateMonitor
+from history_partitions import ALL_POSTS
+from post_history_store import fetch_rows
+from similarity_backends import SHINGLE_METRICS, get_backend, np
+
+# 較正する閾値（既定の判定閾値とGUIでよく使う閾値）
+THRESHOLDS = [0.65, 0.50]
+
+# 比較するバックエンド（名前, 計算式）
+CANDIDATE_BACKENDS = [('shingle', metric) for metric in SHINGLE_METRICS] + [('numpy', metric) for metric in SHINGLE_METRICS]
+
+
+def load_features(monitor: AdvancedDuplicateMonitor) -> list:
+    """履歴全件の (動物種, 特徴量)"""
+    cursor = monitor.store.cursor()
+    rows = fetch_rows(cursor, f'SELECT {FEATURE_COLUMNS} FROM {ALL_POSTS} ORDER BY id')
+    return [(post['animal_type'], monitor._post_features(post)) for post in rows]
+
+
+def sample_pairs(monitor: AdvancedDuplicateMonitor, posts: list, random_pairs: int, seed: int) -> list:
+    """LSHバケットを共有するペアとランダムなペア（いずれも同じ動物種）"""
+    buckets = {}
+    for index, (animal_type, features) in enumerate(posts):
+        for key in monitor.lsh_index.band_keys(features['normalized'], features['keywords']):
+            buckets.setdefault((animal_type,) + key, []).append(index)
+
+    pairs = set()
+    for members in buckets.values():
+        pairs.update(combinations(members, 2))
+
+    by_animal = {}
+    for index, (animal_type, _) in enumerate(posts):
+        by_animal.setdefault(animal_type, []).append(index)
+    groups = [members for members in by_animal.values() if len(members) > 1]
+    rng = random.Random(seed)
+    for _ in range(random_pairs if groups else 0):
+        pairs.add(tuple(sorted(rng.sample(rng.choice(groups), 2))))
+    return sorted(pairs)
+
+
+def pair_scores(monitor: AdvancedDuplicateMonitor, posts: list, pairs: list) -> list:
+    """ペアごとの総合類似度（候補側を1件ずつ、相手側をまとめて計算）"""
+    others = [features for _, features in posts]
+    prepared = monitor.similarity_backend.prepare([features['normalized'] for features in others])
+    by_left = {}
+    for left, right in pairs:
+        by_left.setdefault(left, []).append(right)
+
+    scores = {}
+    for left, rights in by_left.items():
+        for right, score in zip(rights, monitor.calculate_feature_similarities(others[left], others, prepared, rights)):
+            scores[(left, right)] = score
+    return [scores[pair] for pair in pairs]
+
+
+def time_one_to_all(monitor: AdvancedDuplicateMonitor, posts: list, repeats: int) -> float:
+    """候補1件を履歴全件と比較する時間の中央値（本文の類似度のみ、ミリ秒）"""
+    texts = [features['normalized'] for _, features in posts]
+    prepared = monitor.similarity_backend.prepare(texts)
+    timings = []
+    for text in texts[:repeats]:
+        started = time.perf_counter()
+        monitor.similarity_backend.similarities(text, prepared)
+        timings.append(time.perf_counter() - started)
+    return sorted(timings)[len(timings) // 2] * 1000
+
+
+def agreement(reference: list, scores: list, threshold: float, step: float = None) -> dict:
+    """
+    exact を threshold で重複としたペア（正例）に対する、近似側を step で判定したときの再現率・適合率
+    （見逃し＝exactで重複・近似で非重複、過検出＝その逆。step を省略すると threshold と同じ）
+    """
+    step = threshold if step is None else step
+    duplicates = sum(1 for ref in reference if ref >= threshold)
+    detected = sum(1 for score in scores if score >= step)
+    missed = sum(1 for ref, score in zip(reference, scores) if ref >= threshold and score < step)
+    extra = sum(1 for ref, score in zip(reference, scores) if score >= step and ref < threshold)
+    return {
+        'duplicates': duplicates,
+        'missed': missed,
+        'extra': extra,
+        'recall': (duplicates - missed) / duplicates if duplicates else 1.0,
+        'precision': (detected - extra) / detected if detected else 1.0,
+        'agreement': 1 - (missed + extra) / len(reference) if reference else 1.0
+    }
+
+
+def suggest_threshold(reference: list, scores: list, threshold: float) -> float:
+    """
+    exact で重複のペアを最も多く検出できる近似側の閾値（0.01刻み、threshold ± 0.20）
+    再現率が同じなら適合率の高い方（過検出の少ない高い閾値）、それも同じなら threshold に近い方
+    """
+    def rates(step: float) -> tuple:
+        decision = agreement(reference, scores, threshold, step)
+        return decision['recall'], decision['precision'], -abs(step - threshold)
+
+    steps = [round(threshold + offset / 100, 2) for offset in range(-20, 21)]
+    return max(steps, key=rates)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VET-Assistant2 類似度バックエンド較正レポート")
+    parser.add_argument("--db", default=os.path.join(ROOT_DIR, "data", "vet_assistant2_posts.db"), help="投稿履歴DBのパス")
+    parser.add_argument("--random-pairs", type=int, default=2000, help="ランダムに追加するペア数")
+    parser.add_argument("--repeats", type=int, default=50, help="1件 × 全件の計測回数")
+    parser.add_argument("--seed", type=int, default=0, help="ランダムペアの乱数シード")
+    parser.add_argument("--json", help="レポートをJSONで保存するパス")
+    args = parser.parse_args()
+
+    monitor = AdvancedDuplicateMonitor(args.db, load_archive=False)
+    posts = load_features(monitor)
+    pairs = sample_pairs(monitor, posts, args.random_pairs, args.seed)
+    print(f"📊 履歴 {len(posts)}件 / 比較ペア {len(pairs)}件（NumPy: {'あり' if np is not None else 'なし（純Python計算）'}）")
+
+    reference = pair_scores(monitor, posts, pairs)
+    report = {
+        'posts': len(posts),
+        'pairs': len(pairs),
+        'numpy': np is not None,
+        'backends': [{
+            'backend': 'exact', 'metric': None,
+            'one_to_all_ms': time_one_to_all(monitor, posts, args.repeats),
+            'mean_abs_error': 0.0,
+            'thresholds': {str(threshold): dict(agreement(reference, reference, threshold), suggested=threshold)
+                           for threshold in THRESHOLDS}
+        }]
+    }
+
+    for name, metric in CANDIDATE_BACKENDS:
+        monitor.similarity_backend = get_backend(name, metric)
+        scores = pair_scores(monitor, posts, pairs)
+        report['backends'].append({
+            'backend': name, 'metric': metric,
+            'one_to_all_ms': time_one_to_all(monitor, posts, args.repeats),
+            'mean_abs_error': sum(abs(ref - score) for ref, score in zip(reference, scores)) / len(pairs) if pairs else 0.0,
+            'thresholds': {str(threshold): dict(agreement(reference, scores, threshold),
+                                                suggested=suggest_threshold(reference, scores, threshold))
+                           for threshold in THRESHOLDS}
+        })
+
+    print("閾値ごとに exact で重複のペアに対する 再現率/適合率 (見逃し/過検出) と、再現率が最も高くなる近似側の閾値を表示")
+    print("  " + " / ".join(f"@{threshold}: exactで重複 {report['backends'][0]['thresholds'][str(threshold)]['duplicates']}ペア"
+                            for threshold in THRESHOLDS))
+    header = f"{'backend':>8} {'metric':>8} {'1件×全件':>10} {'平均誤差':>8}"
+    for threshold in THRESHOLDS:
+        header += f"  {'@' + str(threshold):>38}"
+    print(header)
+    for result in report['backends']:
+        line = f"{result['backend']:>8} {result['metric'] or '-':>8} {result['one_to_all_ms']:8.2f}ms {result['mean_abs_error']:8.4f}"
+        for threshold in THRESHOLDS:
+            decision = result['thresholds'][str(threshold)]
+            line += (f"  {decision['recall'] * 100:6.2f}%/{decision['precision'] * 100:6.2f}%"
+                     f" ({decision['missed']:>4}/{decision['extra']:>4}) 推奨 {decision['suggested']:.2f}")
+        print(line)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 レポートを保存しました: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
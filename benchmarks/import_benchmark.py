@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+アップロード関連モジュールの読み込み時間ベンチマーク
+新しいプロセスでモジュールを1つずつ読み込み、読み込み時間と読み込まれたモジュール数を比較する
+
+    python benchmarks/import_benchmark.py [--runs 5]
+
+pandas の行は以前のアップロード処理が起動時に払っていた読み込みコストの参考値。
+アップロード処理のモジュールが pandas を読み込んだ場合は終了コード1
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(ROOT_DIR, "src")
+
+# 計測するモジュール（pandas は比較用）
+MODULES = ["pandas", "sheets_upload_pipeline", "google_sheets_uploader"]
+
+# pandas を読み込んではいけないモジュール
+PANDAS_FREE_MODULES = ["sheets_upload_pipeline", "google_sheets_uploader"]
+
+# 子プロセスで実行する計測コード（結果はJSONで標準出力に出す）
+CHILD_SCRIPT = r'''
+import json, sys, time
+sys.path.insert(0, sys.argv[1])
+baseline_modules = len(sys.modules)
+started = time.perf_counter()
+try:
+    __import__(sys.argv[2])
+except ImportError as e:
+    print(json.dumps({'error': str(e)}))
+else:
+    print(json.dumps({
+        'seconds': time.perf_counter() - started,
+        'modules': len(sys.modules) - baseline_modules,
+        'pandas_loaded': 'pandas' in sys.modules
+    }))
+'''
+
+
+def run_once(module: str) -> dict:
+    """新しいプロセスでモジュールを1回読み込んで計測"""
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT, SRC_DIR, module],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VET-Assistant2 モジュール読み込み時間ベンチマーク")
+    parser.add_argument("--runs", type=int, default=5, help="計測回数（中央値を表示）")
+    args = parser.parse_args()
+
+    failed = False
+    for module in MODULES:
+        results = [run_once(module) for _ in range(args.runs)]
+        if 'error' in results[0]:
+            print(f"{module:>24}: 計測なし（{results[0]['error']}）")
+            continue
+
+        seconds = sorted(result['seconds'] for result in results)[len(results) // 2]
+        print(f"{module:>24}: {seconds * 1000:8.1f}ms  (+{results[0]['modules']}モジュール)")
+        if module in PANDAS_FREE_MODULES and results[0]['pandas_loaded']:
+            print(f"❌ {module} の読み込みで pandas が読み込まれています")
+            failed = True
+
+    if failed:
+        sys.exit(1)
+    print("✅ アップロード処理は pandas を読み込みません")
+
+
+if __name__ == "__main__":
+    main()
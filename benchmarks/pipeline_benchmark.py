@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+重複監視・投稿生成パイプラインのベンチマーク
+合成投稿履歴（synthetic_history.py、既定は1千・1万・10万件）ごとに各処理の
+レイテンシのパーセンタイル・スループット・ピークメモリ（tracemalloc）を計測し、JSONで出力する
+
+    python benchmarks/pipeline_benchmark.py [--sizes 1000 10000 100000] [--json result.json]
+    python benchmarks/pipeline_benchmark.py --sizes 1000 --compare baseline.json [--max-regression 1.25]
+
+計測項目:
+    build_history        : 合成履歴の書き込み（特徴量抽出・LSH登録を含む、1回で全件。メモリは計測しない）
+    normalize_content    : 本文の正規化（1件）
+    extract_keywords     : キーワード抽出（1件）
+    calculate_similarity : 2件の類似度（本文から計算）
+    check_cold           : 起動直後の1件目の重複チェック（履歴キャッシュの読み込みを含む）
+    check_warm           : 2件目以降の重複チェック（1件）
+    check_batch          : 1週間分（14件）の一括重複チェック
+    generate_week_cold   : 1週間分の重複監視付き生成（プールの類似度行列の作成を含む）
+    generate_week        : 2週目以降の1週間分の重複監視付き生成
+
+各項目は指定回数か、1項目あたりの時間予算（--budget 秒）に達するまで繰り返す（10万件は数十分かかる）。
+--compare を指定すると、同じ (件数, 項目) の p50 を比較し、--max-regression を超えて遅くなった
+項目があれば終了コード1
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from post_generation_engine import PostGenerationEngine
+from similarity_backends import BACKENDS, DEFAULT_BACKEND, get_backend, np
+from synthetic_history import SyntheticHistory, build_history
+
+# 既定の履歴件数
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+# 項目ごとの最大計測回数（--repeats で倍率を変えられる）
+CASE_REPEATS = {
+    'build_history': 1,
+    'normalize_content': 2000,
+    'extract_keywords': 2000,
+    'calculate_similarity': 500,
+    'check_cold': 3,
+    'check_warm': 200,
+    'check_batch': 20,
+    'generate_week_cold': 1,
+    'generate_week': 4
+}
+
+# 1項目あたりの計測時間の予算（秒、超えたら最大計測回数に達していなくても打ち切る）
+CASE_BUDGET_SECONDS = 20.0
+
+# ピークメモリの計測回数の上限（tracemalloc は遅いため時間の計測とは別に少数回だけ実行する）
+MEMORY_REPEATS = 3
+
+# 重複チェックの対象期間（か月）
+MONTHS_BACK = 6
+
+# 報告するパーセンタイル
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """最近接順位法のパーセンタイル"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * q // 100))
+    return sorted_values[int(rank) - 1]
+
+
+class Case:
+    """計測項目（setup は毎回の計測前に実行し、計測時間に含めない）"""
+
+    def __init__(self, name: str, op: Callable[[int], None], repeats: int, items_per_op: int = 1,
+                 setup: Optional[Callable[[], None]] = None, memory_repeats: int = MEMORY_REPEATS):
+        self.name = name
+        self.op = op
+        self.repeats = repeats
+        self.items_per_op = items_per_op
+        self.setup = setup or (lambda: None)
+        self.memory_repeats = min(repeats, memory_repeats)
+
+
+def measure(case: Case, budget: float = CASE_BUDGET_SECONDS) -> Dict:
+    """レイテンシ（tracemalloc なし）とピークメモリ（tracemalloc あり）を別々に計測"""
+    timings = []
+    for iteration in range(case.repeats):
+        case.setup()
+        started = time.perf_counter()
+        case.op(iteration)
+        timings.append(time.perf_counter() - started)
+        if sum(timings) >= budget:
+            break
+
+    peak = None
+    memory_repeats = min(case.memory_repeats, len(timings))
+    if memory_repeats:
+        peak = 0
+        tracemalloc.start()
+    try:
+        for iteration in range(memory_repeats):
+            case.setup()
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            case.op(len(timings) + iteration)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    total = sum(timings)
+    timings.sort()
+    result = {
+        'case': case.name,
+        'repeats': len(timings),
+        'items_per_op': case.items_per_op,
+        'mean_ms': total / len(timings) * 1000,
+        'max_ms': timings[-1] * 1000,
+        'throughput_per_sec': case.items_per_op * len(timings) / total if total else None,
+        'peak_memory_kib': peak / 1024 if peak is not None else None
+    }
+    for q in PERCENTILES:
+        result[f'p{q}_ms'] = percentile(timings, q) * 1000
+    return result
+
+
+def run_size(size: int, work_dir: str, seed: int, repeat_scale: float, backend: str,
+             budget: float = CASE_BUDGET_SECONDS) -> List[Dict]:
+    """履歴 size 件のDBで全項目を計測"""
+    def repeats(name: str) -> int:
+        return max(1, int(CASE_REPEATS[name] * repeat_scale))
+
+    db_path = os.path.join(work_dir, f"history_{size}.db")
+    state = {}
+
+    def build(_):
+        state['monitor'] = build_history(db_path, size, seed)
+
+    results = [dict(measure(Case('build_history', build, 1, size, memory_repeats=0)), size=size)]
+    print(format_result(results[-1]), flush=True)
+    monitor = state['monitor']
+    monitor.similarity_backend = get_backend(backend)
+
+    # 計測用の新しい投稿（履歴とは別のシード）
+    generator = SyntheticHistory(seed + 1)
+    samples = generator.posts(max(repeats('normalize_content'), repeats('check_warm')) + MEMORY_REPEATS)
+    texts = [content for _, content in samples]
+
+    def sample(iteration: int):
+        return samples[iteration % len(samples)]
+
+    def check(iteration: int):
+        animal_type, content = sample(iteration)
+        monitor.check_duplicate_comprehensive(content, animal_type, months_back=MONTHS_BACK)
+
+    def check_batch(iteration: int):
+        week = [sample(iteration * 14 + offset) for offset in range(14)]
+        monitor.check_duplicates_batch(
+            [{'content': content, 'animal_type': animal_type} for animal_type, content in week],
+            MONTHS_BACK, record_detections=False
+        )
+
+    engine_state = {}
+
+    def reset_generation():
+        # 類似度行列・履歴キャッシュを捨て、起動直後と同じ状態から生成する
+        with monitor.store.transaction() as cursor:
+            cursor.execute('DELETE FROM pool_similarity')
+            cursor.execute('DELETE FROM pool_similarity_state')
+        monitor.history_cache.invalidate()
+        new_engine()
+
+    def new_engine():
+        engine_state['engine'] = PostGenerationEngine(monitor, log=lambda message: None, rng=random.Random(seed))
+
+    def ensure_engine():
+        if 'engine' not in engine_state:
+            new_engine()
+
+    def generate_week(iteration: int):
+        start_date = datetime.now() + timedelta(days=7 * iteration)
+        engine_state['engine'].generate_posts_with_monitoring(7, start_date, months_back=MONTHS_BACK)
+
+    cases = [
+        Case('normalize_content', lambda i: monitor.normalize_content(texts[i % len(texts)]),
+             repeats('normalize_content')),
+        Case('extract_keywords', lambda i: monitor.extract_keywords(texts[i % len(texts)]),
+             repeats('extract_keywords')),
+        Case('calculate_similarity', lambda i: monitor.calculate_similarity(texts[i % len(texts)],
+                                                                            texts[(i + 1) % len(texts)]),
+             repeats('calculate_similarity')),
+        Case('check_cold', check, repeats('check_cold'), setup=monitor.history_cache.invalidate, memory_repeats=1),
+        Case('check_warm', check, repeats('check_warm')),
+        Case('check_batch', check_batch, repeats('check_batch'), items_per_op=14),
+        Case('generate_week_cold', generate_week, repeats('generate_week_cold'), items_per_op=14,
+             setup=reset_generation),
+        Case('generate_week', generate_week, repeats('generate_week'), items_per_op=14,
+             setup=ensure_engine)
+    ]
+    for case in cases:
+        results.append(dict(measure(case, budget), size=size))
+        print(format_result(results[-1]), flush=True)
+
+    monitor.close()
+    return results
+
+
+def format_result(result: Dict) -> str:
+    throughput = result['throughput_per_sec']
+    memory = result['peak_memory_kib']
+    return (f"{result['size']:>7} {result['case']:>20} {result['p50_ms']:10.3f} {result['p90_ms']:10.3f} "
+            f"{result['p99_ms']:10.3f} {throughput if throughput is not None else 0:12.1f} "
+            f"{f'{memory:.1f}' if memory is not None else '-':>12} {result['repeats']:>6}")
+
+
+def git_revision() -> Optional[str]:
+    """計測したコミット（作業ツリーに変更があれば末尾に -dirty）"""
+    try:
+        revision = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT_DIR, capture_output=True,
+                                  text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT_DIR,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return revision + ('-dirty' if dirty else '')
+
+
+def compare(results: List[Dict], baseline_path: str, max_regression: Optional[float]) -> bool:
+    """基準の結果と p50 を比較して表示し、許容範囲内なら True"""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    previous = {(result['size'], result['case']): result for result in baseline['results']}
+    print(f"📈 基準との比較: {baseline_path} ({baseline['meta'].get('revision') or '不明なコミット'})")
+
+    ok = True
+    for result in results:
+        base = previous.get((result['size'], result['case']))
+        if not base or not base['p50_ms']:
+            continue
+        ratio = result['p50_ms'] / base['p50_ms']
+        regressed = max_regression is not None and ratio > max_regression
+        ok = ok and not regressed
+        print(f"{'❌' if regressed else '  '} {result['size']:>7} {result['case']:>20} "
+              f"{base['p50_ms']:10.3f} → {result['p50_ms']:10.3f}ms (×{ratio:.2f})")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VET-Assistant2 重複監視・投稿生成パイプラインのベンチマーク")
+    parser.add_argument("--sizes", type=int, nargs='+', default=DEFAULT_SIZES, help="合成履歴の件数")
+    parser.add_argument("--seed", type=int, default=0, help="合成履歴・計測用投稿の乱数シード")
+    parser.add_argument("--repeats", type=float, default=1.0, help="最大計測回数の倍率")
+    parser.add_argument("--budget", type=float, default=CASE_BUDGET_SECONDS, help="1項目あたりの計測時間の予算（秒）")
+    parser.add_argument("--similarity-backend", choices=list(BACKENDS), default=DEFAULT_BACKEND,
+                        help="本文の類似度の計算方法")
+    parser.add_argument("--work-dir", help="合成履歴DBを置くフォルダ（省略時は一時フォルダを作成して削除）")
+    parser.add_argument("--json", help="結果をJSONで保存するパス")
+    parser.add_argument("--compare", help="比較する基準の結果JSON")
+    parser.add_argument("--max-regression", type=float,
+                        help="--compare で許容する p50 の倍率（超えた項目があれば終了コード1）")
+    args = parser.parse_args()
+
+    meta = {
+        'revision': git_revision(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np is not None,
+        'similarity_backend': args.similarity_backend,
+        'seed': args.seed,
+        'repeats': args.repeats,
+        'budget_seconds': args.budget,
+        'months_back': MONTHS_BACK
+    }
+    print(f"📊 {meta['revision'] or '不明なコミット'} / Python {meta['python']} / "
+          f"類似度 {args.similarity_backend} / 履歴 {', '.join(map(str, args.sizes))}件")
+    print(f"{'件数':>6} {'項目':>18} {'p50(ms)':>10} {'p90(ms)':>10} {'p99(ms)':>10} {'件/秒':>10} "
+          f"{'メモリ(KiB)':>9} {'回数':>4}")
+
+    results = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        work_dir = args.work_dir or temp_dir
+        os.makedirs(work_dir, exist_ok=True)
+        for size in args.sizes:
+            results.extend(run_size(size, work_dir, args.seed, args.repeats, args.similarity_backend, args.budget))
+
+    try:
+        import resource
+        meta['max_rss_kib'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except ImportError:  # Windows
+        meta['max_rss_kib'] = None
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'meta': meta, 'results': results}, f, ensure_ascii=False, indent=2)
+        print(f"💾 結果を保存しました: {args.json}")
+
+    if args.compare and not compare(results, args.compare, args.max_regression):
+        print(f"❌ p50 が基準の {args.max_regression}倍 を超えた項目があります")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
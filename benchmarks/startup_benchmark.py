@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+GUI起動時間ベンチマーク
+新しいプロセスでコールドスタートを計測し、ウィンドウ表示までの時間が予算内か確認する
+
+    python benchmarks/startup_benchmark.py [--db data/vet_assistant2_posts.db] [--budget 1.0]
+
+計測項目:
+    import        : enhanced_post_generator の読み込み
+    window        : Tk() 作成からウィンドウの初回描画まで（予算判定の対象）
+    services      : バックグラウンド初期化（DB準備・過去投稿取り込み・Sheets連携）の完了まで
+ディスプレイがない環境では window を計測できないため、
+バックグラウンド初期化と同じ処理を直接実行して services のみ計測する
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(ROOT_DIR, "src")
+
+# ウィンドウ表示までの時間予算（秒）
+STARTUP_BUDGET_SECONDS = 1.0
+
+# 子プロセスで実行する計測コード（結果はJSONで標準出力に出す）
+CHILD_SCRIPT = r'''
+import json, sys, time
+sys.path.insert(0, sys.argv[1])
+started = time.perf_counter()
+import enhanced_post_generator
+result = {'import': time.perf_counter() - started}
+
+import tkinter as tk
+try:
+    root = tk.Tk()
+except tk.TclError as e:
+    # ディスプレイなし: バックグラウンド初期化と同じ処理のみ計測
+    result['window'] = None
+    result['window_skipped'] = str(e)
+    services_started = time.perf_counter()
+    monitor = enhanced_post_generator.AdvancedDuplicateMonitor(load_archive=False)
+    monitor.load_existing_tweets()
+    monitor.get_statistics()
+    try:
+        import google_sheets_uploader
+    except ImportError as e:
+        result['sheets_skipped'] = str(e)
+    result['services'] = time.perf_counter() - services_started
+else:
+    window_started = time.perf_counter()
+    app = enhanced_post_generator.EnhancedPostGenerator(root)
+    root.update()
+    result['window'] = time.perf_counter() - window_started
+    while not app.services_ready:
+        root.update()
+        time.sleep(0.01)
+    result['services'] = app.startup_seconds
+    root.destroy()
+
+print(json.dumps(result))
+'''
+
+
+def run_once(db_path: str) -> dict:
+    """一時フォルダにDBをコピーして新しいプロセスで1回計測"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        if db_path:
+            # GUIは作業フォルダの既定DBを開くため、元のDBを変更しないようコピーして使う
+            shutil.copy(db_path, os.path.join(work_dir, "vet_assistant2_posts.db"))
+        output = subprocess.run(
+            [sys.executable, "-c", CHILD_SCRIPT, SRC_DIR],
+            cwd=work_dir, capture_output=True, text=True, check=True
+        ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VET-Assistant2 GUI起動時間ベンチマーク")
+    parser.add_argument("--db", default=os.path.join(ROOT_DIR, "data", "vet_assistant2_posts.db"),
+                        help="計測に使う投稿履歴データベース（コピーして使用）")
+    parser.add_argument("--runs", type=int, default=3, help="計測回数（中央値で判定）")
+    parser.add_argument("--budget", type=float, default=STARTUP_BUDGET_SECONDS,
+                        help="import + ウィンドウ表示までの時間予算（秒）")
+    args = parser.parse_args()
+
+    db_path = args.db if os.path.exists(args.db) else None
+    results = [run_once(db_path) for _ in range(args.runs)]
+
+    def median(key):
+        values = sorted(r[key] for r in results if r.get(key) is not None)
+        return values[len(values) // 2] if values else None
+
+    summary = {key: median(key) for key in ('import', 'window', 'services')}
+    for key, value in summary.items():
+        print(f"{key:>8}: " + (f"{value:.3f}秒" if value is not None else "計測なし"))
+    for note in ('window_skipped', 'sheets_skipped'):
+        if note in results[0]:
+            print(f"⚠️ {note}: {results[0][note]}")
+
+    cold_start = summary['import'] + (summary['window'] or 0.0)
+    if cold_start > args.budget:
+        print(f"❌ 起動時間 {cold_start:.3f}秒 が予算 {args.budget:.3f}秒 を超えています")
+        sys.exit(1)
+    print(f"✅ 起動時間 {cold_start:.3f}秒 (予算 {args.budget:.3f}秒)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ベンチマーク用の合成投稿履歴
+content_library の定型投稿を行単位に分解し、見出し・本文行・獣医学用語を乱数で組み合わせて
+実際の履歴に近い（同じテーマの投稿が適度に似ている）投稿を作り、投稿履歴DBに書き込む。
+同じ件数・シードなら同じ内容のDBになる（作成日時は実行時点から過去24か月に分散）
+
+    python benchmarks/synthetic_history.py --rows 10000 --db /tmp/history_10k.db [--seed 0]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "src"))
+
+from advanced_duplicate_monitor import AdvancedDuplicateMonitor
+from content_library import (
+    CAT_QUESTIONS, CAT_HEALTH, DOG_CASES, DOG_HEALTH, CAT_THEME_POSTS, CAT_DEFAULT_POSTS,
+    DOG_THEME_POSTS, DOG_DEFAULT_POSTS, EMOJI_REPLACEMENTS
+)
+from veterinary_vocabulary import BREED_TERMS, DISEASE_TERMS, MEDICAL_TERMS
+
+HASHTAGS = {'cat': "#猫のあれこれ", 'dog': "#獣医が教える犬のはなし"}
+
+# 履歴の作成日時を分散させる期間（日）
+HISTORY_SPAN_DAYS = 730
+
+# 猫・犬の投稿の割合（サンプルDBとほぼ同じ）
+CAT_RATIO = 0.75
+
+# 1トランザクションで書き込む件数
+INSERT_BATCH_SIZE = 2000
+
+
+def template_posts() -> Dict[str, List[str]]:
+    """動物種ごとの定型投稿（プールの本文は改行がエスケープされているため戻す）"""
+    posts = {'cat': [], 'dog': []}
+    for animal_type, qa_pool, health_pool, theme_posts, default_posts in (
+        ('cat', CAT_QUESTIONS, CAT_HEALTH, CAT_THEME_POSTS, CAT_DEFAULT_POSTS),
+        ('dog', DOG_CASES, DOG_HEALTH, DOG_THEME_POSTS, DOG_DEFAULT_POSTS)
+    ):
+        texts = [qa[field] for qa in qa_pool for field in ('question', 'answer')] + list(health_pool)
+        texts += [post for theme in theme_posts.values() for post in theme] + list(default_posts)
+        posts[animal_type] = [text.replace('\\n', '\n') for text in texts]
+    return posts
+
+
+def split_templates(posts: List[str]) -> Tuple[List[str], List[str]]:
+    """定型投稿を見出し行と本文行に分解（ハッシュタグ行は除く）"""
+    headings, lines = [], []
+    for post in posts:
+        post_lines = [line for line in post.split('\n') if line and not line.startswith('#')]
+        if post_lines:
+            headings.append(post_lines[0])
+            lines.extend(post_lines[1:])
+    return headings, lines
+
+
+class SyntheticHistory:
+    def __init__(self, seed: int = 0):
+        self.random = random.Random(seed)
+        self.parts = {animal_type: split_templates(posts) for animal_type, posts in template_posts().items()}
+        self.terms = DISEASE_TERMS + MEDICAL_TERMS
+        self.emojis = [emoji for emojis in EMOJI_REPLACEMENTS.values() for emoji in emojis] + list(EMOJI_REPLACEMENTS)
+
+    def post(self, animal_type: str) -> str:
+        """見出し1行・本文2〜4行に用語と絵文字を差し込んだ投稿"""
+        rng = self.random
+        headings, lines = self.parts[animal_type]
+        heading = rng.choice(headings)
+        body = rng.sample(lines, rng.randint(2, min(4, len(lines))))
+        term, breed = rng.choice(self.terms), rng.choice(BREED_TERMS)
+        body.insert(rng.randint(0, len(body)), f"{breed}の{term}について{rng.choice(self.emojis)}")
+        return '\n'.join([heading, ''] + body + [HASHTAGS[animal_type]])
+
+    def posts(self, count: int) -> List[Tuple[str, str]]:
+        """(動物種, 本文) のリスト"""
+        posts = []
+        for _ in range(count):
+            animal_type = 'cat' if self.random.random() < CAT_RATIO else 'dog'
+            posts.append((animal_type, self.post(animal_type)))
+        return posts
+
+
+def build_history(db_path: str, rows: int, seed: int = 0) -> AdvancedDuplicateMonitor:
+    """合成投稿 rows 件の投稿履歴DBを作成（既存のファイルは置き換える）"""
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+
+    monitor = AdvancedDuplicateMonitor(db_path, load_archive=False)
+    generator = SyntheticHistory(seed)
+    now = datetime.now()
+    for start in range(0, rows, INSERT_BATCH_SIZE):
+        batch = generator.posts(min(INSERT_BATCH_SIZE, rows - start))
+        with monitor.store.transaction() as cursor:
+            # 古い順に採番されるよう、IDが大きいほど新しい作成日時にする
+            monitor.save_historical_posts([
+                (content, monitor.calculate_content_hash(content),
+                 (now - timedelta(days=HISTORY_SPAN_DAYS * (1 - (start + offset) / rows))).strftime('%Y-%m-%d %H:%M:%S'))
+                for offset, (_, content) in enumerate(batch)
+            ], cursor)
+    # 直近の期間から外れた投稿を古い投稿のテーブルへ移す
+    monitor.rotate_history()
+    return monitor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VET-Assistant2 ベンチマーク用の合成投稿履歴DBを作成")
+    parser.add_argument("--rows", type=int, default=1000, help="投稿件数")
+    parser.add_argument("--db", required=True, help="作成するDBのパス（既存のファイルは置き換える）")
+    parser.add_argument("--seed", type=int, default=0, help="乱数シード")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    monitor = build_history(args.db, args.rows, args.seed)
+    stats = monitor.get_statistics()
+    monitor.close()
+    print(f"✅ {args.db}: {stats['total_posts']}件 ({time.perf_counter() - started:.1f}秒)")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,7 +14,7 @@ if errorlevel 1 (
 echo.
 echo 必要なライブラリをインストール中...
 echo - 基本ライブラリ
-pip install pandas python-dateutil
+pip install python-dateutil
 
 echo - Google Sheets連携ライブラリ
 pip install google-api-python-client google-auth-httplib2 google-auth-oauthlib gspread
@@ -5,28 +5,110 @@ VET-Assistant2 高度重複監視システム
 数か月の過去投稿との厳重な内容重複チェック
 """
 
-import sqlite3
+import argparse
 import hashlib
 import re
 import json
 import os
-import difflib
-from datetime import datetime, timedelta
+from datetime import datetime
 from collections import Counter
 from typing import List, Dict, Tuple, Optional
+from content_memo import ContentMemo
+from detection_log import DetectionLog
+from history_cache import HistoryCache, HistoryRecord, window_cutoff
+from history_partitions import ALL_POSTS, ARCHIVE_TABLE, EPOCH_SQL, HOT_TABLE, HistoryPartitions
+from instrumentation import count, span, timed
+from minhash_lsh_index import MinHashLSHIndex
+from pool_similarity_matrix import PoolSimilarityMatrix, chunks, placeholders
+from post_history_store import PostHistoryStore, fetch_rows
+from similarity_backends import DEFAULT_BACKEND, get_backend
+from trigram_index import TrigramIndex
+from tweet_archive_importer import TweetArchiveImporter
+from veterinary_vocabulary import VOCABULARY
+
+# 特徴量（正規化本文・キーワード・主要ポイント）の抽出ロジックの版数
+# 抽出ロジックを変更したら上げ、migrate コマンドで保存済みの列を再計算する
+FEATURE_VERSION = 2
+
+# 類似度の計算に読む列（本文は特徴量列が古い版の行のみ。表示用の列は重複と判定した投稿だけ読む）
+FEATURE_COLUMNS = f'''
+    id, content_hash, normalized_content, keywords, main_points, feature_version,
+    CASE WHEN feature_version = {FEATURE_VERSION} THEN NULL ELSE content END AS content,
+    animal_type, topic, created_at
+'''
+
+# 頻繁に実行するSQL（同じ文字列を渡すことで接続内のプリペアドステートメントが再利用される）
+SELECT_DETAILS_SQL = f'SELECT id, content, topic, created_at, source FROM {ALL_POSTS} WHERE id IN ({{}})'
+
+INSERT_POST_SQL = '''
+    INSERT INTO post_history 
+    (content, content_hash, normalized_content, post_type, animal_type, 
+     topic, keywords, main_points, char_count, source, feature_version)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+INSERT_HISTORICAL_POST_SQL = '''
+    INSERT INTO post_history 
+    (content, content_hash, normalized_content, animal_type, topic, 
+     keywords, main_points, char_count, source, feature_version, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+'''
+
+# 本文の正規化（改行・空白 → 絵文字・記号 → ハッシュタグの順に除去）
+WHITESPACE_PATTERN = re.compile(r'[\n\r\s]')
+SYMBOL_PATTERN = re.compile(r'[^\w\u3040-\u309F\u30A0-\u30FF\u4E00-\u9FAF]')
+HASHTAG_PATTERN = re.compile(r'#\w+')
+
+
+def normalize_text(content: str) -> str:
+    """投稿内容を正規化（改行、空白、絵文字、記号、ハッシュタグを除去）"""
+    normalized = WHITESPACE_PATTERN.sub('', content)
+    normalized = SYMBOL_PATTERN.sub('', normalized)
+    normalized = HASHTAG_PATTERN.sub('', normalized)
+    return normalized.lower()
+
+
+def hash_normalized(normalized: str) -> str:
+    """正規化済み本文のコンテンツハッシュ"""
+    return hashlib.md5(normalized.encode()).hexdigest()
+
 
 class AdvancedDuplicateMonitor:
-    def __init__(self, db_path: str = "vet_assistant2_posts.db"):
+    # 本文ごとの正規化・ハッシュ・特徴量のLRU（本文だけで決まる値なので全インスタンスで共有）
+    content_memo = ContentMemo(normalize_text, hash_normalized)
+    
+    def __init__(self, db_path: str = "vet_assistant2_posts.db", load_archive: bool = True,
+                 similarity_backend: str = DEFAULT_BACKEND, read_only: bool = False):
         self.db_path = db_path
         self.similarity_threshold = 0.65  # 65%以上の類似度で重複と判定
+        self.similarity_backend = get_backend(similarity_backend)  # 本文の文字列類似度の計算方法
+        self.lsh_index = MinHashLSHIndex()  # 近似重複候補の絞り込み用
+        self.trigram_index = TrigramIndex()  # 正規化本文・主要ポイントの3-gram全文検索（SQLでの重なりの問い合わせ用）
+        self.store = PostHistoryStore(db_path, read_only=read_only)  # スレッドごとの長寿命接続（WAL）
+        self.history_partitions = HistoryPartitions()  # 直近の投稿と古い投稿のテーブル分割
+        self.history_cache = HistoryCache(self)  # 対象期間の履歴のメモリキャッシュ（重複チェックの読み込み用）
+        self.detection_log = DetectionLog(self.calculate_content_hash)  # 検出記録のバッファ（一括書き込み）
+        self.archive_importer = TweetArchiveImporter(self)  # Xアーカイブの差分取り込み
+        self.pool_similarity = PoolSimilarityMatrix(self, FEATURE_VERSION)  # プールと履歴の類似度行列
+        # 読み込み専用（並列スコアリングのワーカーなど）はスキーマの作成・移行を作成済みのプロセスに任せる
+        if read_only:
+            return
         self.init_database()
-        self.load_existing_tweets()
+        if load_archive:  # GUIは起動後にバックグラウンドで取り込む
+            self.load_existing_tweets()
     
     def init_database(self):
         """投稿履歴データベースを初期化"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
+        with self.store.transaction() as cursor:
+            self._create_schema(cursor)
+            
+            # 直近の期間から外れた投稿を古い投稿のテーブルへ移す（前回から1日以上経っている場合のみ）
+            moved = self.history_partitions.rotate_if_due(cursor)
+            if moved:
+                print(f"🗄️ 投稿履歴を整理しました: {moved}件を移動")
+    
+    def _create_schema(self, cursor):
+        """テーブル・インデックスを作成し、旧スキーマを移行"""
         # 投稿履歴テーブル
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS post_history (
@@ -41,130 +123,102 @@ class AdvancedDuplicateMonitor:
                 main_points TEXT,
                 char_count INTEGER,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                source TEXT DEFAULT 'generated'
+                source TEXT DEFAULT 'generated',
+                feature_version INTEGER DEFAULT 0,
+                created_epoch INTEGER
             )
         ''')
         
-        # 重複検出履歴テーブル
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS duplicate_detections (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                attempted_content TEXT NOT NULL,
-                similar_post_id INTEGER,
-                similarity_score REAL,
-                detection_reason TEXT,
-                detected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (similar_post_id) REFERENCES post_history (id)
-            )
-        ''')
+        # 旧スキーマのDBには特徴量の版数列を追加
+        cursor.execute('PRAGMA table_info(post_history)')
+        if 'feature_version' not in [column[1] for column in cursor.fetchall()]:
+            cursor.execute('ALTER TABLE post_history ADD COLUMN feature_version INTEGER DEFAULT 0')
+        
+        # 古い投稿のテーブルと作成日時のUNIX時刻列（期間の絞り込み用）
+        self.history_partitions.create_schema(cursor)
+        
+        # 重複検出履歴テーブル（試行した本文はハッシュごとに1回だけ保存）
+        self.detection_log.create_schema(cursor)
         
         # インデックス作成
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_content_hash ON post_history(content_hash)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_animal_type ON post_history(animal_type)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_topic ON post_history(topic)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_created_at ON post_history(created_at)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_normalized_content ON post_history(normalized_content)')
         
-        conn.commit()
-        conn.close()
+        # 正規化本文のB-treeインデックスは完全一致にしか使えず、ハッシュのインデックスと重複するため削除
+        cursor.execute('DROP INDEX IF EXISTS idx_normalized_content')
+        
+        # 近似重複候補インデックス（テーブルがなかった既存DBは全投稿をここで登録）
+        self.lsh_index.create_schema(cursor)
+        
+        # 3-gram全文検索インデックス（投稿の追加・更新・削除はトリガーで同期）
+        self.trigram_index.create_schema(cursor)
+        
+        # アーカイブ取り込みの重複判定用ツイートIDとチェックポイント
+        self.archive_importer.create_schema(cursor)
+        
+        # コンテンツプールと履歴の類似度行列
+        self.pool_similarity.create_schema(cursor)
     
     def load_existing_tweets(self):
-        """既存のツイートデータを読み込み"""
+        """既存のツイートデータを読み込み（前回以降に増えた分のみ取り込む）"""
         tweets_file = r"C:\Users\souhe\Desktop\X過去投稿\data\tweets.js"
         
         if os.path.exists(tweets_file):
             try:
-                with open(tweets_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                json_match = re.search(r'window\.YTD\.tweets\.part0\s*=\s*(\[.*\]);?', content, re.DOTALL)
-                if json_match:
-                    json_str = json_match.group(1)
-                    tweets_data = json.loads(json_str)
-                    
-                    conn = sqlite3.connect(self.db_path)
-                    cursor = conn.cursor()
-                    
-                    # 既存データがあるかチェック
-                    cursor.execute('SELECT COUNT(*) FROM post_history WHERE source = "archive"')
-                    if cursor.fetchone()[0] == 0:
-                        # 過去投稿を保存
-                        for tweet_obj in tweets_data:
-                            if 'tweet' in tweet_obj and 'full_text' in tweet_obj['tweet']:
-                                full_text = tweet_obj['tweet']['full_text']
-                                
-                                # 猫または犬の投稿のみ
-                                if '#猫のあれこれ' in full_text or '#獣医が教える犬のはなし' in full_text:
-                                    self.save_historical_post(full_text, cursor)
-                        
-                        conn.commit()
-                    
-                    conn.close()
-                    
+                stats = self.archive_importer.import_archive(tweets_file)
+                if stats['inserted']:
+                    print(f"📥 過去投稿を取り込みました: {stats['inserted']}件 (重複 {stats['duplicates']}件)")
             except Exception as e:
                 print(f"⚠️ 既存ツイート読み込みエラー: {e}")
     
-    def save_historical_post(self, content: str, cursor):
+    def save_historical_post(self, content: str, cursor, created_at: Optional[str] = None):
         """過去投稿を履歴に保存"""
-        content_hash = self.calculate_content_hash(content)
-        normalized_content = self.normalize_content(content)
-        keywords = json.dumps(self.extract_keywords(content), ensure_ascii=False)
-        main_points = json.dumps(self.extract_main_points(content), ensure_ascii=False)
-        
-        animal_type = "cat" if '#猫のあれこれ' in content else "dog"
-        topic = self.extract_topic(content)
-        
-        cursor.execute('''
-            INSERT OR IGNORE INTO post_history 
-            (content, content_hash, normalized_content, animal_type, topic, 
-             keywords, main_points, char_count, source)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (content, content_hash, normalized_content, animal_type, topic,
-              keywords, main_points, len(content), 'archive'))
+        self.save_historical_posts([(content, self.calculate_content_hash(content), created_at)], cursor)
+    
+    def save_historical_posts(self, posts: List[Tuple[str, str, Optional[str]]], cursor) -> List[int]:
+        """
+        過去投稿 (本文, コンテンツハッシュ, 投稿日時) をまとめて履歴に保存し、採番されたIDを返す
+        （投稿日時はUTCの 'YYYY-MM-DD HH:MM:SS'、None なら現在日時。古い投稿は rotate_history で移す）
+        """
+        if not posts:
+            return []
+        
+        rows = []
+        features_list = []
+        for content, content_hash, created_at in posts:
+            features = self.extract_features(content)
+            features_list.append(features)
+            rows.append((
+                content, content_hash, features['normalized'], features['animal_type'], features['topic'],
+                json.dumps(features['keywords'], ensure_ascii=False),
+                json.dumps(features['main_points'], ensure_ascii=False),
+                len(content), 'archive', FEATURE_VERSION, created_at
+            ))
+        
+        cursor.execute('SELECT COALESCE(MAX(id), 0) FROM post_history')
+        last_id = cursor.fetchone()[0]
+        cursor.executemany(INSERT_HISTORICAL_POST_SQL, rows)
+        
+        # AUTOINCREMENT の採番順は挿入順なので、新しいIDを順に対応付ける
+        cursor.execute('SELECT id FROM post_history WHERE id > ? ORDER BY id', (last_id,))
+        post_ids = [row[0] for row in cursor.fetchall()]
+        
+        cursor.executemany('INSERT INTO post_lsh_buckets (band, bucket, post_id) VALUES (?, ?, ?)', [
+            (band, bucket, post_id)
+            for post_id, features in zip(post_ids, features_list)
+            for band, bucket in self.lsh_index.band_keys(features['normalized'], features['keywords'])
+        ])
+        
+        return post_ids
     
     def normalize_content(self, content: str) -> str:
-        """投稿内容を正規化"""
-        # 改行、空白、絵文字、記号を除去
-        normalized = re.sub(r'[\n\r\s]', '', content)
-        normalized = re.sub(r'[^\w\u3040-\u309F\u30A0-\u30FF\u4E00-\u9FAF]', '', normalized)
-        normalized = re.sub(r'#\w+', '', normalized)
-        return normalized.lower()
+        """投稿内容を正規化（同じ本文は content_memo から返す）"""
+        return self.content_memo.entry(content).normalized
     
     def extract_keywords(self, content: str) -> List[str]:
-        """投稿内容からキーワードを抽出"""
-        keywords = []
-        
-        # 疾患・症状パターン
-        disease_patterns = [
-            r'(腎臓病|腎不全|心臓病|糖尿病|甲状腺|肝臓|膀胱|尿路|結石|感染症|アレルギー)',
-            r'(白内障|緑内障|結膜炎|皮膚炎|外耳炎|歯周病|口内炎|関節炎)',
-            r'(嘔吐|下痢|便秘|発熱|食欲不振|体重減少|呼吸困難|多飲多尿)',
-            r'(血尿|よだれ|口臭|歩行異常|震え|痙攣|意識障害)'
-        ]
-        
-        # 猫種・犬種パターン
-        breed_patterns = [
-            r'(アメリカンショートヘア|ペルシャ|ロシアンブルー|スコティッシュフォールド|マンチカン)',
-            r'(メインクーン|ラグドール|ベンガル|アビシニアン|ブリティッシュ)',
-            r'(トイプードル|チワワ|ダックスフント|ポメラニアン|シーズー)',
-            r'(ゴールデンレトリーバー|ラブラドール|柴犬|フレンチブルドッグ)'
-        ]
-        
-        # 医療・ケア用語
-        medical_patterns = [
-            r'(診断|治療|手術|薬|ワクチン|検査|血液検査|レントゲン|エコー|MRI)',
-            r'(症状|予防|ケア|管理|観察|対処法|応急処置|健康診断)',
-            r'(フード|食事|給餌|水分|栄養|サプリメント|おやつ)',
-            r'(トイレ|排尿|排便|グルーミング|ブラッシング|爪切り)'
-        ]
-        
-        all_patterns = disease_patterns + breed_patterns + medical_patterns
-        
-        for pattern in all_patterns:
-            matches = re.findall(pattern, content, re.IGNORECASE)
-            keywords.extend(matches)
-        
-        return list(set(keywords))
+        """投稿内容からキーワードを抽出（疾患・品種・医療用語）"""
+        return VOCABULARY.extract_keywords(content)
     
     def extract_main_points(self, content: str) -> List[str]:
         """主要ポイントを抽出"""
@@ -203,53 +257,88 @@ class AdvancedDuplicateMonitor:
         return [point.strip() for point in points if point.strip()]
     
     def extract_topic(self, content: str) -> str:
-        """トピックを抽出"""
-        # 【】内のトピック
-        topic_match = re.search(r'【([^】]+)】', content)
-        if topic_match:
-            return topic_match.group(1)
-        
-        # 疾患名の抽出
-        diseases = [
-            '腎臓病', '腎不全', '心臓病', '糖尿病', '甲状腺', '歯周病', '関節炎',
-            '尿路結石', '皮膚炎', '外耳炎', '白内障', '緑内障'
-        ]
-        
-        for disease in diseases:
-            if disease in content:
-                return disease
-        
-        # 猫種・犬種の抽出
-        breeds = [
-            'アメリカンショートヘア', 'ペルシャ', 'マンチカン', 'スコティッシュフォールド',
-            'トイプードル', 'チワワ', 'ゴールデンレトリーバー', '柴犬'
-        ]
-        
-        for breed in breeds:
-            if breed in content:
-                return breed
-        
-        return "一般"
+        """トピックを抽出（【】内 → 疾患名 → 品種名 → 一般の順）"""
+        return VOCABULARY.scan(content)['topic']
     
     def calculate_content_hash(self, content: str) -> str:
-        """コンテンツハッシュ値を計算"""
-        normalized = self.normalize_content(content)
-        return hashlib.md5(normalized.encode()).hexdigest()
+        """コンテンツハッシュ値を計算（同じ本文は content_memo から返す）"""
+        return self.content_memo.entry(content).content_hash
+    
+    @timed('monitor.extract_features')
+    def extract_features(self, content: str) -> Dict:
+        """類似度計算と保存に使う特徴量を抽出（本文ごとに1回だけ抽出し、返す辞書は変更しない）"""
+        return self.content_memo.features(content, self._extract_features)
+    
+    def _extract_features(self, content: str, normalized: str) -> Dict:
+        vocabulary = VOCABULARY.scan(content)  # キーワード・トピック・動物種を1回の走査で取得
+        return {
+            'normalized': normalized,
+            'keywords': vocabulary['keywords'],
+            'main_points': self.extract_main_points(content),
+            'topic': vocabulary['topic'],
+            'animal_type': vocabulary['animal_type']
+        }
+    
+    def features_from_row(self, normalized_content: str, keywords: str, main_points: str) -> Dict:
+        """保存済みの特徴量列から特徴量を復元"""
+        return {
+            'normalized': normalized_content,
+            'keywords': json.loads(keywords or '[]'),
+            'main_points': json.loads(main_points or '[]')
+        }
     
+    @timed('monitor.calculate_similarity')
     def calculate_similarity(self, content1: str, content2: str) -> float:
         """2つの投稿の類似度を計算"""
-        norm1 = self.normalize_content(content1)
-        norm2 = self.normalize_content(content2)
+        return self.calculate_feature_similarity(
+            self.extract_features(content1), self.extract_features(content2)
+        )
+    
+    def calculate_feature_similarity(self, features1: Dict, features2: Dict) -> float:
+        """抽出済みの特徴量から2つの投稿の類似度を計算"""
+        norm1 = features1['normalized']
+        norm2 = features2['normalized']
         
         if norm1 == norm2:
             return 1.0
         
         # 文字列の類似度
-        text_similarity = difflib.SequenceMatcher(None, norm1, norm2).ratio()
-        
+        text_similarity = self.similarity_backend.similarity(norm1, norm2)
+        return self._combine_similarity(features1, features2, text_similarity)
+    
+    def calculate_feature_similarities(self, features: Dict, others: List[Dict], prepared=None,
+                                       rows: Optional[List[int]] = None) -> List[float]:
+        """
+        1件の特徴量と複数の特徴量の類似度を一括で計算
+        
+        Args:
+            features: 候補の特徴量
+            others: 比較相手の特徴量のリスト
+            prepared: others の本文を similarity_backend.prepare() した結果（使い回す場合）
+            rows: 比較する others のインデックス（省略時はすべて）
+        """
+        if prepared is None:
+            prepared = self.similarity_backend.prepare([other['normalized'] for other in others])
+        if rows is None:
+            rows = list(range(len(others)))
+        with span('monitor.text_similarity'):
+            text_similarities = self.similarity_backend.similarities(features['normalized'], prepared, rows)
+        count('monitor.compared_posts', len(rows))
+        
+        results = []
+        for row, text_similarity in zip(rows, text_similarities):
+            other = others[row]
+            if features['normalized'] == other['normalized']:
+                results.append(1.0)
+            else:
+                results.append(self._combine_similarity(features, other, text_similarity))
+        return results
+    
+    def _combine_similarity(self, features1: Dict, features2: Dict, text_similarity: float) -> float:
+        """文字列・キーワード・主要ポイントの類似度の重み付き平均"""
         # キーワードの類似度
-        keywords1 = set(self.extract_keywords(content1))
-        keywords2 = set(self.extract_keywords(content2))
+        keywords1 = set(features1['keywords'])
+        keywords2 = set(features2['keywords'])
         
         if keywords1 or keywords2:
             keyword_similarity = len(keywords1 & keywords2) / len(keywords1 | keywords2)
@@ -257,8 +346,8 @@ class AdvancedDuplicateMonitor:
             keyword_similarity = 0.0
         
         # 主要ポイントの類似度
-        points1 = set(self.extract_main_points(content1))
-        points2 = set(self.extract_main_points(content2))
+        points1 = set(features1['main_points'])
+        points2 = set(features2['main_points'])
         
         if points1 or points2:
             points_similarity = len(points1 & points2) / len(points1 | points2)
@@ -274,121 +363,279 @@ class AdvancedDuplicateMonitor:
         
         return final_similarity
     
+    @timed('monitor.check_duplicate')
     def check_duplicate_comprehensive(self, content: str, animal_type: str = None, 
                                     topic: str = None, months_back: int = 6) -> Tuple[bool, List[Dict]]:
         """包括的な重複チェック"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self.store.transaction() as cursor:
+            result = self._check_duplicate(cursor, content, animal_type, topic, months_back)
+        if result[0]:
+            count('monitor.duplicates')
+        return result
+    
+    def _check_duplicate(self, cursor, content: str, animal_type: Optional[str],
+                         topic: Optional[str], months_back: int) -> Tuple[bool, List[Dict]]:
+        """1件の重複チェック（検出記録はバッファにため、たまったら呼び出し元のトランザクションで書き込む）"""
+        # 履歴はメモリキャッシュから読む（SQLite を読むのは初回と期間の拡大時のみ）
+        self.history_cache.ensure(cursor, months_back)
         
         # 完全一致チェック
         content_hash = self.calculate_content_hash(content)
-        cursor.execute('SELECT * FROM post_history WHERE content_hash = ?', (content_hash,))
-        exact_match = cursor.fetchone()
-        
-        if exact_match:
-            duplicate_info = {
-                'type': 'exact_match',
-                'similarity': 1.0,
-                'content': exact_match[1],
-                'topic': exact_match[6],
-                'created_at': exact_match[10],
-                'source': exact_match[11]
-            }
+        exact_match = self.history_cache.exact_match(content_hash)
+        
+        if exact_match is not None:
+            duplicate_info = self._duplicate_info('exact_match', 1.0, exact_match)
+            self._attach_details(cursor, [duplicate_info])
             
             # 重複検出記録
-            cursor.execute('''
-                INSERT INTO duplicate_detections 
-                (attempted_content, similar_post_id, similarity_score, detection_reason)
-                VALUES (?, ?, ?, ?)
-            ''', (content, exact_match[0], 1.0, 'exact_match'))
-            
-            conn.commit()
-            conn.close()
+            self.detection_log.record(content_hash, content, exact_match, 1.0, 'exact_match')
+            self._flush_if_full(cursor)
             return True, [duplicate_info]
         
         # 類似度チェック（過去数か月）
-        cutoff_date = datetime.now() - timedelta(days=months_back * 30)
-        
-        # 動物種とトピックでフィルタリング
-        where_conditions = ["created_at > ?"]
-        params = [cutoff_date.strftime('%Y-%m-%d %H:%M:%S')]
+        cutoff_date = window_cutoff(months_back)
         
-        if animal_type:
-            where_conditions.append("animal_type = ?")
-            params.append(animal_type)
+        # 候補側の特徴量は1回だけ抽出し、保存済み投稿はキャッシュの特徴量をそのまま使う
+        features = self.extract_features(content)
         
-        if topic:
-            where_conditions.append("topic = ?")
-            params.append(topic)
-        
-        query = f'''
-            SELECT * FROM post_history 
-            WHERE {' AND '.join(where_conditions)}
-            ORDER BY created_at DESC
-            LIMIT 200
-        '''
+        # LSHインデックスでバケットを共有する投稿のみを候補にし、動物種とトピックでフィルタリング
+        candidate_posts = [
+            record for record in self.history_cache.candidates(
+                self.lsh_index.band_keys(features['normalized'], features['keywords']), cutoff_date
+            )
+            if not (animal_type and record.animal_type != animal_type)
+            and not (topic and record.topic != topic)
+        ]
         
-        cursor.execute(query, params)
-        candidate_posts = cursor.fetchall()
+        # 候補1件と全候補投稿の類似度を一括で計算
+        similarities = self.calculate_feature_similarities(features, candidate_posts)
         
         duplicates = []
-        for post in candidate_posts:
-            similarity = self.calculate_similarity(content, post[1])
-            
+        for post, similarity in zip(candidate_posts, similarities):
             if similarity >= self.similarity_threshold:
-                duplicate_info = {
-                    'type': 'similar_content',
-                    'similarity': similarity,
-                    'content': post[1],
-                    'topic': post[6],
-                    'created_at': post[10],
-                    'source': post[11]
-                }
+                duplicate_info = self._duplicate_info('similar_content', similarity, post.id)
                 duplicates.append(duplicate_info)
                 
                 # 重複検出記録
-                cursor.execute('''
-                    INSERT INTO duplicate_detections 
-                    (attempted_content, similar_post_id, similarity_score, detection_reason)
-                    VALUES (?, ?, ?, ?)
-                ''', (content, post[0], similarity, 'similar_content'))
+                self.detection_log.record(content_hash, content, post.id, similarity, 'similar_content')
+        
+        self._attach_details(cursor, duplicates)
+        self._flush_if_full(cursor)
         
         # 類似度でソート
         duplicates.sort(key=lambda x: x['similarity'], reverse=True)
         
-        conn.commit()
-        conn.close()
-        
         return len(duplicates) > 0, duplicates
     
+    @timed('monitor.check_batch')
+    def check_duplicates_batch(self, candidates: List[Dict], months_back: int = 6,
+                               record_detections: bool = True) -> List[Tuple[bool, List[Dict]]]:
+        """
+        複数候補の一括重複チェック
+        
+        履歴の読み込み・検出記録の書き込みを1回の接続と1回のトランザクションで行い、
+        候補同士の重複（同じバッチ内で先に承認された候補との重複）も検出する
+        
+        Args:
+            candidates: {'content', 'animal_type'(任意), 'topic'(任意)} の辞書のリスト
+            months_back: 類似度チェックの対象期間（か月）
+            record_detections: False の場合は検出記録を残さない（読み取り専用のチェック）
+        
+        Returns:
+            候補ごとの (重複有無, 重複情報リスト) のリスト
+        """
+        with self.store.transaction() as cursor:
+            return self._check_duplicates_batch(cursor, candidates, months_back, record_detections)
+    
+    def _check_duplicates_batch(self, cursor, candidates: List[Dict], months_back: int,
+                                record_detections: bool = True) -> List[Tuple[bool, List[Dict]]]:
+        """一括重複チェックの本体"""
+        self.history_cache.ensure(cursor, months_back)
+        cutoff_date = window_cutoff(months_back)
+        
+        hashes = [self.calculate_content_hash(candidate['content']) for candidate in candidates]
+        features = [self.extract_features(candidate['content']) for candidate in candidates]
+        
+        # 完全一致
+        exact_matches = {}
+        for index, content_hash in enumerate(hashes):
+            exact_match = self.history_cache.exact_match(content_hash)
+            if exact_match is not None:
+                exact_matches[index] = exact_match
+        
+        # 候補ごとのLSH候補投稿（対象期間内、created_at の新しい順）
+        candidate_posts = [
+            self.history_cache.candidates(
+                self.lsh_index.band_keys(feature['normalized'], feature['keywords']), cutoff_date
+            )
+            if index not in exact_matches else []
+            for index, feature in enumerate(features)
+        ]
+        
+        # 履歴側の本文の前処理は1回だけ行い、候補ごとに対象行をまとめて比較する
+        history = list({post.id: post for posts in candidate_posts for post in posts}.values())
+        history_rows = {post.id: row for row, post in enumerate(history)}
+        prepared_history = self.similarity_backend.prepare([post.normalized for post in history])
+        
+        results = []
+        detections = []
+        accepted = []  # バッチ内で重複なしと判定された候補のインデックス
+        
+        for index, candidate in enumerate(candidates):
+            content = candidate['content']
+            animal_type = candidate.get('animal_type')
+            topic = candidate.get('topic')
+            
+            if index in exact_matches:
+                duplicate_info = self._duplicate_info('exact_match', 1.0, exact_matches[index])
+                detections.append((hashes[index], content, exact_matches[index], 1.0, 'exact_match'))
+                results.append((True, [duplicate_info]))
+                continue
+            
+            duplicates = []
+            rows = [
+                history_rows[post.id] for post in candidate_posts[index]
+                if not (animal_type and post.animal_type != animal_type)
+                and not (topic and post.topic != topic)
+            ]
+            similarities = self.calculate_feature_similarities(
+                features[index], history, prepared_history, rows
+            )
+            
+            for row, similarity in zip(rows, similarities):
+                post = history[row]
+                if similarity >= self.similarity_threshold:
+                    duplicates.append(self._duplicate_info('similar_content', similarity, post.id))
+                    detections.append((hashes[index], content, post.id, similarity, 'similar_content'))
+            
+            # 同じバッチ内で先に承認された候補との重複
+            for other in accepted:
+                other_animal_type = candidates[other].get('animal_type')
+                if animal_type and other_animal_type and animal_type != other_animal_type:
+                    continue
+                
+                if hashes[other] == hashes[index]:
+                    similarity = 1.0
+                else:
+                    similarity = self.calculate_feature_similarity(features[index], features[other])
+                
+                if similarity >= self.similarity_threshold:
+                    duplicates.append({
+                        'type': 'batch_duplicate',
+                        'similarity': similarity,
+                        'content': candidates[other]['content'],
+                        'topic': candidates[other].get('topic'),
+                        'created_at': None,
+                        'source': 'batch',
+                        'post_id': None,
+                        'batch_index': other
+                    })
+                    detections.append((hashes[index], content, None, similarity, 'batch_duplicate'))
+            
+            if not duplicates:
+                accepted.append(index)
+            
+            duplicates.sort(key=lambda x: x['similarity'], reverse=True)
+            results.append((len(duplicates) > 0, duplicates))
+        
+        # 重複と判定した投稿の表示用の列をまとめて読む
+        self._attach_details(cursor, [duplicate for _, duplicates in results for duplicate in duplicates])
+        
+        # 検出記録はバッファに追加し、たまったらまとめて書き込む
+        if record_detections:
+            for detection in detections:
+                self.detection_log.record(*detection)
+            self._flush_if_full(cursor)
+        
+        return results
+    
+    def _flush_if_full(self, cursor):
+        """検出記録のバッファがたまっていれば書き込む"""
+        if self.detection_log.is_full():
+            self.detection_log.flush(cursor)
+    
+    def flush_detections(self) -> int:
+        """バッファの検出記録を書き込む"""
+        if not self.detection_log.pending():
+            return 0
+        with self.store.transaction() as cursor:
+            return self.detection_log.flush(cursor)
+    
+    def compact_detections(self) -> Dict[str, int]:
+        """検出記録を書き込み、保持期間・最大行数に従って整理"""
+        with self.store.transaction() as cursor:
+            self.detection_log.flush(cursor)
+            return self.detection_log.compact(cursor)
+    
+    def _feature_rows(self, cursor, where: str, params: list, table: str = HOT_TABLE) -> list:
+        """類似度の計算に使う列だけの履歴行（列名で参照する sqlite3.Row。古い投稿も読む場合は table に ALL_POSTS）"""
+        return fetch_rows(cursor, f'SELECT {FEATURE_COLUMNS} FROM {table} WHERE {where}', params)
+    
+    def _post_features(self, post) -> Dict:
+        """履歴行（FEATURE_COLUMNS の列を含む sqlite3.Row）から特徴量を取得"""
+        if post['feature_version'] == FEATURE_VERSION:
+            return self.features_from_row(post['normalized_content'], post['keywords'], post['main_points'])
+        # 未移行の行は本文から抽出（migrate コマンドで解消される）
+        return self.extract_features(post['content'])
+    
+    def _duplicate_info(self, duplicate_type: str, similarity: float, post_id: int) -> Dict:
+        """重複情報を作成（表示用の列は _attach_details() で後から読む）"""
+        return {
+            'type': duplicate_type,
+            'similarity': similarity,
+            'content': None,
+            'topic': None,
+            'created_at': None,
+            'source': None,
+            'post_id': post_id
+        }
+    
+    def _attach_details(self, cursor, duplicates: List[Dict]):
+        """重複と判定した過去投稿の本文・トピック・作成日時・投稿元を読んで重複情報に追加"""
+        post_ids = sorted({duplicate['post_id'] for duplicate in duplicates if duplicate['type'] != 'batch_duplicate'})
+        details = {}
+        for batch in chunks(post_ids):
+            for post in fetch_rows(cursor, SELECT_DETAILS_SQL.format(placeholders(len(batch))), batch):
+                details[post['id']] = post
+        for duplicate in duplicates:
+            post = details.get(duplicate['post_id'])
+            if post is not None and duplicate['type'] != 'batch_duplicate':
+                duplicate.update(content=post['content'], topic=post['topic'],
+                                 created_at=post['created_at'], source=post['source'])
+    
+    @timed('monitor.save_approved_post')
     def save_approved_post(self, content: str, animal_type: str = None, 
                           topic: str = None, post_type: str = None) -> bool:
         """承認された投稿を保存"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
             content_hash = self.calculate_content_hash(content)
-            normalized_content = self.normalize_content(content)
-            keywords = json.dumps(self.extract_keywords(content), ensure_ascii=False)
-            main_points = json.dumps(self.extract_main_points(content), ensure_ascii=False)
+            features = self.extract_features(content)
+            keywords = json.dumps(features['keywords'], ensure_ascii=False)
+            main_points = json.dumps(features['main_points'], ensure_ascii=False)
             
             if not topic:
-                topic = self.extract_topic(content)
+                topic = features['topic']
             
             if not animal_type:
-                animal_type = "cat" if '#猫のあれこれ' in content else "dog"
+                animal_type = features['animal_type']
             
-            cursor.execute('''
-                INSERT INTO post_history 
-                (content, content_hash, normalized_content, post_type, animal_type, 
-                 topic, keywords, main_points, char_count, source)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (content, content_hash, normalized_content, post_type, animal_type,
-                  topic, keywords, main_points, len(content), 'generated'))
+            with self.store.transaction() as cursor:
+                cursor.execute(INSERT_POST_SQL, (
+                    content, content_hash, features['normalized'], post_type, animal_type,
+                    topic, keywords, main_points, len(content), 'generated', FEATURE_VERSION
+                ))
+                post_id = cursor.lastrowid
+                band_keys = self.lsh_index.add(cursor, post_id, features['normalized'], features['keywords'])
+                cursor.execute('SELECT created_at FROM post_history WHERE id = ?', (post_id,))
+                created_at = cursor.fetchone()[0]
+                
+                # 書き込みのついでにバッファの検出記録も書き込む
+                self.detection_log.flush(cursor)
             
-            conn.commit()
-            conn.close()
+            # コミット後にキャッシュへ追加（次の重複チェックで SQLite を読み直さない）
+            self.history_cache.add(HistoryRecord(
+                post_id, content_hash, features, animal_type, topic, created_at, band_keys
+            ))
             return True
             
         except Exception as e:
@@ -397,50 +644,163 @@ class AdvancedDuplicateMonitor:
     
     def get_statistics(self) -> Dict:
         """統計情報を取得"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.store.cursor()
         
-        # 総投稿数
-        cursor.execute('SELECT COUNT(*) FROM post_history')
+        # 総投稿数（古い投稿のテーブルも含む）
+        cursor.execute(f'SELECT COUNT(*) FROM {ALL_POSTS}')
         total_posts = cursor.fetchone()[0]
         
         # 動物種別
-        cursor.execute('SELECT animal_type, COUNT(*) FROM post_history GROUP BY animal_type')
+        cursor.execute(f'SELECT animal_type, COUNT(*) FROM {ALL_POSTS} GROUP BY animal_type')
         animal_counts = dict(cursor.fetchall())
         
-        # 重複検出数
-        cursor.execute('SELECT COUNT(*) FROM duplicate_detections')
-        duplicate_detections = cursor.fetchone()[0]
+        # 重複検出数（まとめた行は回数分、未書き込みのバッファも含む）
+        cursor.execute('SELECT COALESCE(SUM(hits), 0) FROM duplicate_detections')
+        duplicate_detections = cursor.fetchone()[0] + self.detection_log.pending()
         
         # 最近の投稿数（30日間）
-        cursor.execute('''
+        cursor.execute(f'''
             SELECT COUNT(*) FROM post_history 
-            WHERE created_at > datetime('now', '-30 days')
+            WHERE created_epoch > {EPOCH_SQL.format("'now', '-30 days'")}
         ''')
         recent_posts = cursor.fetchone()[0]
-        
-        conn.close()
+        cursor.close()
         
         return {
             'total_posts': total_posts,
             'animal_counts': animal_counts,
             'duplicate_detections': duplicate_detections,
-            'recent_posts': recent_posts
+            'recent_posts': recent_posts,
+            'content_memo': self.content_memo.stats()
         }
     
     def clean_old_posts(self, days_to_keep: int = 180):
-        """古い投稿を削除"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            DELETE FROM post_history 
-            WHERE created_at < datetime('now', '-{} days')
-            AND source = 'generated'
-        '''.format(days_to_keep))
-        
-        deleted_count = cursor.rowcount
-        conn.commit()
-        conn.close()
+        """古い投稿を削除（直近の投稿・古い投稿の両方のテーブルから）"""
+        with self.store.transaction() as cursor:
+            deleted_count = 0
+            for table in (HOT_TABLE, ARCHIVE_TABLE):
+                cursor.execute(f'''
+                    DELETE FROM {table} 
+                    WHERE created_epoch < {EPOCH_SQL.format("'now', ?")}
+                    AND source = 'generated'
+                ''', (f'-{days_to_keep} days',))
+                deleted_count += cursor.rowcount
+            
+            self.lsh_index.remove_orphans(cursor)
+            self.pool_similarity.remove_orphans(cursor)
+            self.detection_log.flush(cursor)
+            self.detection_log.compact(cursor)
         
-        return deleted_count
\ No newline at end of file
+        self.history_cache.invalidate()
+        return deleted_count
+    
+    def backfill_features(self, batch_size: int = 500) -> int:
+        """特徴量列が古い版の投稿を再計算（既存DBの一括移行）"""
+        cursor = self.store.cursor()
+        cursor.execute(f'''
+            SELECT id, content FROM {ALL_POSTS}
+            WHERE feature_version IS NULL OR feature_version != ?
+        ''', (FEATURE_VERSION,))
+        stale_posts = cursor.fetchall()
+        cursor.close()
+        
+        # バッチごとにコミットし、途中で中断しても処理済みの分は残す
+        for start in range(0, len(stale_posts), batch_size):
+            with self.store.transaction() as cursor:
+                updates = []
+                for post_id, content in stale_posts[start:start + batch_size]:
+                    features = self.extract_features(content)
+                    updates.append((
+                        self.calculate_content_hash(content),
+                        features['normalized'],
+                        json.dumps(features['keywords'], ensure_ascii=False),
+                        json.dumps(features['main_points'], ensure_ascii=False),
+                        FEATURE_VERSION,
+                        post_id
+                    ))
+                    # キーワードが変わるとLSHバケットも変わるため登録し直す
+                    cursor.execute('DELETE FROM post_lsh_buckets WHERE post_id = ?', (post_id,))
+                    self.lsh_index.add(cursor, post_id, features['normalized'], features['keywords'])
+                
+                # 投稿はどちらか一方のテーブルにある
+                for table in (HOT_TABLE, ARCHIVE_TABLE):
+                    cursor.executemany(f'''
+                        UPDATE {table}
+                        SET content_hash = ?, normalized_content = ?, keywords = ?,
+                            main_points = ?, feature_version = ?
+                        WHERE id = ?
+                    ''', updates)
+        
+        # バケットが未登録の投稿（外部から追加された行など）も補完
+        with self.store.transaction() as cursor:
+            indexed = self.lsh_index.index_missing(cursor)
+        
+        if stale_posts or indexed:
+            self.history_cache.invalidate()
+        return len(stale_posts)
+    
+    def rotate_history(self) -> int:
+        """直近の期間から外れた投稿を古い投稿のテーブルへ移し、移動した件数を返す"""
+        with self.store.transaction() as cursor:
+            moved = self.history_partitions.rotate(cursor)
+        if moved:
+            self.history_cache.invalidate()
+        return moved
+    
+    def vacuum(self) -> int:
+        """DBファイルを作り直して空きページを解放し、減ったバイト数を返す"""
+        size = os.path.getsize(self.db_path)
+        if self.trigram_index.available:
+            with self.store.transaction() as cursor:
+                self.trigram_index.optimize(cursor)
+        conn = self.store.connection()
+        conn.execute('VACUUM')
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')  # WALでは書き戻すまで本体のファイルが縮まない
+        return size - os.path.getsize(self.db_path)
+    
+    def close(self):
+        """検出記録のバッファを書き込み、呼び出し元スレッドのデータベース接続を閉じる"""
+        try:
+            self.flush_detections()
+        finally:
+            self.store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VET-Assistant2 投稿履歴データベースの保守")
+    parser.add_argument("command", choices=["migrate", "stats", "import", "compact", "rotate"],
+                        help="migrate: スキーマ移行・特徴量列の再計算・空き領域の解放 / stats: 統計情報を表示 / "
+                             "import: Xアーカイブを取り込み / compact: 重複検出記録の整理 / "
+                             "rotate: 直近の期間から外れた投稿を古い投稿のテーブルへ移動")
+    parser.add_argument("--db", default="vet_assistant2_posts.db", help="投稿履歴データベースのパス")
+    parser.add_argument("--archive", help="import で取り込む tweets.js のパス（同じフォルダの分割ファイルも対象）")
+    args = parser.parse_args()
+    
+    monitor = AdvancedDuplicateMonitor(args.db)
+    
+    if args.command == "migrate":
+        updated = monitor.backfill_features()
+        monitor.flush_detections()
+        freed = monitor.vacuum()
+        print(f"✅ 移行完了: {updated}件の特徴量を再計算しました (版数 {FEATURE_VERSION}, "
+              f"{max(freed, 0) // 1024}KB 縮小)")
+    elif args.command == "import":
+        if not args.archive:
+            parser.error("import には --archive を指定してください")
+        stats = monitor.archive_importer.import_archive(args.archive)
+        print(f"✅ 取り込み完了: {stats['inserted']}件追加 / 重複 {stats['duplicates']}件 / "
+              f"{stats['files']}ファイル中 {stats['skipped_files']}ファイルは取り込み済み / "
+              f"古い投稿のテーブルへ {stats['archived']}件移動")
+    elif args.command == "rotate":
+        moved = monitor.rotate_history()
+        print(f"✅ 移動完了: {moved}件 (直近 {monitor.history_partitions.hot_window_days}日分を post_history に保持)")
+    elif args.command == "compact":
+        stats = monitor.compact_detections()
+        print(f"✅ 整理完了: 期限切れ {stats['expired']}件 / 統合 {stats['merged']}件 / "
+              f"上限超過 {stats['trimmed']}件 / 不要な本文 {stats['orphaned_contents']}件を削除")
+    else:
+        print(json.dumps(monitor.get_statistics(), ensure_ascii=False, indent=2))
+    monitor.close()
+
+if __name__ == "__main__":
+    main()
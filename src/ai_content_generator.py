@@ -8,6 +8,7 @@ AI駆動型コンテンツ生成システム
 import random
 from datetime import datetime, timedelta
 import json
+from veterinary_vocabulary import VOCABULARY
 
 class AIContentGenerator:
     def __init__(self):
@@ -133,11 +134,7 @@ class AIContentGenerator:
             else:  # 日曜日：参加型コンテンツ
                 content = f"見せて！あなたの{breed_name}の魅力😊\n\n{breed_name}の飼い主さん！\n愛猫の{self._get_breed_unique_feature(breed_info)}が撮れた奇跡の一枚を見せてくれませんか？\n\n#{breed_name}見せて のハッシュタグでお待ちしています！\n#猫のあれこれ"
             
-            posts.append({
-                "date": current_date.strftime('%Y-%m-%d'),
-                "content": content,
-                "char_count": len(content)
-            })
+            posts.append(self._make_post(current_date, content))
         
         return posts
 
@@ -185,11 +182,7 @@ class AIContentGenerator:
                 prevention_text = "\n".join(prevention_list)
                 content = f"獣医師からのお願い：愛猫の{topic}を防ぐために🙏\n\n予防と早期発見のポイント：\n\n{prevention_text}\n\n日々の観察が愛猫の健康寿命を延ばします。\n#猫のあれこれ"
             
-            posts.append({
-                "date": current_date.strftime('%Y-%m-%d'),
-                "content": content,
-                "char_count": len(content)
-            })
+            posts.append(self._make_post(current_date, content))
         
         return posts
 
@@ -224,15 +217,23 @@ class AIContentGenerator:
             else:
                 content = self._generate_daily_interactive_content(day, current_date)
             
-            posts.append({
-                "date": current_date.strftime('%Y-%m-%d'),
-                "content": content,
-                "char_count": len(content)
-            })
+            posts.append(self._make_post(current_date, content))
         
         return posts
 
     # ヘルパーメソッド群
+    def _make_post(self, current_date, content):
+        """投稿データを作成（トピック・動物種・キーワードを付与）"""
+        vocabulary = VOCABULARY.scan(content)
+        return {
+            "date": current_date.strftime('%Y-%m-%d'),
+            "content": content,
+            "char_count": len(content),
+            "animal_type": vocabulary['animal_type'],
+            "topic": vocabulary['topic'],
+            "keywords": vocabulary['keywords']
+        }
+
     def _get_breed_intro(self, breed_info):
         features = breed_info['特徴'][:3]
         feature_list = [f"✅{feature}" for feature in features]
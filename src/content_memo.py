@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本文ごとの派生値（正規化本文・コンテンツハッシュ・特徴量）のメモ化
+同じ本文の正規化（正規表現3回）・ハッシュ・特徴量抽出を繰り返さないよう、
+本文文字列をキーにした上限付きのLRUに保持する
+
+    - 上限を超えたら最も長く参照されていない本文から捨てる
+    - 特徴量は初めて必要になったときに計算する（ハッシュだけの本文では抽出しない）
+    - 返す特徴量の辞書は共有されるので、呼び出し側で変更しない
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+# 保持する本文の数の既定値（1件あたり本文・正規化本文・特徴量で数KB）
+DEFAULT_MAX_SIZE = 4096
+
+
+class ContentEntry:
+    """1本文分の派生値"""
+
+    __slots__ = ('normalized', 'content_hash', 'features')
+
+    def __init__(self, normalized: str, content_hash: str):
+        self.normalized = normalized
+        self.content_hash = content_hash
+        self.features: Optional[Dict] = None
+
+
+class ContentMemo:
+    def __init__(self, normalize: Callable[[str], str], hash_normalized: Callable[[str], str],
+                 max_size: int = DEFAULT_MAX_SIZE):
+        self.normalize = normalize
+        self.hash_normalized = hash_normalized
+        self.max_size = max_size
+        self.entries: 'OrderedDict[str, ContentEntry]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()  # GUIの生成ワーカーと画面側のスレッドから呼ばれるため
+
+    def entry(self, content: str) -> ContentEntry:
+        """本文の派生値（なければ正規化・ハッシュを計算して追加）"""
+        with self._lock:
+            entry = self.entries.get(content)
+            if entry is not None:
+                self.entries.move_to_end(content)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        normalized = self.normalize(content)
+        entry = ContentEntry(normalized, self.hash_normalized(normalized))
+        with self._lock:
+            self.entries[content] = entry
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+        return entry
+
+    def features(self, content: str, extract: Callable[[str, str], Dict]) -> Dict:
+        """本文の特徴量（extract(本文, 正規化本文) は本文ごとに1回だけ呼ばれる）"""
+        entry = self.entry(content)
+        if entry.features is None:
+            entry.features = extract(content, entry.normalized)
+        return entry.features
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict:
+        """保持数・上限・ヒット/ミス回数・ヒット率"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self.entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+重複検出記録のバッファと保持期間管理
+検出記録はメモリのバッファにためて一括で書き込み、試行した本文はコンテンツハッシュごとに
+1回だけ保存する（再生成の試行ごとに同じ本文を保存しない）。
+同じ (本文, 類似投稿, 理由) の検出は1行にまとめて回数を数え、古い記録は保持期間で削除する
+"""
+
+import threading
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from instrumentation import timed
+
+# この件数たまったら書き込む（それ以前は保存時・終了時にまとめて書き込む）
+DETECTION_BUFFER_SIZE = 200
+
+# 検出記録の保持期間（日）と最大行数（超えた分は古い順に削除）
+DETECTION_RETENTION_DAYS = 90
+DETECTION_MAX_ROWS = 10000
+
+# この行数を書き込むごとに整理する（各セッションの最初の書き込みでも整理する）
+DETECTION_COMPACT_INTERVAL = 1000
+
+CREATE_DETECTIONS_SQL = '''
+    CREATE TABLE IF NOT EXISTS duplicate_detections (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        attempted_hash TEXT NOT NULL,
+        similar_post_id INTEGER,
+        similarity_score REAL,
+        detection_reason TEXT,
+        hits INTEGER DEFAULT 1,
+        detected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (attempted_hash) REFERENCES attempted_contents (content_hash),
+        FOREIGN KEY (similar_post_id) REFERENCES post_history (id)
+    )
+'''
+
+INSERT_ATTEMPTED_SQL = '''
+    INSERT OR IGNORE INTO attempted_contents (content_hash, content, first_detected_at)
+    VALUES (?, ?, ?)
+'''
+
+INSERT_DETECTION_SQL = '''
+    INSERT INTO duplicate_detections
+    (attempted_hash, similar_post_id, similarity_score, detection_reason, hits, detected_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+
+def aggregate_detections(entries: List[Tuple]) -> List[Tuple]:
+    """(ハッシュ, 類似投稿ID, 類似度, 理由, 検出日時) を同じ (ハッシュ, 類似投稿ID, 理由) ごとに1行へまとめる"""
+    rows: Dict[Tuple, list] = {}
+    for content_hash, post_id, similarity, reason, detected_at in entries:
+        key = (content_hash, post_id, reason)
+        if key in rows:
+            row = rows[key]
+            row[2] = max(row[2], similarity)
+            row[4] += 1
+            row[5] = max(row[5], detected_at)
+        else:
+            rows[key] = [content_hash, post_id, similarity, reason, 1, detected_at]
+    return [tuple(row) for row in rows.values()]
+
+
+class DetectionLog:
+    def __init__(self, hash_content: Callable[[str], str], buffer_size: int = DETECTION_BUFFER_SIZE,
+                 retention_days: int = DETECTION_RETENTION_DAYS, max_rows: int = DETECTION_MAX_ROWS,
+                 compact_interval: int = DETECTION_COMPACT_INTERVAL):
+        self.hash_content = hash_content  # 旧形式の記録の移行用
+        self.buffer_size = buffer_size
+        self.retention_days = retention_days
+        self.max_rows = max_rows
+        self.compact_interval = compact_interval
+        self._entries: List[Tuple] = []
+        self._contents: Dict[str, Tuple[str, str]] = {}  # ハッシュ → (本文, 最初の検出日時)
+        self._rows_until_compaction = 0
+        self._lock = threading.Lock()
+
+    def create_schema(self, cursor):
+        """検出記録・試行本文テーブルを作成（本文を1行ずつ持つ旧形式は移行）"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS attempted_contents (
+                content_hash TEXT PRIMARY KEY,
+                content TEXT NOT NULL,
+                first_detected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        cursor.execute('PRAGMA table_info(duplicate_detections)')
+        legacy = 'attempted_content' in [column[1] for column in cursor.fetchall()]
+        if legacy:
+            cursor.execute('ALTER TABLE duplicate_detections RENAME TO duplicate_detections_legacy')
+
+        cursor.execute(CREATE_DETECTIONS_SQL)
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_detections_key
+            ON duplicate_detections(attempted_hash, similar_post_id, detection_reason)
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_detections_detected_at ON duplicate_detections(detected_at)')
+
+        if legacy:
+            cursor.execute('''
+                SELECT attempted_content, similar_post_id, similarity_score, detection_reason, detected_at
+                FROM duplicate_detections_legacy ORDER BY id
+            ''')
+            contents = {}
+            entries = []
+            for content, post_id, similarity, reason, detected_at in cursor.fetchall():
+                content_hash = self.hash_content(content)
+                contents.setdefault(content_hash, (content, detected_at))
+                entries.append((content_hash, post_id, similarity, reason, detected_at))
+            self._write(cursor, entries, contents)
+            cursor.execute('DROP TABLE duplicate_detections_legacy')
+
+    def record(self, content_hash: str, content: str, post_id: Optional[int], similarity: float, reason: str):
+        """検出をバッファに追加"""
+        detected_at = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        with self._lock:
+            self._contents.setdefault(content_hash, (content, detected_at))
+            self._entries.append((content_hash, post_id, similarity, reason, detected_at))
+
+    def pending(self) -> int:
+        """未書き込みの検出数"""
+        return len(self._entries)
+
+    def is_full(self) -> bool:
+        return len(self._entries) >= self.buffer_size
+
+    @timed('detection_log.flush')
+    def flush(self, cursor) -> int:
+        """バッファの検出を呼び出し元のトランザクションで書き込み、書き込んだ行数を返す"""
+        with self._lock:
+            entries, self._entries = self._entries, []
+            contents, self._contents = self._contents, {}
+        if not entries:
+            return 0
+
+        try:
+            written = self._write(cursor, entries, contents)
+        except BaseException:
+            # 書き込めなかった分はバッファに戻す（次回の書き込みで再試行）
+            with self._lock:
+                self._entries[:0] = entries
+                for content_hash, value in contents.items():
+                    self._contents.setdefault(content_hash, value)
+            raise
+
+        self._rows_until_compaction -= written
+        if self._rows_until_compaction <= 0:
+            self.compact(cursor)
+        return written
+
+    def _write(self, cursor, entries: List[Tuple], contents: Dict[str, Tuple[str, str]]) -> int:
+        cursor.executemany(INSERT_ATTEMPTED_SQL, [
+            (content_hash, content, detected_at) for content_hash, (content, detected_at) in contents.items()
+        ])
+        rows = aggregate_detections(entries)
+        cursor.executemany(INSERT_DETECTION_SQL, rows)
+        return len(rows)
+
+    def compact(self, cursor) -> Dict[str, int]:
+        """保持期間切れ・最大行数超過の記録を削除し、同じ検出の重複行を1行にまとめる"""
+        stats = {}
+        cursor.execute('DELETE FROM duplicate_detections WHERE detected_at < datetime(\'now\', ?)',
+                       (f'-{self.retention_days} days',))
+        stats['expired'] = cursor.rowcount
+
+        cursor.execute('''
+            SELECT attempted_hash, similar_post_id, detection_reason,
+                   MIN(id), SUM(hits), MAX(similarity_score), MAX(detected_at)
+            FROM duplicate_detections
+            GROUP BY attempted_hash, similar_post_id, detection_reason
+            HAVING COUNT(*) > 1
+        ''')
+        merged = 0
+        for content_hash, post_id, reason, keep_id, hits, similarity, detected_at in cursor.fetchall():
+            cursor.execute('''
+                DELETE FROM duplicate_detections
+                WHERE attempted_hash = ? AND similar_post_id IS ? AND detection_reason IS ? AND id != ?
+            ''', (content_hash, post_id, reason, keep_id))
+            merged += cursor.rowcount
+            cursor.execute('''
+                UPDATE duplicate_detections SET hits = ?, similarity_score = ?, detected_at = ?
+                WHERE id = ?
+            ''', (hits, similarity, detected_at, keep_id))
+        stats['merged'] = merged
+
+        cursor.execute('''
+            DELETE FROM duplicate_detections WHERE id NOT IN (
+                SELECT id FROM duplicate_detections ORDER BY detected_at DESC, id DESC LIMIT ?
+            )
+        ''', (self.max_rows,))
+        stats['trimmed'] = cursor.rowcount
+
+        cursor.execute('''
+            DELETE FROM attempted_contents
+            WHERE content_hash NOT IN (SELECT attempted_hash FROM duplicate_detections)
+        ''')
+        stats['orphaned_contents'] = cursor.rowcount
+
+        self._rows_until_compaction = self.compact_interval
+        return stats
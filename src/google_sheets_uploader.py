@@ -6,18 +6,28 @@ VET-Assistant2で生成されたCSVをGoogleスプレッドシートに自動ア
 """
 
 import gspread
-import pandas as pd
 import os
 from google.oauth2.service_account import Credentials
 from datetime import datetime
 import tkinter as tk
 from tkinter import messagebox, filedialog
+from sheets_upload_pipeline import (
+    SheetsUploadPipeline, UploadJournal, JOURNAL_PATH, POST_RECORD_FIELDS, as_post_records, schedule_rows, upload_key
+)
+
+# アップロード失敗時の案内（書き込み済みの行はジャーナルに記録されている）
+RESUME_NOTE = "\n\n書き込み済みの行は記録されています。もう一度実行すると続きから再開します。"
 
 class GoogleSheetsUploader:
     def __init__(self):
         self.credentials_path = None
         self.client = None
         self.spreadsheet_url = None
+        self.journal_path = JOURNAL_PATH  # 書き込み済み行範囲の記録（中断時の再開用）
+        # アップロード結果の通知と再試行などのログ（GUIはワーカースレッドから画面へ渡す関数に差し替える）
+        self.show_info = messagebox.showinfo
+        self.show_error = messagebox.showerror
+        self.log = print
         
     def setup_credentials(self, credentials_path=None):
         """
@@ -60,164 +70,109 @@ class GoogleSheetsUploader:
         """
         self.spreadsheet_url = url
     
-    def upload_csv_to_sheet(self, csv_file_path, sheet_name=None, clear_existing=True):
+    def create_pipeline(self) -> SheetsUploadPipeline:
+        """スプレッドシートを開き、レート制限・再試行・再開に対応したパイプラインを返す"""
+        pipeline = SheetsUploadPipeline(journal=UploadJournal(self.journal_path), log=self.log)
+        pipeline.open(self.client, self.spreadsheet_url)
+        return pipeline
+    
+    def upload_csv_to_sheet(self, posts, sheet_name=None, clear_existing=True):
         """
         CSVファイルをGoogleスプレッドシートにアップロード
         
         Args:
-            csv_file_path: アップロードするCSVファイルのパス
+            posts: アップロードするCSVファイルのパス、または投稿レコード（投稿日時・投稿内容・文字数）のリスト
             sheet_name: シート名（Noneの場合は自動生成）
             clear_existing: 既存データをクリアするかどうか
         """
         if not self.client:
-            messagebox.showerror("エラー", "Google Sheets APIの認証が完了していません")
+            self.show_error("エラー", "Google Sheets APIの認証が完了していません")
             return False
             
         if not self.spreadsheet_url:
-            messagebox.showerror("エラー", "アップロード先のスプレッドシートURLが設定されていません")
+            self.show_error("エラー", "アップロード先のスプレッドシートURLが設定されていません")
             return False
             
         try:
             # スプレッドシートを開く
-            spreadsheet = self.client.open_by_url(self.spreadsheet_url)
+            pipeline = self.create_pipeline()
             
-            # CSVファイルを読み込み
-            df = pd.read_csv(csv_file_path)
+            # CSVファイルを読み込み（生成直後の投稿レコードはそのまま使う）
+            records = as_post_records(posts)
             
             # シート名を決定
             if sheet_name is None:
                 now = datetime.now()
                 sheet_name = f"投稿スケジュール_{now.strftime('%Y%m%d_%H%M')}"
             
-            # シートが存在するかチェック
-            try:
-                worksheet = spreadsheet.worksheet(sheet_name)
-                if clear_existing:
-                    worksheet.clear()
-            except gspread.WorksheetNotFound:
-                # シートが存在しない場合は新規作成
-                worksheet = spreadsheet.add_worksheet(
-                    title=sheet_name, 
-                    rows=len(df) + 10, 
-                    cols=len(df.columns) + 2
-                )
-            
-            # データをアップロード
-            # ヘッダーをアップロード
-            header_range = f"A1:{chr(ord('A') + len(df.columns) - 1)}1"
-            worksheet.update(header_range, [df.columns.tolist()])
-            
-            # データをアップロード
-            if len(df) > 0:
-                data_range = f"A2:{chr(ord('A') + len(df.columns) - 1)}{len(df) + 1}"
-                worksheet.update(data_range, df.values.tolist())
+            # ヘッダーとデータを行範囲ごとにアップロード（中断した場合は続きから再開）
+            header = list(records[0]) if records else POST_RECORD_FIELDS
+            result = pipeline.upload_rows(
+                upload_key(self.spreadsheet_url, records, 'values'),
+                sheet_name, header, [[record.get(column, "") for column in header] for record in records],
+                clear_existing
+            )
+            sheet_name = result['sheet_name']
             
             # 成功メッセージ
-            messagebox.showinfo(
+            self.show_info(
                 "アップロード完了", 
                 f"Googleスプレッドシートへのアップロードが完了しました!\n"
                 f"シート名: {sheet_name}\n"
-                f"行数: {len(df)}件"
+                f"行数: {len(records)}件"
             )
             
             return True
             
         except Exception as e:
-            messagebox.showerror("アップロードエラー", f"アップロードに失敗しました:\n{str(e)}")
+            self.show_error("アップロードエラー", f"アップロードに失敗しました:\n{str(e)}{RESUME_NOTE}")
             return False
     
-    def create_formatted_schedule_sheet(self, csv_file_path):
+    def create_formatted_schedule_sheet(self, posts):
         """
-        フォーマット済みの投稿スケジュールシートを作成
+        フォーマット済みの投稿スケジュールシートを作成（既存シートがあれば差分同期）
+        
+        Args:
+            posts: CSVファイルのパス、または投稿レコード（投稿日時・投稿内容・文字数）のリスト
         """
         if not self.client or not self.spreadsheet_url:
             return False
             
         try:
-            spreadsheet = self.client.open_by_url(self.spreadsheet_url)
-            df = pd.read_csv(csv_file_path)
-            
-            # 新しいシート名
-            now = datetime.now()
-            sheet_name = f"投稿スケジュール_{now.strftime('%Y年%m月%d日')}"
-            
-            # 既存シートの削除（同名があれば）
-            try:
-                old_sheet = spreadsheet.worksheet(sheet_name)
-                spreadsheet.del_worksheet(old_sheet)
-            except gspread.WorksheetNotFound:
-                pass
-            
-            # 新しいシートを作成
-            worksheet = spreadsheet.add_worksheet(
-                title=sheet_name,
-                rows=len(df) + 10,
-                cols=6
+            pipeline = self.create_pipeline()
+            records = as_post_records(posts)
+            
+            # シート名はスケジュールの開始日（同じスケジュールの再アップロードは同じシートに同期）
+            start_date = min((str(record['投稿日時'])[:10] for record in records), default=None)
+            if start_date:
+                start_date = datetime.strptime(start_date, '%Y-%m-%d')
+            else:
+                start_date = datetime.now()
+            sheet_name = f"投稿スケジュール_{start_date.strftime('%Y年%m月%d日')}"
+            
+            # 既存シートとは差分だけを書き込み、投稿済み・備考の入力は残す（長いスケジュールは自動で分割）
+            result = pipeline.sync_schedule(
+                upload_key(self.spreadsheet_url, records, 'formatted'),
+                sheet_name, schedule_rows(records)
             )
-            
-            # ヘッダーの設定
-            headers = ["投稿日時", "投稿内容", "文字数", "投稿済み", "備考", "ハッシュタグ"]
-            worksheet.update("A1:F1", [headers])
-            
-            # データの挿入
-            for i, row in df.iterrows():
-                worksheet.update(f"A{i+2}", row['投稿日時'])
-                worksheet.update(f"B{i+2}", row['投稿内容'])
-                worksheet.update(f"C{i+2}", row['文字数'])
-                worksheet.update(f"D{i+2}", "未投稿")  # デフォルト値
-                
-                # ハッシュタグの抽出
-                content = row['投稿内容']
-                hashtags = []
-                if '#猫のあれこれ' in content:
-                    hashtags.append('#猫のあれこれ')
-                if '#獣医が教える犬のはなし' in content:
-                    hashtags.append('#獣医が教える犬のはなし')
-                
-                worksheet.update(f"F{i+2}", ', '.join(hashtags))
-            
-            # セルの書式設定
-            # ヘッダー行を太字に
-            worksheet.format("A1:F1", {
-                "textFormat": {"bold": True},
-                "backgroundColor": {"red": 0.9, "green": 0.9, "blue": 0.9}
-            })
-            
-            # 投稿済み列にデータ検証を追加
-            worksheet.batch_update([{
-                'setDataValidation': {
-                    'range': {
-                        'sheetId': worksheet.id,
-                        'startRowIndex': 1,
-                        'endRowIndex': len(df) + 1,
-                        'startColumnIndex': 3,
-                        'endColumnIndex': 4
-                    },
-                    'rule': {
-                        'condition': {
-                            'type': 'ONE_OF_LIST',
-                            'values': [
-                                {'userEnteredValue': '未投稿'},
-                                {'userEnteredValue': '投稿済み'},
-                                {'userEnteredValue': '下書き'}
-                            ]
-                        },
-                        'showCustomUi': True
-                    }
-                }
-            }])
-            
-            messagebox.showinfo(
+            sheet_name = result['sheet_name']
+            
+            if result['created']:
+                message = "投稿管理用のシートを作成しました!\n"
+            else:
+                message = ("既存の投稿管理シートを更新しました!\n"
+                           f"更新セル: {result['updated_cells']}件 / 追加行: {result['appended_rows']}件\n")
+            self.show_info(
                 "フォーマット済みシート作成完了",
-                f"投稿管理用のシートを作成しました!\n"
+                message +
                 f"シート名: {sheet_name}\n"
-                f"投稿予定: {len(df)}件"
+                f"投稿予定: {len(records)}件"
             )
             
             return True
             
         except Exception as e:
-            messagebox.showerror("シート作成エラー", f"フォーマット済みシートの作成に失敗しました:\n{str(e)}")
+            self.show_error("シート作成エラー", f"フォーマット済みシートの作成に失敗しました:\n{str(e)}{RESUME_NOTE}")
             return False
 
 # 使用例とテスト用の関数
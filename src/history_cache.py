@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+投稿履歴のメモリキャッシュ
+重複チェック対象期間（created_at が直近数か月）の投稿を __slots__ のレコードで保持し、
+LSHバケットとコンテンツハッシュもメモリ上に持つことで、同じセッション内の
+繰り返しの重複チェックでは SQLite を読まずに済ませる
+（保持するのは類似度の計算に使う列のみ。本文などの表示用の列は重複と判定した投稿だけ読む）
+
+    - 投稿の保存時にレコードを追加し、期間から外れた投稿は created_at の古い順に追い出す
+    - ハッシュは履歴全件分を持つ（完全一致は期間に関係なく判定するため）
+    - 同じDBに他のプロセスが書き込んだ場合は refresh() / invalidate() で読み直す
+"""
+
+import bisect
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from history_partitions import ALL_POSTS, to_epoch
+from instrumentation import timed
+
+
+def window_cutoff(months_back: int) -> str:
+    """重複チェック対象期間の開始日時（created_at と同じ書式）"""
+    return (datetime.now() - timedelta(days=months_back * 30)).strftime('%Y-%m-%d %H:%M:%S')
+
+
+class HistoryRecord:
+    """キャッシュする履歴1件（特徴量辞書と同じく record['normalized'] でも参照できる）"""
+
+    __slots__ = ('id', 'content_hash', 'normalized', 'keywords', 'main_points',
+                 'animal_type', 'topic', 'created_at', 'band_keys')
+
+    def __init__(self, post_id: int, content_hash: str, features: Dict,
+                 animal_type: Optional[str], topic: Optional[str], created_at: str,
+                 band_keys: Iterable[Tuple[int, bytes]]):
+        self.id = post_id
+        self.content_hash = content_hash
+        self.normalized = features['normalized']
+        self.keywords = tuple(features['keywords'])
+        self.main_points = tuple(features['main_points'])
+        self.animal_type = animal_type
+        self.topic = topic
+        self.created_at = created_at
+        self.band_keys = tuple(band_keys)
+
+    def __getitem__(self, key: str):
+        return getattr(self, key)
+
+
+class HistoryCache:
+    def __init__(self, monitor):
+        self.monitor = monitor
+        self.records: Dict[int, HistoryRecord] = {}
+        self.hashes: Dict[str, int] = {}  # コンテンツハッシュ → 最小の投稿ID（履歴全件）
+        self.buckets: Dict[Tuple[int, bytes], set] = {}  # LSHバケット → 投稿ID（期間内のみ）
+        self.months_back = 0  # これまでに要求された最長の対象期間
+        self.window_start: Optional[str] = None  # 読み込み済みの期間の開始日時（None は未読み込み）
+        self.max_id = 0  # 読み込み済みの最大ID（追加分の読み直しの起点）
+        self._order: List[Tuple[str, int]] = []  # (created_at, id) の昇順（追い出し用）
+        self._stale = False
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def ensure(self, cursor, months_back: int):
+        """対象期間のレコードを用意（SQLite を読むのは初回・期間の拡大・追加分の読み直しのときのみ）"""
+        with self._lock:
+            self.months_back = max(self.months_back, months_back)
+            cutoff = window_cutoff(self.months_back)
+            if self.window_start is None:
+                self._load_hashes(cursor, 0)
+                self._load_records(cursor, 'created_epoch > ?', [], to_epoch(cutoff))
+                self.window_start = cutoff
+                return
+
+            if self._stale:
+                max_id = self.max_id
+                self._load_hashes(cursor, max_id)
+                self._load_records(cursor, 'id > ? AND created_epoch > ?', [max_id], to_epoch(self.window_start))
+                self._stale = False
+
+            if cutoff < self.window_start:
+                self._load_records(cursor, 'created_epoch <= ? AND created_epoch > ?',
+                                   [to_epoch(self.window_start)], to_epoch(cutoff))
+                self.window_start = cutoff
+            elif cutoff > self.window_start:
+                self.evict(cutoff)
+
+    @timed('history_cache.load_hashes')
+    def _load_hashes(self, cursor, after_id: int):
+        cursor.execute(f'SELECT content_hash, id FROM {ALL_POSTS} WHERE id > ?', (after_id,))
+        for content_hash, post_id in cursor.fetchall():
+            self._add_hash(content_hash, post_id)
+            self.max_id = max(self.max_id, post_id)
+
+    @timed('history_cache.load_records')
+    def _load_records(self, cursor, where: str, params: list, since: int):
+        """作成日時が since（UNIX時刻、where の最後のパラメータ）より新しい投稿を読む（直近の範囲に収まれば post_history のみ）"""
+        table = self.monitor.history_partitions.table_for(cursor, since)
+        params = params + [since]
+        cursor.execute(f'''
+            SELECT b.post_id, b.band, b.bucket FROM post_lsh_buckets b
+            WHERE b.post_id IN (SELECT id FROM {table} WHERE {where})
+        ''', params)
+        band_keys = {}
+        for post_id, band, bucket in cursor.fetchall():
+            band_keys.setdefault(post_id, []).append((band, bucket))
+
+        for post in self.monitor._feature_rows(cursor, where, params, table):
+            if post['id'] not in self.records and post['created_at'] is not None:
+                self._insert(HistoryRecord(
+                    post['id'], post['content_hash'], self.monitor._post_features(post),
+                    post['animal_type'], post['topic'], post['created_at'], band_keys.get(post['id'], ())
+                ))
+
+    def _add_hash(self, content_hash: str, post_id: int):
+        if post_id < self.hashes.get(content_hash, post_id + 1):
+            self.hashes[content_hash] = post_id
+
+    def add(self, record: HistoryRecord):
+        """レコードを追加（保存直後の投稿など。期間外・未読み込みの場合はハッシュのみ）"""
+        with self._lock:
+            if self.window_start is None:
+                return
+            self._add_hash(record.content_hash, record.id)
+            if record.created_at is None or record.created_at <= self.window_start or record.id in self.records:
+                return
+            self._insert(record)
+
+    def _insert(self, record: HistoryRecord):
+        self.records[record.id] = record
+        bisect.insort(self._order, (record.created_at, record.id))
+        for key in record.band_keys:
+            self.buckets.setdefault(key, set()).add(record.id)
+
+    def evict(self, cutoff: str) -> int:
+        """created_at が cutoff 以前のレコードを追い出す"""
+        with self._lock:
+            end = bisect.bisect_right(self._order, (cutoff, float('inf')))
+            for _, post_id in self._order[:end]:
+                record = self.records.pop(post_id)
+                for key in record.band_keys:
+                    bucket = self.buckets[key]
+                    bucket.discard(post_id)
+                    if not bucket:
+                        del self.buckets[key]
+            del self._order[:end]
+            self.window_start = max(self.window_start, cutoff)
+            return end
+
+    def refresh(self):
+        """他の接続で追加された投稿を次回の ensure() で読み込む（コミット後に呼ぶ）"""
+        with self._lock:
+            self._stale = True
+
+    def invalidate(self):
+        """キャッシュを破棄（投稿の削除や特徴量の再計算の後に呼ぶ）"""
+        with self._lock:
+            self.records.clear()
+            self.hashes.clear()
+            self.buckets.clear()
+            self._order.clear()
+            self.window_start = None
+            self.max_id = 0
+            self._stale = False
+
+    def exact_match(self, content_hash: str) -> Optional[int]:
+        """同じハッシュの投稿のうち最小のID"""
+        return self.hashes.get(content_hash)
+
+    def candidates(self, band_keys: Iterable[Tuple[int, bytes]], cutoff: str) -> List[HistoryRecord]:
+        """バケットを共有する期間内の投稿（created_at の新しい順）"""
+        with self._lock:
+            post_ids = set()
+            for key in band_keys:
+                post_ids.update(self.buckets.get(key, ()))
+            records = [self.records[post_id] for post_id in post_ids]
+        records = [record for record in records if record.created_at > cutoff]
+        records.sort(key=lambda record: (record.created_at, record.id), reverse=True)
+        return records
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+投稿履歴の期間による分割（直近の投稿と古い投稿）
+post_history には直近 HOT_WINDOW_DAYS 日の投稿だけを置き、それより古い投稿は
+post_history_archive に移す。両方をまとめて読む場合はビュー post_history_all を使う
+
+    - 作成日時は整数のUNIX時刻（created_epoch、created_at を UTC として変換）でも持ち、
+      インデックスを張って期間の絞り込みに使う（列の値はトリガーで設定）
+    - 移動は ROTATION_INTERVAL_SECONDS ごとに起動時に行う（rotate コマンドで手動実行も可）
+    - 投稿IDは移動しても変わらない（LSHバケット・類似度行列・検出記録はIDで参照したまま）
+    - 重複チェックの対象期間が直近の範囲に収まる限り、読むのは post_history だけになるため、
+      取り込んだ過去投稿が何年分あっても期間内の読み込み量は変わらない
+"""
+
+import calendar
+import time
+from typing import Optional
+
+# 直近の投稿として post_history に置く日数（GUIの重複チェック期間の最大 24か月 = 720日 を含む）
+HOT_WINDOW_DAYS = 750
+
+# 古い投稿を移動する間隔（秒）
+ROTATION_INTERVAL_SECONDS = 24 * 60 * 60
+
+HOT_TABLE = 'post_history'
+ARCHIVE_TABLE = 'post_history_archive'
+ALL_POSTS = 'post_history_all'  # 両方の UNION ALL ビュー
+
+# 移動・ビューで使う列（post_history と同じ順）
+POST_COLUMNS = '''
+    id, content, content_hash, normalized_content, post_type, animal_type, topic,
+    keywords, main_points, char_count, created_at, source, feature_version, created_epoch
+'''
+
+# created_at（'YYYY-MM-DD HH:MM:SS'）をUNIX時刻に変換するSQL式
+EPOCH_SQL = "CAST(strftime('%s', {}) AS INTEGER)"
+
+
+def to_epoch(timestamp: str) -> int:
+    """created_at と同じ書式の日時をUNIX時刻に（SQLの strftime('%s') と同じく UTC として変換）"""
+    return calendar.timegm(time.strptime(timestamp, '%Y-%m-%d %H:%M:%S'))
+
+
+class HistoryPartitions:
+    def __init__(self, hot_window_days: int = HOT_WINDOW_DAYS):
+        self.hot_window_days = hot_window_days
+
+    def create_schema(self, cursor):
+        """古い投稿のテーブル・ビュー・作成日時のUNIX時刻列とトリガー・移動状況のテーブルを作成"""
+        cursor.execute('PRAGMA table_info(post_history)')
+        if 'created_epoch' not in [column[1] for column in cursor.fetchall()]:
+            cursor.execute('ALTER TABLE post_history ADD COLUMN created_epoch INTEGER')
+        cursor.execute(f'''
+            UPDATE post_history SET created_epoch = {EPOCH_SQL.format('created_at')}
+            WHERE created_epoch IS NULL AND created_at IS NOT NULL
+        ''')
+
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS {ARCHIVE_TABLE} (
+                id INTEGER PRIMARY KEY,
+                content TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                normalized_content TEXT NOT NULL,
+                post_type TEXT,
+                animal_type TEXT,
+                topic TEXT,
+                keywords TEXT,
+                main_points TEXT,
+                char_count INTEGER,
+                created_at TIMESTAMP,
+                source TEXT,
+                feature_version INTEGER DEFAULT 0,
+                created_epoch INTEGER
+            )
+        ''')
+        cursor.execute(f'CREATE VIEW IF NOT EXISTS {ALL_POSTS} AS '
+                       f'SELECT {POST_COLUMNS} FROM {HOT_TABLE} UNION ALL SELECT {POST_COLUMNS} FROM {ARCHIVE_TABLE}')
+
+        for table in (HOT_TABLE, ARCHIVE_TABLE):
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_created_epoch ON {table}(created_epoch)')
+            # 作成日時を設定・変更した行のUNIX時刻を更新
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {table}_epoch_insert AFTER INSERT ON {table}
+                WHEN new.created_epoch IS NULL AND new.created_at IS NOT NULL BEGIN
+                    UPDATE {table} SET created_epoch = {EPOCH_SQL.format('new.created_at')} WHERE id = new.id;
+                END
+            ''')
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {table}_epoch_update AFTER UPDATE OF created_at ON {table} BEGIN
+                    UPDATE {table} SET created_epoch = {EPOCH_SQL.format('new.created_at')} WHERE id = new.id;
+                END
+            ''')
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{ARCHIVE_TABLE}_content_hash ON {ARCHIVE_TABLE}(content_hash)')
+        # 期間の絞り込みは created_epoch で行うため、文字列の作成日時のインデックスは不要
+        cursor.execute('DROP INDEX IF EXISTS idx_created_at')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS post_history_partition_state (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                hot_since INTEGER NOT NULL,
+                rotated_at INTEGER NOT NULL
+            )
+        ''')
+        cursor.execute('INSERT OR IGNORE INTO post_history_partition_state (id, hot_since, rotated_at) VALUES (1, 0, 0)')
+
+    def hot_since(self, cursor) -> int:
+        """post_history に置いている投稿の作成日時の下限（これより新しい投稿は必ず post_history にある）"""
+        cursor.execute('SELECT hot_since FROM post_history_partition_state WHERE id = 1')
+        row = cursor.fetchone()
+        return row[0] if row else 0
+
+    def table_for(self, cursor, cutoff_epoch: Optional[int]) -> str:
+        """作成日時が cutoff_epoch より新しい投稿を読むテーブル（古い投稿が含まれる場合はビュー）"""
+        if cutoff_epoch is not None and cutoff_epoch >= self.hot_since(cursor):
+            return HOT_TABLE
+        return ALL_POSTS
+
+    def rotate_if_due(self, cursor, now: Optional[int] = None) -> Optional[int]:
+        """前回の移動から ROTATION_INTERVAL_SECONDS 経っていれば移動し、移動した件数を返す（未実行は None）"""
+        now = int(time.time()) if now is None else now
+        cursor.execute('SELECT rotated_at FROM post_history_partition_state WHERE id = 1')
+        row = cursor.fetchone()
+        if row and now - row[0] < ROTATION_INTERVAL_SECONDS:
+            return None
+        return self.rotate(cursor, now)
+
+    def rotate(self, cursor, now: Optional[int] = None) -> int:
+        """直近の期間から外れた投稿を古い投稿のテーブルへ、期間内に戻った投稿を post_history へ移す"""
+        now = int(time.time()) if now is None else now
+        hot_since = now - self.hot_window_days * 24 * 60 * 60
+
+        cursor.execute(f'''
+            INSERT INTO {ARCHIVE_TABLE} ({POST_COLUMNS})
+            SELECT {POST_COLUMNS} FROM {HOT_TABLE} WHERE created_epoch < ?
+        ''', (hot_since,))
+        moved = cursor.rowcount
+        cursor.execute(f'DELETE FROM {HOT_TABLE} WHERE created_epoch < ?', (hot_since,))
+
+        # 期間を延ばした場合などは古い投稿のテーブルから戻す
+        cursor.execute(f'''
+            INSERT INTO {HOT_TABLE} ({POST_COLUMNS})
+            SELECT {POST_COLUMNS} FROM {ARCHIVE_TABLE} WHERE created_epoch >= ?
+        ''', (hot_since,))
+        moved += cursor.rowcount
+        cursor.execute(f'DELETE FROM {ARCHIVE_TABLE} WHERE created_epoch >= ?', (hot_since,))
+
+        cursor.execute('UPDATE post_history_partition_state SET hot_since = ?, rotated_at = ? WHERE id = 1',
+                       (hot_since, now))
+        return moved
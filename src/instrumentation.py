@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+処理時間の計測（スパン・カウンタ）
+重複チェック・類似度計算・保存・ログ描画・Sheets API呼び出しなどの区間ごとに
+回数・合計・最大時間を集計し、実行ごとのプロファイルをJSONに書き出す
+
+    with span('monitor.check_duplicate'):
+        ...
+    count('monitor.duplicates')
+
+既定では無効で、無効の間は span() が共有のダミーを返すだけ（計測・ロックなし）。
+環境変数 VET_ASSISTANT_PROFILE を設定するか enable() を呼ぶと有効になる
+（区間は入れ子にできるが、外側の区間の時間には内側の区間の時間も含まれる）
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+# 計測を有効にする環境変数（値は 1 / true、またはプロファイルのJSONを保存するフォルダ）
+PROFILE_ENV = 'VET_ASSISTANT_PROFILE'
+
+# GUIのログに表示する区間の数（合計時間の長い順）
+SUMMARY_LIMIT = 12
+
+
+class _NullSpan:
+    """無効時の区間（何もしない）"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('profiler', 'name', 'started')
+
+    def __init__(self, profiler: 'Profiler', name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.record(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        self.spans: Dict[str, list] = {}  # 区間名 → [回数, 合計秒, 最大秒]
+        self.counters: Dict[str, int] = {}
+        self.started_at = datetime.now()
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        """集計を破棄して新しい実行の計測を始める"""
+        with self._lock:
+            self.spans = {}
+            self.counters = {}
+            self.started_at = datetime.now()
+
+    def span(self, name: str):
+        """with 文で使う計測区間"""
+        return _Span(self, name) if self.enabled else NULL_SPAN
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            stats = self.spans.get(name)
+            if stats is None:
+                self.spans[name] = [1, seconds, seconds]
+            else:
+                stats[0] += 1
+                stats[1] += seconds
+                if seconds > stats[2]:
+                    stats[2] = seconds
+
+    def count(self, name: str, value: int = 1):
+        """カウンタに加算"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def timed(self, name: str) -> Callable:
+        """関数全体を計測区間にするデコレータ（無効時は呼び出しを1段挟むだけ）"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - started)
+            return wrapper
+        return decorator
+
+    def snapshot(self) -> Dict:
+        """集計結果（区間ごとの回数・合計・平均・最大ミリ秒とカウンタ）"""
+        with self._lock:
+            spans = {name: list(stats) for name, stats in self.spans.items()}
+            counters = dict(self.counters)
+        return {
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'elapsed_seconds': (datetime.now() - self.started_at).total_seconds(),
+            'spans': {
+                name: {'count': count, 'total_ms': total * 1000, 'mean_ms': total / count * 1000,
+                       'max_ms': longest * 1000}
+                for name, (count, total, longest) in sorted(spans.items(), key=lambda item: -item[1][1])
+            },
+            'counters': dict(sorted(counters.items()))
+        }
+
+    def summary_lines(self, limit: int = SUMMARY_LIMIT) -> List[str]:
+        """区間ごとの集計を合計時間の長い順に1行ずつ（GUIのログ表示用）"""
+        snapshot = self.snapshot()
+        lines = [f"⏱️ 処理時間の内訳（{snapshot['elapsed_seconds']:.1f}秒間）"]
+        for name, stats in list(snapshot['spans'].items())[:limit]:
+            lines.append(f"   {name}: {stats['total_ms']:.1f}ms / {stats['count']}回 "
+                         f"(平均 {stats['mean_ms']:.2f}ms, 最大 {stats['max_ms']:.1f}ms)")
+        if snapshot['counters']:
+            lines.append("   " + ", ".join(f"{name}={value}" for name, value in snapshot['counters'].items()))
+        return lines
+
+    def dump(self, path: str, **meta) -> str:
+        """集計結果をJSONに保存（meta は実行の種類などの付加情報）"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(dict(meta, **self.snapshot()), f, ensure_ascii=False, indent=2)
+        return path
+
+
+# プロセス全体で共有する計測器
+PROFILER = Profiler()
+span = PROFILER.span
+count = PROFILER.count
+timed = PROFILER.timed
+
+
+def is_enabled() -> bool:
+    return PROFILER.enabled
+
+
+def enable_from_env() -> Optional[str]:
+    """環境変数が設定されていれば計測を有効にし、プロファイルの保存先フォルダを返す（指定なしは None）"""
+    value = os.environ.get(PROFILE_ENV, '').strip()
+    if not value or value.lower() in ('0', 'false', 'no'):
+        return None
+    PROFILER.enable()
+    return None if value.lower() in ('1', 'true', 'yes') else value
+
+
+def profile_path(directory: str, label: str) -> str:
+    """実行ごとのプロファイルの保存先（フォルダ/profile_<種類>_<日時>.json）"""
+    return os.path.join(directory, f"profile_{label}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MinHash-LSH 近似重複候補インデックス
+正規化済み投稿の文字n-gramとキーワード集合からMinHash署名を作り、
+バンド単位のバケットをSQLiteに永続化して、重い類似度計算の前に候補投稿を絞り込む
+"""
+
+import hashlib
+import json
+import struct
+from typing import Iterable, List, Set, Tuple
+
+from history_partitions import ALL_POSTS
+
+
+class MinHashLSHIndex:
+    def __init__(self, ngram_size: int = 3, num_perm: int = 64, bands: int = 32,
+                 keyword_bands: int = 4):
+        if num_perm % bands != 0:
+            raise ValueError("num_perm は bands で割り切れる必要があります")
+
+        self.ngram_size = ngram_size
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands  # 1バンドあたりの行数
+        # 類似度の40%はキーワード一致で決まるため、本文の重なりが小さくても
+        # キーワード集合が近い投稿を拾えるよう1行1バンドのキーワード署名を併用する
+        self.keyword_bands = keyword_bands
+        self._pack_band = struct.Struct(f'<{self.rows}I').pack
+
+    def create_schema(self, cursor):
+        """バケットテーブルを作成（新規作成時は既存の投稿を登録）"""
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'post_lsh_buckets'")
+        exists = cursor.fetchone() is not None
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS post_lsh_buckets (
+                band INTEGER NOT NULL,
+                bucket BLOB NOT NULL,
+                post_id INTEGER NOT NULL,
+                FOREIGN KEY (post_id) REFERENCES post_history (id)
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_lsh_bucket ON post_lsh_buckets(band, bucket)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_lsh_post_id ON post_lsh_buckets(post_id)')
+        # 登録漏れの確認は全投稿を読むため、起動のたびには行わない（以降は migrate で補完）
+        if not exists:
+            self.index_missing(cursor)
+
+    def shingles(self, normalized_content: str) -> Set[str]:
+        """文字n-gramの集合を作成"""
+        n = self.ngram_size
+        if len(normalized_content) <= n:
+            return {normalized_content} if normalized_content else set()
+        return {normalized_content[i:i + n] for i in range(len(normalized_content) - n + 1)}
+
+    @staticmethod
+    def signature(tokens: Iterable[str], num_perm: int) -> Tuple[int, ...]:
+        """MinHash署名を計算（1トークンにつき1回のハッシュで全順列分の値を得る）"""
+        unpack = struct.Struct(f'<{num_perm}I').unpack
+        hashed = [
+            unpack(hashlib.shake_128(token.encode('utf-8')).digest(4 * num_perm))
+            for token in tokens
+        ]
+        if not hashed:
+            return ()
+        return tuple(map(min, zip(*hashed)))
+
+    def band_keys(self, normalized_content: str, keywords: Iterable[str] = ()) -> List[Tuple[int, bytes]]:
+        """署名をバンドに分割したバケットキーを返す"""
+        keys = []
+
+        signature = self.signature(self.shingles(normalized_content), self.num_perm)
+        if signature:
+            rows = self.rows
+            keys.extend(
+                (band, self._pack_band(*signature[band * rows:(band + 1) * rows]))
+                for band in range(self.bands)
+            )
+
+        keyword_signature = self.signature(set(keywords), self.keyword_bands)
+        keys.extend(
+            (self.bands + band, struct.pack('<I', value))
+            for band, value in enumerate(keyword_signature)
+        )
+
+        return keys
+
+    def add(self, cursor, post_id: int, normalized_content: str,
+            keywords: Iterable[str] = ()) -> List[Tuple[int, bytes]]:
+        """投稿をインデックスに登録し、登録したバケットキーを返す"""
+        keys = self.band_keys(normalized_content, keywords)
+        cursor.executemany(
+            'INSERT INTO post_lsh_buckets (band, bucket, post_id) VALUES (?, ?, ?)',
+            [(band, bucket, post_id) for band, bucket in keys]
+        )
+        return keys
+
+    def index_missing(self, cursor) -> int:
+        """未登録の投稿をインデックスに追加（テーブルの新規作成時と migrate で実行）"""
+        cursor.execute(f'''
+            SELECT id, normalized_content, keywords FROM {ALL_POSTS}
+            WHERE id NOT IN (SELECT DISTINCT post_id FROM post_lsh_buckets)
+        ''')
+        missing = cursor.fetchall()
+
+        rows = [
+            (band, bucket, post_id)
+            for post_id, normalized_content, keywords in missing
+            for band, bucket in self.band_keys(normalized_content, json.loads(keywords or '[]'))
+        ]
+        cursor.executemany('INSERT INTO post_lsh_buckets (band, bucket, post_id) VALUES (?, ?, ?)', rows)
+        return len(missing)
+
+    def remove_orphans(self, cursor) -> int:
+        """削除済み投稿のバケットを除去"""
+        cursor.execute(f'DELETE FROM post_lsh_buckets WHERE post_id NOT IN (SELECT id FROM {ALL_POSTS})')
+        return cursor.rowcount
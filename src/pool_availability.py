@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+コンテンツプールの利用可能インデックス
+プール（cat_questions・cat_health・dog_cases・dog_health）の各項目が、現在の重複チェック期間と
+閾値で過去投稿と重複する（使えない）かを先に調べておき、使える項目だけから選ぶ。
+判定はDBに保存したプールと履歴の類似度行列を参照する（pool_similarity_matrix）。
+選択は最近使っていない項目ほど選ばれやすい重み付き抽選（重み付きLRU）
+"""
+
+import random
+from history_cache import window_cutoff
+from history_partitions import ALL_POSTS
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# 質問・回答ペアのプールで重複を調べる項目（両方とも使える項目のみ選ぶ）
+QA_FIELDS = ('question', 'answer')
+
+
+def entry_texts(entry, fields: Sequence[Optional[str]]) -> List[str]:
+    """プール項目の重複チェック対象の本文（文字列の項目は fields に None を指定）"""
+    return [entry if field is None else entry[field] for field in fields]
+
+
+class PoolAvailabilityIndex:
+    def __init__(self, duplicate_monitor, pools: Dict[str, list], rng: Optional[random.Random] = None):
+        self.duplicate_monitor = duplicate_monitor
+        self.pools = pools
+        self.random = rng or random.Random()
+        # (プール名, 項目, 動物種, トピック, 期間, 閾値) → 使えない項目の番号
+        self.blocked: Dict[Tuple, set] = {}
+        # (プール名, 番号) → 最後に使った順番（過去投稿での最終投稿日時から初期化）
+        self.last_used: Dict[Tuple[str, int], Tuple] = {}
+        self._loaded_pools = set()
+        self._clock = 0
+        self._signatures: Dict[str, Tuple] = {}  # 本文 → (ハッシュ, 特徴量, LSHバケットキー)
+
+    def _key(self, pool_name: str, fields: Tuple, animal_type: Optional[str],
+             topic: Optional[str], months_back: int) -> Tuple:
+        return (pool_name, fields, animal_type, topic, months_back, self.duplicate_monitor.similarity_threshold)
+
+    def eligible(self, pool_name: str, animal_type: Optional[str], topic: Optional[str], months_back: int,
+                 fields: Sequence[Optional[str]] = (None,)) -> List[int]:
+        """重複チェックを通る項目の番号（初回のみ類似度行列を参照）"""
+        fields = tuple(fields)
+        key = self._key(pool_name, fields, animal_type, topic, months_back)
+        if key not in self.blocked:
+            pool = self.pools[pool_name]
+            texts = [text for entry in pool for text in entry_texts(entry, fields)]
+            # 履歴との重複のみ見る（プール内の項目同士の類似は使えない理由にしない）
+            positions = self.duplicate_monitor.pool_similarity.blocked(
+                texts, animal_type, topic, window_cutoff(months_back), key[-1]
+            )
+            self.blocked[key] = {position // len(fields) for position in positions}
+            self._load_last_used(pool_name)
+        return [index for index in range(len(self.pools[pool_name])) if index not in self.blocked[key]]
+
+    def _load_last_used(self, pool_name: str):
+        """過去投稿での各項目の最終投稿日時（一度も投稿していない項目は最も古い扱い）"""
+        if pool_name in self._loaded_pools:
+            return
+        self._loaded_pools.add(pool_name)
+        monitor = self.duplicate_monitor
+        pool = self.pools[pool_name]
+        fields = QA_FIELDS if pool and isinstance(pool[0], dict) else (None,)
+        hashes = {}
+        for index, entry in enumerate(pool):
+            for text in entry_texts(entry, fields):
+                hashes.setdefault(monitor.calculate_content_hash(text), index)
+
+        cursor = monitor.store.cursor()
+        cursor.execute(
+            f"SELECT content_hash, MAX(created_at) FROM {ALL_POSTS} "
+            f"WHERE content_hash IN ({', '.join(['?'] * len(hashes))}) GROUP BY content_hash",
+            list(hashes)
+        )
+        for content_hash, created_at in cursor.fetchall():
+            used = (0, created_at or '')
+            key = (pool_name, hashes[content_hash])
+            self.last_used[key] = max(self.last_used.get(key, used), used)
+        cursor.close()
+
+    def choose(self, pool_name: str, animal_type: Optional[str], topic: Optional[str], months_back: int,
+               fields: Sequence[Optional[str]] = (None,), exclude: Iterable[int] = ()) -> Optional[int]:
+        """使える項目から重み付きLRUで1つ選ぶ（使える項目がなければ None）"""
+        excluded = set(exclude)
+        candidates = [index for index in self.eligible(pool_name, animal_type, topic, months_back, fields)
+                      if index not in excluded]
+        if not candidates:
+            return None
+
+        # 最近使った順に並べ、使っていない項目ほど重みを大きくする（一度も使っていない項目が最大）
+        never_used = (-1, '')
+        candidates.sort(key=lambda index: (self.last_used.get((pool_name, index), never_used), index))
+        weights = [len(candidates) - rank for rank in range(len(candidates))]
+        return self.random.choices(candidates, weights=weights)[0]
+
+    def mark_used(self, pool_name: str, index: int):
+        """項目を使ったことを記録（このセッションで使った項目は過去投稿より新しい扱い）"""
+        self._clock += 1
+        self.last_used[(pool_name, index)] = (1, self._clock)
+
+    def _signature(self, text: str) -> Tuple:
+        """(ハッシュ, 特徴量, LSHバケットキー)"""
+        monitor = self.duplicate_monitor
+        features = monitor.extract_features(text)
+        return (monitor.calculate_content_hash(text), features,
+                set(monitor.lsh_index.band_keys(features['normalized'], features['keywords'])))
+
+    def _pool_signature(self, text: str) -> Tuple:
+        if text not in self._signatures:
+            self._signatures[text] = self._signature(text)
+        return self._signatures[text]
+
+    def note_saved(self, content: str, animal_type: Optional[str], topic: Optional[str]):
+        """保存した投稿と重複するようになった項目を、調べ済みの条件ごとに使えない項目へ追加"""
+        monitor = self.duplicate_monitor
+        saved_hash, saved, saved_keys = self._signature(content)
+
+        for key, blocked in self.blocked.items():
+            pool_name, fields, key_animal_type, key_topic, _, threshold = key
+            # 完全一致は動物種・トピックに関係なく、類似は同じ動物種・トピックの場合のみ重複になる
+            compare_similarity = not (key_animal_type and animal_type != key_animal_type) \
+                and not (key_topic and topic != key_topic)
+            for index, entry in enumerate(self.pools[pool_name]):
+                if index in blocked:
+                    continue
+                for text in entry_texts(entry, fields):
+                    content_hash, features, keys = self._pool_signature(text)
+                    if content_hash == saved_hash:
+                        blocked.add(index)
+                        break
+                    # 重複チェックと同じく、LSHバケットを共有する場合のみ類似度を比べる
+                    if not compare_similarity or saved_keys.isdisjoint(keys):
+                        continue
+                    if monitor.calculate_feature_similarity(features, saved) >= threshold:
+                        blocked.add(index)
+                        break
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+コンテンツプールと投稿履歴の類似度行列（DBに永続化）
+プールの各本文（コンテンツハッシュで識別）と、LSHバケットを共有する履歴投稿との類似度を
+保存しておき、プール項目が使えるかの判定をSQLの参照だけで済ませる
+
+    - 計算済みの最大投稿IDを本文ごとに持ち、増えた投稿の分だけ追加で計算する
+    - 本文が変わればハッシュが変わるので新しい本文として計算し直す
+    - 特徴量の版数・類似度バックエンド・LSH/3-gramの設定が変わった本文は計算し直す
+    - 比較する投稿は、LSHバケットを共有する投稿に、特徴的な3-gramを多く共有する投稿
+      （FTS5の3-gram全文検索で求める）を加えたもの
+"""
+
+from typing import Dict, List, Optional, Sequence, Set
+
+from history_partitions import ALL_POSTS, to_epoch
+from instrumentation import count, timed
+from trigram_index import COMMON_TRIGRAM_RATIO, MIN_SHARED_TRIGRAMS, SHARED_TRIGRAM_RATIO
+
+# 1回のSQLで渡すパラメータ数の上限（SQLITE_MAX_VARIABLE_NUMBER の旧既定値 999 未満）
+QUERY_CHUNK_SIZE = 500
+
+UPSERT_STATE_SQL = '''
+    INSERT OR REPLACE INTO pool_similarity_state (pool_hash, config, last_post_id) VALUES (?, ?, ?)
+'''
+
+
+def chunks(values: list, size: int = QUERY_CHUNK_SIZE):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def placeholders(number: int) -> str:
+    return ', '.join(['?'] * number)
+
+
+class PoolSimilarityMatrix:
+    def __init__(self, monitor, feature_version: int):
+        self.monitor = monitor
+        self.feature_version = feature_version
+
+    def create_schema(self, cursor):
+        """類似度行列と本文ごとの計算状況のテーブルを作成"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS pool_similarity (
+                pool_hash TEXT NOT NULL,
+                post_id INTEGER NOT NULL,
+                similarity REAL NOT NULL,
+                PRIMARY KEY (pool_hash, post_id),
+                FOREIGN KEY (post_id) REFERENCES post_history (id)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS pool_similarity_state (
+                pool_hash TEXT PRIMARY KEY,
+                config TEXT NOT NULL,
+                last_post_id INTEGER NOT NULL
+            )
+        ''')
+
+    def config(self) -> str:
+        """保存した類似度が有効な条件（変わったら計算し直す）"""
+        backend = self.monitor.similarity_backend
+        lsh = self.monitor.lsh_index
+        config = (f"features={self.feature_version};backend={backend.name}:{getattr(backend, 'metric', '')};"
+                  f"lsh={lsh.ngram_size},{lsh.num_perm},{lsh.bands},{lsh.keyword_bands}")
+        if self.monitor.trigram_index.available:
+            config += f";trigram={COMMON_TRIGRAM_RATIO},{SHARED_TRIGRAM_RATIO},{MIN_SHARED_TRIGRAMS}"
+        return config
+
+    @timed('pool_similarity.update')
+    def update(self, cursor, texts: Sequence[str]) -> int:
+        """未計算の (本文, 投稿) の類似度を計算して保存し、計算した組の数を返す"""
+        monitor = self.monitor
+        texts = {monitor.calculate_content_hash(text): text for text in texts}
+        if not texts:
+            return 0
+
+        cursor.execute(f'SELECT COALESCE(MAX(id), 0) FROM {ALL_POSTS}')
+        max_id = cursor.fetchone()[0]
+        config = self.config()
+
+        state = {}
+        for hashes in chunks(list(texts)):
+            cursor.execute(f'''
+                SELECT pool_hash, config, last_post_id FROM pool_similarity_state
+                WHERE pool_hash IN ({placeholders(len(hashes))})
+            ''', hashes)
+            state.update((pool_hash, (saved_config, last_id)) for pool_hash, saved_config, last_id in cursor.fetchall())
+
+        # 本文ごとに、前回の計算以降に増えた候補投稿（LSH・3-gram）を集める
+        pending: Dict[str, tuple] = {}
+        for pool_hash, text in texts.items():
+            saved_config, last_id = state.get(pool_hash, (None, 0))
+            if saved_config != config:
+                cursor.execute('DELETE FROM pool_similarity WHERE pool_hash = ?', (pool_hash,))
+                last_id = 0
+            if last_id >= max_id:
+                continue
+            features = monitor.extract_features(text)
+            keys = monitor.lsh_index.band_keys(features['normalized'], features['keywords'])
+            post_ids = set()
+            for batch in chunks(keys, QUERY_CHUNK_SIZE // 2):
+                cursor.execute(f'''
+                    SELECT DISTINCT post_id FROM post_lsh_buckets
+                    WHERE (band, bucket) IN (VALUES {', '.join(['(?, ?)'] * len(batch))})
+                    AND post_id > ? AND post_id <= ?
+                ''', [value for key in batch for value in key] + [last_id, max_id])
+                post_ids.update(row[0] for row in cursor.fetchall())
+            post_ids.update(monitor.trigram_index.overlapping(
+                cursor, features['normalized'], features['main_points'], last_id, max_id
+            ))
+            pending[pool_hash] = (features, post_ids)
+
+        if not pending:
+            return 0
+
+        # 履歴側の特徴量と本文の前処理は全本文で1回だけ行う
+        posts: List[Dict] = []
+        post_rows: Dict[int, int] = {}
+        all_ids = sorted({post_id for _, post_ids in pending.values() for post_id in post_ids})
+        for batch in chunks(all_ids):
+            for post in monitor._feature_rows(cursor, f'id IN ({placeholders(len(batch))})', batch, ALL_POSTS):
+                post_rows[post['id']] = len(posts)
+                posts.append(monitor._post_features(post))
+        prepared = monitor.similarity_backend.prepare([post['normalized'] for post in posts])
+
+        rows = []
+        for pool_hash, (features, post_ids) in pending.items():
+            post_ids = sorted(post_id for post_id in post_ids if post_id in post_rows)
+            similarities = monitor.calculate_feature_similarities(
+                features, posts, prepared, [post_rows[post_id] for post_id in post_ids]
+            )
+            rows.extend(zip([pool_hash] * len(post_ids), post_ids, similarities))
+
+        cursor.executemany(
+            'INSERT OR REPLACE INTO pool_similarity (pool_hash, post_id, similarity) VALUES (?, ?, ?)', rows
+        )
+        cursor.executemany(UPSERT_STATE_SQL, [(pool_hash, config, max_id) for pool_hash in pending])
+        count('pool_similarity.computed_pairs', len(rows))
+        return len(rows)
+
+    def blocked(self, texts: Sequence[str], animal_type: Optional[str], topic: Optional[str],
+                cutoff: str, threshold: float) -> Set[int]:
+        """重複チェックを通らない本文の位置（完全一致は期間に関係なく、類似は期間内の同じ動物種・トピックのみ）"""
+        monitor = self.monitor
+        hashes = [monitor.calculate_content_hash(text) for text in texts]
+        blocked_hashes = set()
+
+        with monitor.store.transaction() as cursor:
+            self.update(cursor, texts)
+
+            since = to_epoch(cutoff)
+            table = monitor.history_partitions.table_for(cursor, since)
+            filters = ''
+            params = [threshold, since]
+            if animal_type:
+                filters += ' AND p.animal_type = ?'
+                params.append(animal_type)
+            if topic:
+                filters += ' AND p.topic = ?'
+                params.append(topic)
+
+            for batch in chunks(sorted(set(hashes))):
+                cursor.execute(f'SELECT DISTINCT content_hash FROM {ALL_POSTS} '
+                               f'WHERE content_hash IN ({placeholders(len(batch))})', batch)
+                blocked_hashes.update(row[0] for row in cursor.fetchall())
+
+                cursor.execute(f'''
+                    SELECT DISTINCT s.pool_hash FROM pool_similarity s
+                    JOIN {table} p ON p.id = s.post_id
+                    WHERE s.similarity >= ? AND p.created_epoch > ?{filters}
+                    AND s.pool_hash IN ({placeholders(len(batch))})
+                ''', params + batch)
+                blocked_hashes.update(row[0] for row in cursor.fetchall())
+
+        return {position for position, content_hash in enumerate(hashes) if content_hash in blocked_hashes}
+
+    def remove_orphans(self, cursor) -> int:
+        """削除済み投稿の類似度を除去"""
+        cursor.execute(f'DELETE FROM pool_similarity WHERE post_id NOT IN (SELECT id FROM {ALL_POSTS})')
+        return cursor.rowcount
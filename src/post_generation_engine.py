@@ -0,0 +1,513 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+VET-Assistant2 ヘッドレス投稿生成エンジン
+GUIと同じ生成処理（シンプル生成・重複監視付き生成・重複チェック付きテーマ生成）を
+ライブラリ／コマンドラインから実行する（tkinter は読み込まない）
+
+    python src/post_generation_engine.py --mode ai --themes 参加型 専門テーマ --weeks 4 --format json
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from content_library import (
+    WEEK_THEMES, CAT_QUESTIONS, CAT_HEALTH, DOG_CASES, DOG_HEALTH,
+    CAT_THEME_POSTS, CAT_DEFAULT_POSTS, DOG_THEME_POSTS, DOG_DEFAULT_POSTS,
+    ALTERNATIVE_REPLACEMENTS, EMOJI_REPLACEMENTS
+)
+from instrumentation import PROFILER, count, enable_from_env, profile_path, timed
+from pool_availability import PoolAvailabilityIndex, QA_FIELDS, entry_texts
+
+# 生成結果の出力先（GUIと同じ src/output）
+OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "output")
+
+CSV_HEADER = ['投稿日時', '投稿内容', '文字数']
+
+# 1投稿の最大文字数
+MAX_POST_LENGTH = 140
+
+CAT_HASHTAG = "#猫のあれこれ"
+DOG_HASHTAG = "#獣医が教える犬のはなし"
+
+# 重複監視付き生成のコンテンツ種別 → (プール名, 質問・回答ペアのプールか)
+POOL_CONTENT_TYPES = {
+    'cat_question': ('cat_questions', True),
+    'cat_health': ('cat_health', False),
+    'dog_case': ('dog_cases', True),
+    'dog_health': ('dog_health', False)
+}
+
+# 生成モード → CSVファイル名の接頭辞と文字コード（GUIの出力と同じ）
+MODE_OUTPUTS = {
+    'simple': ("posts", 'utf-8-sig'),
+    'monitoring': ("enhanced_posts", 'utf-8'),
+    'ai': ("ai_enhanced_posts", 'utf-8')
+}
+
+
+def write_csv(path: str, rows: List[List[str]], encoding: str = 'utf-8') -> str:
+    """投稿日時・投稿内容・文字数のCSVを書き出してパスを返す"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding=encoding, newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADER)
+        writer.writerows(rows)
+    return path
+
+
+def simple_post_rows(posts: List[Dict]) -> List[List[str]]:
+    """シンプル生成の投稿辞書をCSVの行に変換"""
+    return [[post['time'], post['content'], str(post['char_count'])] for post in posts]
+
+
+class PostGenerationEngine:
+    def __init__(self, duplicate_monitor=None, max_regeneration_attempts: int = 5,
+                 log: Optional[Callable[[str], None]] = None,
+                 progress: Optional[Callable[[float], None]] = None,
+                 rng: Optional[random.Random] = None):
+        self.duplicate_monitor = duplicate_monitor  # 重複監視を使う生成でのみ必要
+        self.max_regeneration_attempts = max_regeneration_attempts  # 最大再生成回数
+        self.log = log or print
+        self.progress = progress or (lambda value: None)
+        self.random = rng or random.Random()
+
+        # コンテンツプール
+        self.content_pools = {
+            'cat_questions': CAT_QUESTIONS,
+            'cat_health': CAT_HEALTH,
+            'dog_cases': DOG_CASES,
+            'dog_health': DOG_HEALTH
+        }
+        self._pool_index = None
+
+    def pool_availability(self) -> PoolAvailabilityIndex:
+        """重複監視に対応するプールの利用可能インデックス（監視対象が変わったら作り直す）"""
+        if self._pool_index is None or self._pool_index.duplicate_monitor is not self.duplicate_monitor:
+            self._pool_index = PoolAvailabilityIndex(self.duplicate_monitor, self.content_pools, self.random)
+        return self._pool_index
+
+    @timed('engine.generate_content')
+    def generate_content_with_monitoring(self, content_type: str, animal_type: str,
+                                         topic: str = None, qa_type: str = None,
+                                         months_back: int = 6) -> str:
+        """重複監視付きコンテンツ生成（過去投稿と重複しないプール項目だけから選ぶ）"""
+        pool_index = self.pool_availability()
+        pool_name, field = None, None
+        if content_type in POOL_CONTENT_TYPES:
+            pool_name, is_qa = POOL_CONTENT_TYPES[content_type]
+            field = ("question" if qa_type == "question" else "answer") if is_qa else None
+        tried = []
+
+        for attempt in range(self.max_regeneration_attempts):
+            # コンテンツ生成
+            if pool_name:
+                index = pool_index.choose(pool_name, animal_type, topic, months_back, (field,), exclude=tried)
+                if index is None:
+                    self.log(f"⚠️ 重複チェックを通る候補がプールに残っていません")
+                    break
+                tried.append(index)
+                content = entry_texts(self.content_pools[pool_name][index], (field,))[0]
+            else:
+                content = "デフォルトコンテンツ"
+
+            # 重複チェック
+            self.log(f"🔍 重複チェック実行中... (試行 {attempt + 1}/{self.max_regeneration_attempts})")
+
+            is_duplicate, duplicate_info = self.duplicate_monitor.check_duplicate_comprehensive(
+                content, animal_type, topic, months_back
+            )
+
+            if not is_duplicate:
+                self.log(f"✅ 重複なし - コンテンツ承認")
+                # 承認されたコンテンツを保存
+                self.duplicate_monitor.save_approved_post(content, animal_type, topic, content_type)
+                if pool_name:
+                    pool_index.mark_used(pool_name, index)
+                    pool_index.note_saved(content, animal_type, topic)
+                return content
+            else:
+                self.log(f"⚠️ 重複検出! 類似度: {duplicate_info[0]['similarity']:.2f}")
+                self.log(f"   類似投稿: {duplicate_info[0]['content'][:50]}...")
+
+                if attempt < self.max_regeneration_attempts - 1:
+                    self.log(f"🔄 再生成を試行します...")
+                    count('engine.regenerations')
+                    continue
+
+        self.log(f"❌ {len(tried) or self.max_regeneration_attempts}回の試行後も重複が解決できませんでした")
+        return None
+
+    @timed('engine.generate_posts')
+    def generate_posts_with_monitoring(self, days: int, start_date: datetime = None,
+                                       months_back: int = 6) -> Dict:
+        """
+        重複監視付き投稿生成（猫・犬の質問と翌日の回答）
+
+        Returns:
+            {'posts': CSVの行のリスト, 'successful': 成功数, 'failed': 失敗数}
+        """
+        start_date = start_date or datetime.now()
+        posts = []
+        successful_generations = 0
+        failed_generations = 0
+
+        # プール項目の選択は質問・回答とも過去投稿と重複しない項目から
+        pool_index = self.pool_availability()
+
+        # 1週間分の候補を先に組み立て、履歴との重複チェックは一括で行う
+        # 月曜・水曜・金曜(0,2,4)に質問、火曜・木曜・土曜(1,3,5)に回答
+        slots = []
+        selected_qa = {'cat': None, 'dog': None}
+        selected_indices = {'cat': [], 'dog': []}  # この期間で選んだ項目（同じ質問を繰り返さない）
+        for i in range(days):
+            current_date = start_date + timedelta(days=i)
+            weekday = current_date.weekday()  # 0=月曜, 1=火曜...
+            for animal_type, pool_name in (("cat", 'cat_questions'), ("dog", 'dog_cases')):
+                slot = {'day': i, 'date': current_date, 'weekday': weekday, 'animal_type': animal_type,
+                        'pool': pool_name, 'qa': None, 'content': None}
+                if weekday % 2 == 0:  # 質問の日
+                    topic = "猫の健康" if animal_type == "cat" else "犬の健康"
+                    index = pool_index.choose(pool_name, animal_type, topic, months_back, QA_FIELDS,
+                                              exclude=selected_indices[animal_type])
+                    if index is None:  # 使える項目がなければ従来どおり抽選し、重複チェックで判定
+                        slot['qa'] = self.random.choice(self.content_pools[pool_name])
+                    else:
+                        selected_indices[animal_type].append(index)
+                        pool_index.mark_used(pool_name, index)
+                        slot['qa'] = self.content_pools[pool_name][index]
+                    selected_qa[animal_type] = slot['qa']
+                    slot['content'] = slot['qa']["question"]
+                elif selected_qa[animal_type] is not None:  # 回答の日
+                    slot['qa'] = selected_qa[animal_type]
+                    slot['content'] = slot['qa']["answer"]
+                    selected_qa[animal_type] = None
+                slots.append(slot)
+
+        checked_slots = [slot for slot in slots if slot['content']]
+        self.log(f"🔍 {len(checked_slots)}件の候補を一括重複チェック中...")
+        batch_results = self.duplicate_monitor.check_duplicates_batch(
+            [{'content': slot['content'], 'animal_type': slot['animal_type'],
+              'topic': "猫の健康" if slot['animal_type'] == "cat" else "犬の健康"} for slot in checked_slots],
+            months_back
+        )
+        for slot, (is_duplicate, _) in zip(checked_slots, batch_results):
+            slot['is_duplicate'] = is_duplicate
+
+        replaced_qa = {'cat': None, 'dog': None}  # 質問を差し替えた場合の新しいペア
+
+        for slot in slots:
+            i = slot['day']
+            current_date = slot['date']
+            weekday = slot['weekday']
+            animal_type = slot['animal_type']
+            label = "猫" if animal_type == "cat" else "犬"
+            health_type = f"{animal_type}_health"
+            health_topic = f"{label}の健康"
+
+            self.log(f"📅 {current_date.strftime('%Y-%m-%d')} {label}投稿生成中...")
+
+            if weekday % 2 == 0:  # 質問の日
+                content = slot['content']
+                replaced_qa[animal_type] = None
+                if slot['is_duplicate']:
+                    self.log(f"⚠️ {label}質問で重複検出、別の質問を選択")
+                    pool = self.content_pools[slot['pool']]
+                    index = pool_index.choose(slot['pool'], animal_type, health_topic, months_back, QA_FIELDS,
+                                              exclude=selected_indices[animal_type] + [pool.index(slot['qa'])])
+                    if index is not None:
+                        selected_indices[animal_type].append(index)
+                        pool_index.mark_used(slot['pool'], index)
+                        replaced_qa[animal_type] = pool[index]
+                    else:  # 重複しないペアが残っていない場合は従来どおり他の質問から抽選
+                        available_questions = [qa for qa in pool if qa != slot['qa']]
+                        if available_questions:
+                            replaced_qa[animal_type] = self.random.choice(available_questions)
+                    if replaced_qa[animal_type] is not None:
+                        content = replaced_qa[animal_type]["question"]
+                self.log(f"📝 {label}質問選択: {content[:30]}...")
+            elif slot['qa'] is not None:  # 回答の日
+                content = slot['content']
+                self.log(f"📝 {label}回答生成: 前日の質問に対応")
+                is_duplicate = slot['is_duplicate']
+                if replaced_qa[animal_type] is not None:
+                    # 質問を差し替えた場合は回答も差し替えて個別にチェック
+                    content = replaced_qa[animal_type]["answer"]
+                    replaced_qa[animal_type] = None
+                    is_duplicate, _ = self.duplicate_monitor.check_duplicate_comprehensive(
+                        content, animal_type, health_topic, months_back
+                    )
+                if is_duplicate:
+                    self.log(f"⚠️ {label}回答で重複検出、健康投稿にフォールバック")
+                    content = self.generate_content_with_monitoring(health_type, animal_type, health_topic,
+                                                                    months_back=months_back)
+            else:
+                self.log(f"⚠️ {label}: 対応する質問がないため健康投稿にフォールバック")
+                content = self.generate_content_with_monitoring(health_type, animal_type, health_topic,
+                                                                months_back=months_back)
+
+            if content:
+                hour = 7 if animal_type == "cat" else 18
+                posts.append([
+                    current_date.replace(hour=hour, minute=0).strftime('%Y-%m-%d %H:%M'),
+                    content.replace('\\n', '\n'),
+                    str(len(content))
+                ])
+                if animal_type == "cat":
+                    post_type = "cat_question" if weekday % 2 == 0 else "cat_answer"
+                else:
+                    post_type = "dog_case" if weekday % 2 == 0 else "dog_answer"
+                self.duplicate_monitor.save_approved_post(content, animal_type, health_topic, post_type)
+                pool_index.note_saved(content, animal_type, health_topic)
+                successful_generations += 1
+                self.log(f"✅ {label}投稿生成成功 ({'質問' if weekday % 2 == 0 else '回答'})")
+            else:
+                failed_generations += 1
+                self.log(f"❌ {label}投稿生成失敗 ({current_date.strftime('%Y-%m-%d')})")
+
+            # 進捗更新（猫・犬の2投稿で1日分）
+            if animal_type == "dog":
+                self.progress((i + 1) / days * 100)
+
+        return {'posts': posts, 'successful': successful_generations, 'failed': failed_generations}
+
+    def generate_posts_with_ai(self, start_date: datetime, theme_type: str, months_back: int = 6) -> Dict:
+        """
+        週テーマの定型投稿を重複チェックし、重複は言い換えで回避して承認
+
+        Returns:
+            {'posts': CSVの行のリスト, 'successful': 成功数, 'failed': 失敗数}
+        """
+        # シンプル生成のみ使用（AI機能を完全無効化）
+        self.log(f"📝 シンプル生成開始: テーマ={theme_type}")
+        ai_posts = self.generate_simple_posts(start_date, theme_type)
+
+        self.progress(40)
+
+        # 重複チェックと調整（履歴・バッチ内の重複を一括チェック）
+        checked_posts = []
+        successful_generations = 0
+        failed_generations = 0
+
+        batch_results = self.duplicate_monitor.check_duplicates_batch(
+            [{'content': ai_post['content'], 'animal_type': "cat", 'topic': theme_type} for ai_post in ai_posts],
+            months_back
+        )
+
+        for i, (ai_post, (is_duplicate, duplicates)) in enumerate(zip(ai_posts, batch_results)):
+            self.progress(40 + (i / len(ai_posts)) * 50)
+
+            # 投稿時間の設定（猫：07:00、犬：18:00の代替として曜日ベースで設定）
+            post_date = datetime.strptime(ai_post['date'], '%Y-%m-%d')
+            if i % 2 == 0:  # 偶数日は朝（猫の時間）
+                post_datetime = post_date.replace(hour=7, minute=0)
+            else:  # 奇数日は夕方（犬の時間）
+                post_datetime = post_date.replace(hour=18, minute=0)
+
+            content = ai_post['content']
+
+            if is_duplicate:
+                self.log(f"⚠️ 重複検出（類似度:{duplicates[0]['similarity'] * 100:.1f}%）: {content[:30]}...")
+
+                # 代替コンテンツ生成を試行
+                retry_success = False
+                for attempt in range(self.max_regeneration_attempts):
+                    self.log(f"🔄 AI代替生成試行 {attempt + 1}/{self.max_regeneration_attempts}")
+
+                    alternative_content = self.generate_alternative_content(content, theme_type, attempt)
+
+                    is_dup_alt, _ = self.duplicate_monitor.check_duplicate_comprehensive(
+                        alternative_content, "cat", theme_type, months_back
+                    )
+
+                    if not is_dup_alt:
+                        content = alternative_content
+                        retry_success = True
+                        self.log(f"✅ AI代替生成成功: {content[:30]}...")
+                        break
+
+                if not retry_success:
+                    self.log(f"❌ 重複回避失敗: {ai_post['date']}")
+                    failed_generations += 1
+                    continue
+
+            # 投稿を承認リストに追加
+            checked_posts.append([
+                post_datetime.strftime('%Y-%m-%d %H:%M'),
+                content,
+                str(len(content))
+            ])
+
+            # 重複監視システムに登録
+            self.duplicate_monitor.save_approved_post(
+                content, "cat", theme_type, f"ai_generated_{theme_type}"
+            )
+
+            successful_generations += 1
+            self.log(f"✅ AI生成投稿承認: {ai_post['date']}")
+
+        self.progress(90)
+        return {'posts': checked_posts, 'successful': successful_generations, 'failed': failed_generations}
+
+    def generate_alternative_content(self, original_content: str, theme_type: str, attempt: int) -> str:
+        """重複回避のための代替コンテンツ生成（簡易版）"""
+        if attempt < len(ALTERNATIVE_REPLACEMENTS):
+            old, new = ALTERNATIVE_REPLACEMENTS[attempt]
+            return original_content.replace(old, new)
+
+        # 最後の手段：絵文字の変更
+        modified = original_content
+        for old_emoji, new_emoji in EMOJI_REPLACEMENTS.items():
+            if old_emoji in modified:
+                modified = modified.replace(old_emoji, new_emoji, 1)
+                break
+
+        return modified
+
+    def generate_simple_posts(self, start_date: datetime, theme_type: str) -> List[Dict]:
+        """安定版シンプル投稿生成（猫と犬の両方）"""
+        posts = self._theme_posts(
+            start_date, CAT_THEME_POSTS.get(theme_type, CAT_DEFAULT_POSTS), CAT_HASHTAG, 7
+        )
+        posts.extend(self.generate_dog_posts(start_date, theme_type))
+        return posts
+
+    def generate_dog_posts(self, start_date: datetime, theme_type: str) -> List[Dict]:
+        """犬投稿生成（18:00）- 「#獣医が教える犬のはなし」"""
+        return self._theme_posts(
+            start_date, DOG_THEME_POSTS.get(theme_type, DOG_DEFAULT_POSTS), DOG_HASHTAG, 18
+        )
+
+    def _theme_posts(self, start_date: datetime, sample_posts: List[str], hashtag: str, hour: int) -> List[Dict]:
+        """7日分の定型投稿を指定時刻の投稿にする"""
+        posts = []
+        for i in range(7):
+            current_date = start_date + timedelta(days=i)
+            content = self._fit_length(sample_posts[i], hashtag)
+            posts.append({
+                "date": current_date.strftime('%Y-%m-%d'),
+                "time": current_date.replace(hour=hour, minute=0).strftime('%Y-%m-%d %H:%M'),
+                "content": content,
+                "char_count": len(content)
+            })
+        return posts
+
+    def _fit_length(self, content: str, hashtag: str) -> str:
+        """140文字制限チェック・調整（ハッシュタグを保持したまま本文を短縮）"""
+        if len(content) <= MAX_POST_LENGTH:
+            return content
+
+        main_content = content.replace(hashtag, "").strip()
+        available_chars = MAX_POST_LENGTH - len(hashtag) - 1  # ハッシュタグ + 改行分
+
+        if len(main_content) > available_chars:
+            main_content = main_content[:available_chars - 3] + "..."
+
+        return main_content + "\n" + hashtag
+
+    @timed('engine.generate_week')
+    def generate_week(self, mode: str, start_date: datetime, theme_type: str, months_back: int = 6) -> Dict:
+        """1週間分を指定モードで生成し、CSVの行と件数を返す"""
+        if mode == 'simple':
+            rows = simple_post_rows(self.generate_simple_posts(start_date, theme_type))
+            return {'posts': rows, 'successful': len(rows), 'failed': 0}
+        if mode == 'monitoring':
+            return self.generate_posts_with_monitoring(7, start_date, months_back)
+        if mode == 'ai':
+            return self.generate_posts_with_ai(start_date, theme_type, months_back)
+        raise ValueError(f"未対応の生成モードです: {mode}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VET-Assistant2 ヘッドレス投稿生成")
+    parser.add_argument("--mode", choices=sorted(MODE_OUTPUTS), default="simple",
+                        help="simple: 定型投稿 / monitoring: 重複監視付きQ&A / ai: 重複チェック付きテーマ投稿")
+    parser.add_argument("--themes", nargs="+", choices=WEEK_THEMES, default=[WEEK_THEMES[0]],
+                        help="生成する週テーマ（複数指定可）")
+    parser.add_argument("--weeks", type=int, default=1, help="生成する週数")
+    parser.add_argument("--start", help="開始日 YYYY-MM-DD（省略時は今日）")
+    parser.add_argument("--months-back", type=int, default=3, help="重複チェック期間（か月）")
+    parser.add_argument("--similarity", type=float, default=50, help="重複と判定する類似度（%%）")
+    parser.add_argument("--db", default="vet_assistant2_posts.db", help="投稿履歴データベースのパス")
+    parser.add_argument("--format", choices=["csv", "json"], default="csv", help="出力形式")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR, help="出力先フォルダ")
+    parser.add_argument("--seed", type=int, help="乱数シード（同じ入力で同じ結果を得る）")
+    parser.add_argument("--profile", help="処理時間の内訳を表示し、このパスにJSONで保存")
+    args = parser.parse_args()
+
+    profile_dir = enable_from_env()
+    if args.profile:
+        PROFILER.enable()
+
+    if args.weeks <= 0:
+        parser.error("--weeks には正の数を指定してください")
+
+    if args.start:
+        start_date = datetime.strptime(args.start, '%Y-%m-%d')
+    else:
+        start_date = datetime.now()
+    start_date = start_date.replace(hour=7, minute=0, second=0, microsecond=0)
+
+    monitor = None
+    if args.mode != 'simple':
+        # 重複監視を使うモードのみDBを開く
+        from advanced_duplicate_monitor import AdvancedDuplicateMonitor
+        monitor = AdvancedDuplicateMonitor(args.db)
+        monitor.similarity_threshold = args.similarity / 100
+
+    engine = PostGenerationEngine(monitor, rng=random.Random(args.seed))
+    prefix, encoding = MODE_OUTPUTS[args.mode]
+
+    weeks = []
+    for week in range(args.weeks):
+        week_start = start_date + timedelta(days=7 * week)
+        for theme_type in args.themes:
+            result = engine.generate_week(args.mode, week_start, theme_type, args.months_back)
+            result.update({'theme': theme_type, 'week_start': week_start.strftime('%Y-%m-%d')})
+            weeks.append(result)
+
+            if args.format == "csv":
+                output_path = write_csv(
+                    os.path.join(args.output_dir, f"{prefix}_{result['week_start']}_{theme_type}.csv"),
+                    result['posts'], encoding
+                )
+                print(f"💾 {output_path} ({result['successful']}件成功, {result['failed']}件失敗)")
+
+    if args.format == "json":
+        output_path = os.path.join(
+            args.output_dir, f"{prefix}_{start_date.strftime('%Y-%m-%d')}_{args.weeks}weeks.json"
+        )
+        os.makedirs(args.output_dir, exist_ok=True)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump([
+                {
+                    'theme': result['theme'],
+                    'week_start': result['week_start'],
+                    'successful': result['successful'],
+                    'failed': result['failed'],
+                    'posts': [
+                        {'time': time, 'content': content, 'char_count': int(char_count)}
+                        for time, content, char_count in result['posts']
+                    ]
+                }
+                for result in weeks
+            ], f, ensure_ascii=False, indent=2)
+        print(f"💾 {output_path} ({args.weeks}週 × {len(args.themes)}テーマ)")
+
+    if monitor is not None:
+        monitor.close()  # バッファの検出記録を書き込む
+
+    if PROFILER.enabled:
+        for line in PROFILER.summary_lines():
+            print(line)
+        profile_output = args.profile or (profile_dir and profile_path(profile_dir, f"headless_{args.mode}"))
+        if profile_output:
+            print(f"💾 {PROFILER.dump(profile_output, mode=args.mode, weeks=args.weeks, themes=args.themes)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+投稿履歴データベースの接続管理
+スレッドごとに長寿命の接続を1本ずつ持ち、WALジャーナルと調整済みPRAGMAで開いて
+同じSQL文字列のプリペアドステートメントを接続内で使い回す
+"""
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Sequence
+from urllib.request import pathname2url
+
+from instrumentation import span
+
+# 接続ごとにキャッシュするプリペアドステートメント数
+# （SQLはモジュール定数として同じ文字列を渡すため、2回目以降はパース済みの文が再利用される）
+CACHED_STATEMENTS = 256
+
+# 接続時に設定するPRAGMA
+CONNECTION_PRAGMAS = [
+    'PRAGMA journal_mode = WAL',       # 読み込みが書き込みをブロックしない
+    'PRAGMA synchronous = NORMAL',     # WALではコミットごとのfsyncを省略しても破損しない
+    'PRAGMA temp_store = MEMORY',      # 一括チェック用の一時テーブルをメモリに置く
+    'PRAGMA cache_size = -16000',      # ページキャッシュ約16MB
+    'PRAGMA mmap_size = 67108864'      # 64MBまでメモリマップで読み込む
+]
+
+# 読み込み専用の接続ではジャーナルモードを変えられないため、作成済みのDBの設定のまま開く
+READ_ONLY_PRAGMAS = CONNECTION_PRAGMAS[2:]
+
+
+def fetch_rows(cursor: sqlite3.Cursor, sql: str, params: Sequence = ()) -> List[sqlite3.Row]:
+    """列名で参照できる行（sqlite3.Row）で結果を返す（列の位置に依存しないため、列を追加しても壊れない）"""
+    row_factory = cursor.row_factory
+    cursor.row_factory = sqlite3.Row
+    try:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+    finally:
+        cursor.row_factory = row_factory
+
+
+class PostHistoryStore:
+    def __init__(self, db_path: str, timeout: float = 30.0, read_only: bool = False):
+        self.db_path = db_path
+        self.timeout = timeout  # 他の接続が書き込み中の場合の待ち時間（秒）
+        self.read_only = read_only  # 作成済みのDBを読み込み専用で開く（書き込みは sqlite3.OperationalError）
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+
+    def connection(self) -> sqlite3.Connection:
+        """呼び出し元スレッドの接続を返す（初回のみ接続を開く）"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # sqlite3の接続は作成したスレッドでのみ使う（check_same_thread は既定の True のまま）
+            if self.read_only:
+                conn = sqlite3.connect(f'file:{pathname2url(os.path.abspath(self.db_path))}?mode=ro', uri=True,
+                                       timeout=self.timeout, cached_statements=CACHED_STATEMENTS)
+            else:
+                conn = sqlite3.connect(self.db_path, timeout=self.timeout,
+                                       cached_statements=CACHED_STATEMENTS)
+            for pragma in READ_ONLY_PRAGMAS if self.read_only else CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def cursor(self) -> sqlite3.Cursor:
+        """読み込み用のカーソルを返す"""
+        return self.connection().cursor()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Cursor]:
+        """書き込み用のカーソルを返し、ブロックを抜けたらコミット（例外時はロールバック）"""
+        conn = self.connection()
+        cursor = conn.cursor()
+        try:
+            yield cursor
+        except BaseException:
+            conn.rollback()
+            raise
+        else:
+            with span('sqlite.commit'):
+                conn.commit()
+        finally:
+            cursor.close()
+
+    def close(self):
+        """呼び出し元スレッドの接続を閉じる（バックグラウンドスレッドは終了前に呼ぶ）"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return
+        conn.close()
+        self._local.conn = None
+        with self._lock:
+            self._connections.remove(conn)
+
+    def open_connections(self) -> int:
+        """開いている接続数（全スレッド合計）"""
+        with self._lock:
+            return len(self._connections)
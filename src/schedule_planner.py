@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+VET-Assistant2 複数週スケジュールプランナー
+週ごとの投稿生成と履歴との重複スコアリングをプロセスプールで並列に行い、
+週をまたぐ重複は週順の決定的なマージで解消して1本のカレンダーにまとめる
+（テーマが一巡して定型投稿が重複する週は、コンテンツプールの投稿で埋める）
+
+    python src/schedule_planner.py --weeks 13 --start 2025-08-04 --db data/vet_assistant2_posts.db
+"""
+
+import argparse
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Sequence
+
+from content_library import WEEK_THEMES
+from pool_availability import QA_FIELDS, entry_texts
+from post_generation_engine import PostGenerationEngine, OUTPUT_DIR, CAT_HASHTAG, DOG_HASHTAG, write_csv
+
+# ワーカープロセスごとに開いた監視システム（DBパス → インスタンス）
+_worker_monitors = {}
+
+# 重複した枠を埋めるコンテンツプール（動物種 → (単独投稿のプール, 質問・回答ペアのプール)）
+FILL_POOLS = {
+    'cat': ('cat_health', 'cat_questions'),
+    'dog': ('dog_health', 'dog_cases')
+}
+
+
+def week_plan(start_date: datetime, weeks: int, themes: Sequence[str]) -> List[Dict]:
+    """週ごとの開始日とテーマ（指定順に巡回）を返す"""
+    return [
+        {'week': week, 'week_start': start_date + timedelta(days=7 * week), 'theme': themes[week % len(themes)]}
+        for week in range(weeks)
+    ]
+
+
+def themes_from(theme_type: str) -> List[str]:
+    """指定テーマから始まる週テーマの巡回順（未知のテーマはそのテーマのみ）"""
+    if theme_type not in WEEK_THEMES:
+        return [theme_type]
+    index = WEEK_THEMES.index(theme_type)
+    return list(WEEK_THEMES[index:] + WEEK_THEMES[:index])
+
+
+def post_animal_type(content: str) -> str:
+    """ハッシュタグから動物種を判定"""
+    return "dog" if DOG_HASHTAG in content else "cat"
+
+
+def pool_post(text: str, animal_type: str, engine: PostGenerationEngine) -> str:
+    """プールの本文を投稿の形にする（改行を戻し、ハッシュタグを保持して140文字に収める）"""
+    hashtag = CAT_HASHTAG if animal_type == "cat" else DOG_HASHTAG
+    return engine._fit_length(text.replace('\\n', '\n'), hashtag)
+
+
+def _worker_monitor(db_path: str, similarity_threshold: float):
+    """
+    ワーカープロセス内で監視システムを1回だけ開いて使い回す
+
+    スキーマの作成・移行はメインプロセスの監視システムが済ませているため、読み込み専用で開き
+    ワーカー同士が書き込みロックを奪い合わないようにする
+    """
+    monitor = _worker_monitors.get(db_path)
+    if monitor is None:
+        from advanced_duplicate_monitor import AdvancedDuplicateMonitor
+        monitor = _worker_monitors[db_path] = AdvancedDuplicateMonitor(db_path, load_archive=False, read_only=True)
+    else:
+        # 直列実行ではメインプロセスで使い回すため、前回以降に登録された投稿を読み直す
+        monitor.history_cache.refresh()
+    monitor.similarity_threshold = similarity_threshold
+    return monitor
+
+
+def score_week(task: Dict) -> Dict:
+    """
+    1週間分の投稿を生成し、履歴との重複をスコアリング（ワーカープロセスで実行）
+
+    履歴は読み取りのみで検出記録も書き込まないため、どの順で実行しても結果は同じ
+    """
+    engine = PostGenerationEngine(log=lambda message: None)
+    posts = engine.generate_simple_posts(task['week_start'], task['theme'])
+
+    monitor = _worker_monitor(task['db_path'], task['similarity_threshold'])
+    batch_results = monitor.check_duplicates_batch(
+        [{'content': post['content'], 'animal_type': post_animal_type(post['content']), 'topic': task['theme']}
+         for post in posts],
+        task['months_back'], record_detections=False
+    )
+
+    return {
+        'week': task['week'],
+        'week_start': task['week_start'],
+        'theme': task['theme'],
+        'posts': [
+            {
+                'time': post['time'],
+                'content': post['content'],
+                'is_duplicate': is_duplicate,
+                'similarity': duplicates[0]['similarity'] if duplicates else 0.0
+            }
+            for post, (is_duplicate, duplicates) in zip(posts, batch_results)
+        ]
+    }
+
+
+class SchedulePlanner:
+    def __init__(self, duplicate_monitor, workers: Optional[int] = None,
+                 max_regeneration_attempts: int = 5,
+                 log: Optional[Callable[[str], None]] = None,
+                 progress: Optional[Callable[[float], None]] = None,
+                 seed: int = 0):
+        self.duplicate_monitor = duplicate_monitor  # マージ・登録はメインプロセスの接続で行う
+        self.workers = workers or os.cpu_count() or 1  # 並列に生成・スコアリングするプロセス数
+        self.log = log or print
+        self.progress = progress or (lambda value: None)
+        # プール項目の抽選は固定シードで行い、同じ入力から同じカレンダーを作る
+        self.engine = PostGenerationEngine(duplicate_monitor, max_regeneration_attempts, log=self.log,
+                                           rng=random.Random(seed))
+
+    def plan(self, start_date: datetime, weeks: int, themes: Sequence[str] = WEEK_THEMES,
+             months_back: int = 6, register: bool = True) -> Dict:
+        """
+        複数週のスケジュールを生成
+
+        Returns:
+            {'posts': 日時順のCSVの行, 'weeks': 週ごとの結果, 'successful': 成功数, 'failed': 失敗数,
+             'unfilled': 埋まらなかった枠の投稿日時}
+        """
+        tasks = [
+            dict(entry, db_path=os.path.abspath(self.duplicate_monitor.db_path), months_back=months_back,
+                 similarity_threshold=self.duplicate_monitor.similarity_threshold)
+            for entry in week_plan(start_date, weeks, themes)
+        ]
+
+        self.log(f"📅 {weeks}週分のスケジュールを生成中...（{min(self.workers, len(tasks))}プロセス）")
+        scored_weeks = self.score_weeks(tasks)
+        self.progress(60)
+
+        result = self.merge(scored_weeks, months_back)
+        if register:
+            for week in result['weeks']:
+                for post in week['posts']:
+                    self.duplicate_monitor.save_approved_post(
+                        post['content'], post['animal_type'], week['theme'], f"scheduled_{week['theme']}"
+                    )
+            self.log(f"📝 {result['successful']}件を投稿履歴に登録しました")
+        if result['unfilled']:
+            self.log(f"❌ 重複しない投稿で埋まらなかった枠: {', '.join(result['unfilled'])}")
+        self.progress(100)
+        return result
+
+    def score_weeks(self, tasks: List[Dict]) -> List[Dict]:
+        """週ごとの生成・スコアリングを並列実行（結果は週順）"""
+        workers = min(self.workers, len(tasks))
+        if workers <= 1:
+            return [score_week(task) for task in tasks]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(score_week, tasks))
+
+    def merge(self, scored_weeks: List[Dict], months_back: int) -> Dict:
+        """
+        週順・投稿順に承認し、履歴または先の週と重複する投稿は言い換えで回避
+        言い換えでも重複する枠はコンテンツプールの投稿（続く枠も重複する場合は質問と翌日の回答）で埋める
+
+        入力の順序だけで結果が決まるため、ワーカー数や完了順に関係なく同じカレンダーになる
+        """
+        monitor = self.duplicate_monitor
+        pool_index = self.engine.pool_availability()
+        accepted = []  # 承認済み投稿の (動物種, 特徴量)
+        accepted_hashes = set()
+        accepted_buckets = {}  # LSHバケットキー → 承認済み投稿のインデックス（履歴と同じ候補絞り込み）
+        weeks = []
+        unfilled = []  # 埋まらなかった枠の投稿日時
+
+        def is_planned_duplicate(content, features, animal_type):
+            if monitor.calculate_content_hash(content) in accepted_hashes:
+                return True
+            candidates = set()
+            for key in monitor.lsh_index.band_keys(features['normalized'], features['keywords']):
+                candidates.update(accepted_buckets.get(key, ()))
+            return any(
+                accepted[other][0] == animal_type and
+                monitor.calculate_feature_similarity(features, accepted[other][1]) >= monitor.similarity_threshold
+                for other in sorted(candidates)
+            )
+
+        def is_new(content, features, animal_type, theme_type):
+            """先の週とも履歴とも重複しないか"""
+            if is_planned_duplicate(content, features, animal_type):
+                return False
+            # 計画中のチェックは検出記録を残さない（--dry-run でもDBに書き込まないように）
+            [(is_duplicate, _)] = monitor.check_duplicates_batch(
+                [{'content': content, 'animal_type': animal_type, 'topic': theme_type}],
+                months_back, record_detections=False
+            )
+            return not is_duplicate
+
+        def accept(content, features, animal_type):
+            for key in monitor.lsh_index.band_keys(features['normalized'], features['keywords']):
+                accepted_buckets.setdefault(key, []).append(len(accepted))
+            accepted.append((animal_type, features))
+            accepted_hashes.add(monitor.calculate_content_hash(content))
+
+        def rephrase(content, animal_type, theme_type):
+            for attempt in range(self.engine.max_regeneration_attempts):
+                alternative = self.engine.generate_alternative_content(content, theme_type, attempt)
+                features = monitor.extract_features(alternative)
+                if is_new(alternative, features, animal_type, theme_type):
+                    return [(alternative, features)]
+            return None
+
+        def from_pool(animal_type, theme_type, pair):
+            """使える項目を重み付きLRUの順にすべて試し、重複しない投稿（pair なら質問と回答）を返す"""
+            single_pool, qa_pool = FILL_POOLS[animal_type]
+            pool_name, fields = (qa_pool, QA_FIELDS) if pair else (single_pool, (None,))
+            tried = []
+            while True:
+                index = pool_index.choose(pool_name, animal_type, theme_type, months_back, fields, exclude=tried)
+                if index is None:
+                    return None
+                tried.append(index)
+                texts = [pool_post(text, animal_type, self.engine)
+                         for text in entry_texts(self.engine.content_pools[pool_name][index], fields)]
+                candidates = [(text, monitor.extract_features(text)) for text in texts]
+                if all(is_new(text, features, animal_type, theme_type) for text, features in candidates):
+                    pool_index.mark_used(pool_name, index)
+                    return candidates
+
+        for index, week in enumerate(sorted(scored_weeks, key=lambda week: week['week'])):
+            theme_type = week['theme']
+            scored_posts = week['posts']
+            week_posts = []
+            answers = {}  # 動物種 → 前日の質問に対応する回答 (本文, 特徴量)
+
+            for position, post in enumerate(scored_posts):
+                content = post['content']
+                animal_type = post_animal_type(content)
+
+                if animal_type in answers:
+                    content, features = answers.pop(animal_type)
+                    self.log(f"📝 前日の質問に対応する回答: {post['time']}")
+                else:
+                    features = monitor.extract_features(content)
+                    if post['is_duplicate'] or is_planned_duplicate(content, features, animal_type):
+                        self.log(f"⚠️ 重複検出: {post['time']} {content[:30]}...")
+                        replacement = rephrase(content, animal_type, theme_type)
+                        if replacement is None:
+                            # 翌日の枠も重複していれば、質問と回答のペアで2枠を埋める
+                            following = scored_posts[position + 1] if position + 1 < len(scored_posts) else None
+                            pair = following is not None and post_animal_type(following['content']) == animal_type \
+                                and (following['is_duplicate'] or is_planned_duplicate(
+                                    following['content'], monitor.extract_features(following['content']), animal_type))
+                            replacement = (pair and from_pool(animal_type, theme_type, True)) \
+                                or from_pool(animal_type, theme_type, False)
+
+                        if replacement is None:
+                            self.log(f"❌ 重複回避失敗: {post['time']}")
+                            unfilled.append(post['time'])
+                            continue
+                        (content, features), *answer = replacement
+                        if answer:
+                            answers[animal_type] = answer[0]
+                        self.log(f"✅ 代替生成成功: {content[:30]}...")
+
+                accept(content, features, animal_type)
+                week_posts.append({'time': post['time'], 'content': content, 'animal_type': animal_type})
+
+            weeks.append({
+                'week': week['week'],
+                'week_start': week['week_start'].strftime('%Y-%m-%d'),
+                'theme': theme_type,
+                'posts': week_posts
+            })
+            self.progress(60 + (index + 1) / len(scored_weeks) * 30)
+
+        posts = sorted(
+            [post['time'], post['content'], str(len(post['content']))]
+            for week in weeks for post in week['posts']
+        )
+        return {'posts': posts, 'weeks': weeks, 'successful': len(posts), 'failed': len(unfilled),
+                'unfilled': sorted(unfilled)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VET-Assistant2 複数週スケジュールプランナー")
+    parser.add_argument("--weeks", type=int, default=13, help="生成する週数（既定: 約3か月）")
+    parser.add_argument("--themes", nargs="+", choices=WEEK_THEMES, default=list(WEEK_THEMES),
+                        help="週ごとに順番に割り当てるテーマ")
+    parser.add_argument("--start", help="開始日 YYYY-MM-DD（省略時は今日）")
+    parser.add_argument("--months-back", type=int, default=3, help="重複チェック期間（か月）")
+    parser.add_argument("--similarity", type=float, default=50, help="重複と判定する類似度（%%）")
+    parser.add_argument("--db", default="vet_assistant2_posts.db", help="投稿履歴データベースのパス")
+    parser.add_argument("--workers", type=int, help="並列プロセス数（省略時はCPU数）")
+    parser.add_argument("--format", choices=["csv", "json"], default="csv", help="出力形式")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR, help="出力先フォルダ")
+    parser.add_argument("--dry-run", action="store_true", help="投稿履歴に登録しない")
+    args = parser.parse_args()
+
+    if args.weeks <= 0:
+        parser.error("--weeks には正の数を指定してください")
+
+    if args.start:
+        start_date = datetime.strptime(args.start, '%Y-%m-%d')
+    else:
+        start_date = datetime.now()
+    start_date = start_date.replace(hour=7, minute=0, second=0, microsecond=0)
+
+    from advanced_duplicate_monitor import AdvancedDuplicateMonitor
+    monitor = AdvancedDuplicateMonitor(args.db, load_archive=False)
+    monitor.similarity_threshold = args.similarity / 100
+
+    planner = SchedulePlanner(monitor, workers=args.workers)
+    result = planner.plan(start_date, args.weeks, args.themes, args.months_back, register=not args.dry_run)
+
+    base_name = f"schedule_{start_date.strftime('%Y-%m-%d')}_{args.weeks}weeks"
+    if args.format == "csv":
+        output_path = write_csv(os.path.join(args.output_dir, f"{base_name}.csv"), result['posts'], 'utf-8-sig')
+    else:
+        output_path = os.path.join(args.output_dir, f"{base_name}.json")
+        os.makedirs(args.output_dir, exist_ok=True)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(result['weeks'], f, ensure_ascii=False, indent=2)
+    print(f"💾 {output_path} ({result['successful']}件成功, {result['failed']}件失敗)")
+    for time in result['unfilled']:
+        print(f"   ❌ 未設定の枠: {time}")
+    monitor.close()  # バッファの検出記録を書き込む
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,527 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Googleスプレッドシートへのアップロードパイプライン
+トークンバケットでAPI呼び出しを間引き、429・5xx・通信エラーはジッター付き指数バックオフで再試行する
+書き込み済みの行範囲はローカルのジャーナルに記録し、中断したアップロードは続きから再開する
+
+gspread には依存せず、Spreadsheet / Worksheet と同じメソッドを持つオブジェクトなら何でも扱える
+"""
+
+import csv
+import hashlib
+import json
+import os
+import random
+import time
+from datetime import datetime
+from numbers import Integral, Real
+from typing import Callable, Dict, List, Optional, Tuple
+
+from instrumentation import count, span
+
+# 生成結果のCSVの列（投稿レコードのキー）
+POST_RECORD_FIELDS = ['投稿日時', '投稿内容', '文字数']
+
+# 1回の batch_update に含めるデータ行数・文字数の上限（リクエストサイズ制限対策）
+BATCH_MAX_ROWS = 500
+BATCH_MAX_CHARS = 500000
+
+# フォーマット済みスケジュールシートの列
+SCHEDULE_HEADERS = ["投稿日時", "投稿内容", "文字数", "投稿済み", "備考", "ハッシュタグ"]
+
+# 投稿済み列の選択肢（先頭が初期値）
+POST_STATUS_VALUES = ['未投稿', '投稿済み', '下書き']
+
+# 生成結果から書き込む列（投稿日時・投稿内容・文字数・ハッシュタグ）
+# 投稿済み・備考はスタッフが手入力するため、同期時は既存の値を残す
+MANAGED_COLUMNS = (0, 1, 2, 5)
+
+# ハッシュタグ列に抽出するタグ
+SCHEDULE_HASHTAGS = ['#猫のあれこれ', '#獣医が教える犬のはなし']
+
+# 書き込みリクエストの平均レート（Sheets APIの既定クォータ 60回/分/ユーザー）とバースト数
+REQUESTS_PER_SECOND = 1.0
+BURST_REQUESTS = 5
+
+# 再試行の回数とバックオフ（秒）
+MAX_RETRIES = 6
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 64.0
+
+# アップロードジャーナルの保存先
+JOURNAL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "output", "sheets_upload_journal.json")
+
+
+def cell_data(value) -> Dict:
+    """セルの値を updateCells の CellData に変換"""
+    if isinstance(value, Integral):
+        return {'userEnteredValue': {'numberValue': int(value)}}
+    if isinstance(value, Real):
+        return {'userEnteredValue': {'numberValue': float(value)}}
+    return {'userEnteredValue': {'stringValue': str(value)}}
+
+
+def read_post_records(csv_file_path: str) -> List[Dict]:
+    """生成結果のCSVを投稿レコードとして1行ずつ読み込む（UTF-8、BOM付きにも対応）"""
+    records = []
+    with open(csv_file_path, 'r', encoding='utf-8-sig', newline='') as f:
+        for record in csv.DictReader(f):
+            if str(record.get('文字数', '')).isdigit():
+                record['文字数'] = int(record['文字数'])
+            records.append(record)
+    return records
+
+
+def post_records(rows: List[List]) -> List[Dict]:
+    """生成エンジンのCSVの行（投稿日時・投稿内容・文字数）を投稿レコードに変換"""
+    return [{'投稿日時': time, '投稿内容': content, '文字数': int(char_count)}
+            for time, content, char_count in rows]
+
+
+def as_post_records(posts) -> List[Dict]:
+    """CSVのパス・投稿レコードのリスト・DataFrame のいずれかを投稿レコードのリストにする"""
+    if isinstance(posts, (str, os.PathLike)):
+        return read_post_records(posts)
+    if hasattr(posts, 'to_dict'):
+        # pandas.DataFrame（pandas 自体はこのモジュールでは読み込まない）
+        return posts.to_dict('records')
+    return list(posts)
+
+
+def schedule_rows(records: List[Dict]) -> List[List]:
+    """CSVの行（投稿日時・投稿内容・文字数）をスケジュールシートの行に変換"""
+    rows = []
+    for record in records:
+        content = record['投稿内容']
+        hashtags = [hashtag for hashtag in SCHEDULE_HASHTAGS if hashtag in content]
+        rows.append([record['投稿日時'], content, record['文字数'], POST_STATUS_VALUES[0], "", ', '.join(hashtags)])
+    return rows
+
+
+def row_chunks(rows: List[List], max_rows: int = BATCH_MAX_ROWS,
+               max_chars: int = BATCH_MAX_CHARS) -> List[Tuple[int, int]]:
+    """データ行を行数と文字数の上限ごとに分割した (開始, 終了) の範囲を返す"""
+    chunks = []
+    chunk_start = 0
+    chunk_chars = 0
+    for index, row in enumerate(rows):
+        row_chars = sum(len(str(value)) for value in row)
+        if index > chunk_start and (index - chunk_start >= max_rows or chunk_chars + row_chars > max_chars):
+            chunks.append((chunk_start, index))
+            chunk_start, chunk_chars = index, 0
+        chunk_chars += row_chars
+    if rows:
+        chunks.append((chunk_start, len(rows)))
+    return chunks
+
+
+def update_cells_request(sheet_id: int, start_row: int, values: List[List], start_column: int = 0) -> Dict:
+    """指定セルから値を書き込む updateCells リクエスト"""
+    return {
+        'updateCells': {
+            'start': {'sheetId': sheet_id, 'rowIndex': start_row, 'columnIndex': start_column},
+            'rows': [{'values': [cell_data(value) for value in row]} for row in values],
+            'fields': 'userEnteredValue'
+        }
+    }
+
+
+def header_requests(sheet_id: int, row_count: int) -> List[Dict]:
+    """ヘッダー行の値・書式と投稿済み列のデータ検証のリクエスト"""
+    requests = [
+        update_cells_request(sheet_id, 0, [SCHEDULE_HEADERS]),
+        {
+            'repeatCell': {
+                'range': {'sheetId': sheet_id, 'startRowIndex': 0, 'endRowIndex': 1,
+                          'startColumnIndex': 0, 'endColumnIndex': len(SCHEDULE_HEADERS)},
+                'cell': {'userEnteredFormat': {
+                    'textFormat': {'bold': True},
+                    'backgroundColor': {'red': 0.9, 'green': 0.9, 'blue': 0.9}
+                }},
+                'fields': 'userEnteredFormat(textFormat,backgroundColor)'
+            }
+        }
+    ]
+    if row_count:
+        requests.append(status_validation_request(sheet_id, 1, row_count + 1))
+    return requests
+
+
+def status_validation_request(sheet_id: int, start_row: int, end_row: int) -> Dict:
+    """投稿済み列（D列）の選択肢のデータ検証"""
+    return {
+        'setDataValidation': {
+            'range': {
+                'sheetId': sheet_id,
+                'startRowIndex': start_row,
+                'endRowIndex': end_row,
+                'startColumnIndex': 3,
+                'endColumnIndex': 4
+            },
+            'rule': {
+                'condition': {
+                    'type': 'ONE_OF_LIST',
+                    'values': [{'userEnteredValue': value} for value in POST_STATUS_VALUES]
+                },
+                'showCustomUi': True
+            }
+        }
+    }
+
+
+def diff_schedule(existing: List[List[str]], rows: List[List]) -> Dict:
+    """
+    既存シートの値と生成結果を投稿日時をキーに比較
+
+    Args:
+        existing: シートの表示値（1行目はヘッダー）
+        rows: schedule_rows() の行
+
+    Returns:
+        {'cells': 変更するセルの (行, 列, 値), 'append': 追加する行, 'unchanged': 変更のない行数}
+        （行・列は0始まり、投稿済み・備考列は既存の値を変更しない）
+    """
+    def cell(sheet_row, column):
+        return sheet_row[column] if column < len(sheet_row) else ""
+
+    cells = []
+    header = existing[0] if existing else []
+    for column, value in enumerate(SCHEDULE_HEADERS):
+        if cell(header, column) != value:
+            cells.append((0, column, value))
+
+    row_by_time = {}
+    for index, sheet_row in enumerate(existing[1:], 1):
+        if cell(sheet_row, 0):
+            row_by_time.setdefault(cell(sheet_row, 0), index)
+
+    append = []
+    unchanged = 0
+    for row in rows:
+        index = row_by_time.get(str(row[0]))
+        if index is None:
+            append.append(row)
+            continue
+        changed = [(index, column, row[column]) for column in MANAGED_COLUMNS
+                   if cell(existing[index], column) != str(row[column])]
+        cells.extend(changed)
+        unchanged += not changed
+
+    return {'cells': cells, 'append': append, 'unchanged': unchanged}
+
+
+def cell_update_requests(sheet_id: int, cells: List[Tuple[int, int, object]]) -> List[Dict]:
+    """変更セルを行ごと・連続する列ごとにまとめた updateCells リクエスト"""
+    requests = []
+    run = []
+    for row, column, value in sorted(cells, key=lambda cell: cell[:2]):
+        if run and (row != run[0][0] or column != run[-1][1] + 1):
+            requests.append(update_cells_request(sheet_id, run[0][0], [[cell[2] for cell in run]], run[0][1]))
+            run = []
+        run.append((row, column, value))
+    if run:
+        requests.append(update_cells_request(sheet_id, run[0][0], [[cell[2] for cell in run]], run[0][1]))
+    return requests
+
+
+def request_size(request: Dict) -> Tuple[int, int]:
+    """リクエストで書き込む行数と文字数（updateCells 以外は 0）"""
+    params = request.get('updateCells')
+    if params is None:
+        return 0, 0
+    chars = sum(len(str(value)) for row in params['rows'] for cell in row['values']
+                for value in cell['userEnteredValue'].values())
+    return len(params['rows']), chars
+
+
+def request_batches(requests: List[Dict], max_rows: int = BATCH_MAX_ROWS,
+                    max_chars: int = BATCH_MAX_CHARS) -> List[List[Dict]]:
+    """リクエストを順番を保ったまま、書き込む行数と文字数の上限ごとの batch_update に分ける"""
+    batches = []
+    batch_rows = 0
+    batch_chars = 0
+    for request in requests:
+        rows, chars = request_size(request)
+        if batches and batches[-1] and (batch_rows + rows > max_rows or batch_chars + chars > max_chars):
+            batches.append([])
+            batch_rows = batch_chars = 0
+        if not batches:
+            batches.append([])
+        batches[-1].append(request)
+        batch_rows += rows
+        batch_chars += chars
+    return batches
+
+
+def upload_key(spreadsheet_url: str, records: List[Dict], mode: str) -> str:
+    """アップロード先・投稿の内容・方式からジャーナルのキーを作る（内容が変われば別のアップロード）"""
+    digest = hashlib.sha256(f"{mode}\n{spreadsheet_url}\n".encode('utf-8'))
+    digest.update(json.dumps(records, ensure_ascii=False, sort_keys=True, default=str).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """レート制限（429）・サーバーエラー（5xx）・通信エラーなら再試行する"""
+    status = getattr(getattr(error, 'response', None), 'status_code', None)
+    if status is None:
+        status = getattr(error, 'code', None)
+    if isinstance(status, int):
+        return status in (408, 429) or status >= 500
+    return isinstance(error, OSError)
+
+
+class TokenBucket:
+    def __init__(self, rate: float = REQUESTS_PER_SECOND, capacity: int = BURST_REQUESTS,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.rate = rate  # 1秒あたりに補充するトークン数
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+
+    def acquire(self):
+        """トークンを1つ取得（足りなければ補充されるまで待つ）"""
+        while True:
+            now = self.clock()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            self.sleep((1 - self.tokens) / self.rate)
+
+
+class UploadJournal:
+    def __init__(self, path: str = JOURNAL_PATH):
+        self.path = path
+        self.uploads = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.uploads = json.load(f).get('uploads', {})
+
+    def entry(self, key: str) -> Optional[Dict]:
+        """途中までのアップロードの記録（なければ None）"""
+        return self.uploads.get(key)
+
+    def start(self, key: str, sheet_name: str, sheet_id: int, row_count: int) -> Dict:
+        """新しいアップロードを記録"""
+        self.uploads[key] = {
+            'sheet_name': sheet_name,
+            'sheet_id': sheet_id,
+            'row_count': row_count,
+            'header': False,
+            'ranges': [],
+            'updated_at': datetime.now().isoformat(timespec='seconds')
+        }
+        self.save()
+        return self.uploads[key]
+
+    def mark_written(self, key: str, start: int, end: int, header: bool = False):
+        """書き込み済みの行範囲 [start, end) を記録"""
+        entry = self.uploads[key]
+        entry['ranges'].append([start, end])
+        entry['header'] = entry['header'] or header
+        entry['updated_at'] = datetime.now().isoformat(timespec='seconds')
+        self.save()
+
+    def is_written(self, key: str, start: int, end: int) -> bool:
+        """範囲内の行がすべて書き込み済みか"""
+        written = set()
+        for range_start, range_end in self.uploads[key]['ranges']:
+            written.update(range(range_start, range_end))
+        return all(row in written for row in range(start, end))
+
+    def complete(self, key: str):
+        """完了したアップロードの記録を削除"""
+        if self.uploads.pop(key, None) is not None:
+            self.save()
+
+    def save(self):
+        """一時ファイルに書いてから置き換える（書き込み途中で中断してもジャーナルは壊れない）"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'uploads': self.uploads}, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.path)
+
+
+class SheetsUploadPipeline:
+    def __init__(self, spreadsheet=None, journal: Optional[UploadJournal] = None,
+                 bucket: Optional[TokenBucket] = None,
+                 max_retries: int = MAX_RETRIES, base_delay: float = BACKOFF_BASE_SECONDS,
+                 max_delay: float = BACKOFF_MAX_SECONDS, sleep: Callable[[float], None] = time.sleep,
+                 rng: Optional[random.Random] = None, log: Optional[Callable[[str], None]] = None):
+        self.spreadsheet = spreadsheet  # open() で開くこともできる
+        self.journal = journal or UploadJournal()
+        self.bucket = bucket or TokenBucket(sleep=sleep)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.sleep = sleep
+        self.random = rng or random.Random()
+        self.log = log or print
+        self.max_rows = BATCH_MAX_ROWS  # 1回のリクエストに含める行数・文字数の上限
+        self.max_chars = BATCH_MAX_CHARS
+        self.requests = 0  # 実際に送信したAPI呼び出し数（再試行を含む）
+
+    def call(self, func, *args, **kwargs):
+        """レート制限を守ってAPIを呼び出し、再試行できるエラーはバックオフして再送"""
+        name = f"sheets.{getattr(func, '__name__', 'call')}"  # 計測区間はAPIメソッドごと
+        for attempt in range(self.max_retries + 1):
+            with span('sheets.rate_limit_wait'):
+                self.bucket.acquire()
+            self.requests += 1
+            try:
+                with span(name):
+                    return func(*args, **kwargs)
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable_error(e):
+                    raise
+                count('sheets.retries')
+                # フルジッター: 0 〜 min(上限, 基準 × 2^試行回数) の一様乱数だけ待つ
+                delay = self.random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                self.log(f"⏳ API呼び出しを再試行します ({attempt + 1}/{self.max_retries}, {delay:.1f}秒後): {e}")
+                with span('sheets.backoff'):
+                    self.sleep(delay)
+
+    def open(self, client, spreadsheet_url: str):
+        """クライアントからスプレッドシートを開く"""
+        self.spreadsheet = self.call(client.open_by_url, spreadsheet_url)
+        return self.spreadsheet
+
+    def find_worksheet(self, title: str = None, sheet_id: int = None):
+        """タイトルまたはシートIDでワークシートを探す（なければ None）"""
+        for worksheet in self.call(self.spreadsheet.worksheets):
+            if (sheet_id is not None and worksheet.id == sheet_id) or (title is not None and worksheet.title == title):
+                return worksheet
+        return None
+
+    def upload_schedule(self, key: str, sheet_name: str, rows: List[List]) -> Dict:
+        """
+        フォーマット済みスケジュールシートを作成して行を書き込む
+
+        ジャーナルに途中までの記録があれば同じシートの続きから書き込み、
+        なければ同名のシートを作り直す。1回目の batch_update にヘッダー・ヘッダー書式・データ検証を含め、
+        データ行は行数と文字数の上限ごとに分割する（通常の週次スケジュールは1回の呼び出しで済む）
+        """
+        entry = self.journal.entry(key)
+        worksheet = self.find_worksheet(sheet_id=entry['sheet_id']) if entry else None
+        resumed = worksheet is not None
+
+        if resumed:
+            self.log(f"🔁 前回のアップロードを再開します: {entry['sheet_name']}")
+        else:
+            old_sheet = self.find_worksheet(title=sheet_name)
+            if old_sheet is not None:
+                self.call(self.spreadsheet.del_worksheet, old_sheet)
+            worksheet = self.call(self.spreadsheet.add_worksheet, title=sheet_name,
+                                  rows=len(rows) + 10, cols=len(SCHEDULE_HEADERS))
+            entry = self.journal.start(key, sheet_name, worksheet.id, len(rows))
+
+        for start, end in row_chunks(rows, self.max_rows, self.max_chars) or [(0, 0)]:
+            if entry['header'] and self.journal.is_written(key, start, end):
+                continue
+            requests = [] if entry['header'] else header_requests(worksheet.id, len(rows))
+            if end > start:
+                requests.append(update_cells_request(worksheet.id, start + 1, rows[start:end]))
+            self.call(self.spreadsheet.batch_update, {'requests': requests})
+            self.journal.mark_written(key, start, end, header=True)
+
+        self.journal.complete(key)
+        return {'sheet_name': entry['sheet_name'], 'rows': len(rows), 'resumed': resumed}
+
+    def sync_schedule(self, key: str, sheet_name: str, rows: List[List]) -> Dict:
+        """
+        スケジュールシートを差分で同期
+
+        既存シートを1回だけ読み込み、投稿日時が同じ行は変更されたセルだけを書き換え、
+        新しい投稿日時の行は末尾に追加する（投稿済み・備考の手入力とシートにしかない行は残す）
+        シートがない場合・前回の作成が中断している場合は upload_schedule() で作成する
+        （同期では既存のシートを削除しない）
+        """
+        entry = self.journal.entry(key)
+        if entry and self.find_worksheet(sheet_id=entry['sheet_id']) is not None:
+            result = self.upload_schedule(key, sheet_name, rows)
+            result.update({'created': True, 'updated_cells': 0, 'appended_rows': len(rows), 'unchanged_rows': 0})
+            return result
+        if entry:
+            # 作成途中のシートが削除されている場合は記録を捨て、同名の既存シートと差分で同期する
+            self.journal.complete(key)
+
+        worksheet = self.find_worksheet(title=sheet_name)
+        if worksheet is None:
+            result = self.upload_schedule(key, sheet_name, rows)
+            result.update({'created': True, 'updated_cells': 0, 'appended_rows': len(rows), 'unchanged_rows': 0})
+            return result
+
+        existing = self.call(worksheet.get_all_values)
+        diff = diff_schedule(existing, rows)
+
+        requests = cell_update_requests(worksheet.id, diff['cells'])
+        if diff['append']:
+            start_row = max(len(existing), 1)
+            end_row = start_row + len(diff['append'])
+            row_count = getattr(worksheet, 'row_count', None)
+            if row_count is not None and end_row > row_count:
+                requests.insert(0, {'appendDimension': {
+                    'sheetId': worksheet.id, 'dimension': 'ROWS', 'length': end_row - row_count
+                }})
+            for start, end in row_chunks(diff['append'], self.max_rows, self.max_chars):
+                requests.append(update_cells_request(worksheet.id, start_row + start, diff['append'][start:end]))
+            requests.append(status_validation_request(worksheet.id, start_row, end_row))
+
+            # 既存の行より前の日時が追加された場合のみ日時順に並べ直す
+            existing_times = [row[0] for row in existing[1:] if row and row[0]]
+            if existing_times and min(str(row[0]) for row in diff['append']) < max(existing_times):
+                requests.append({'sortRange': {
+                    'range': {'sheetId': worksheet.id, 'startRowIndex': 1, 'endRowIndex': end_row,
+                              'startColumnIndex': 0, 'endColumnIndex': len(SCHEDULE_HEADERS)},
+                    'sortSpecs': [{'dimensionIndex': 0, 'sortOrder': 'ASCENDING'}]
+                }})
+
+        # 変更がなければ書き込みのAPI呼び出しは行わない（多い場合は upload_schedule() と同じ行数・文字数の上限で分割）
+        for batch in request_batches(requests, self.max_rows, self.max_chars):
+            self.call(self.spreadsheet.batch_update, {'requests': batch})
+
+        updated_cells = len(diff['cells'])
+        self.log(f"🔄 シート同期: {updated_cells}セル更新, {len(diff['append'])}行追加, {diff['unchanged']}行変更なし")
+        return {'sheet_name': sheet_name, 'rows': len(rows), 'resumed': False, 'created': False,
+                'updated_cells': updated_cells, 'appended_rows': len(diff['append']),
+                'unchanged_rows': diff['unchanged']}
+
+    def upload_rows(self, key: str, sheet_name: str, header: List[str], rows: List[List],
+                    clear_existing: bool = True) -> Dict:
+        """
+        ヘッダーとデータ行をそのままシートに書き込む（書式なし）
+
+        ジャーナルに途中までの記録があればクリアせずに続きの行から書き込む
+        """
+        entry = self.journal.entry(key)
+        worksheet = self.find_worksheet(sheet_id=entry['sheet_id']) if entry else None
+        resumed = worksheet is not None
+
+        if resumed:
+            self.log(f"🔁 前回のアップロードを再開します: {entry['sheet_name']}")
+        else:
+            worksheet = self.find_worksheet(title=sheet_name)
+            if worksheet is None:
+                worksheet = self.call(self.spreadsheet.add_worksheet, title=sheet_name,
+                                      rows=len(rows) + 10, cols=len(header) + 2)
+            elif clear_existing:
+                self.call(worksheet.clear)
+            entry = self.journal.start(key, sheet_name, worksheet.id, len(rows))
+
+        for start, end in row_chunks(rows, self.max_rows, self.max_chars) or [(0, 0)]:
+            if entry['header'] and self.journal.is_written(key, start, end):
+                continue
+            # 1行目はヘッダー（データ行 i はシートの i + 2 行目）
+            values = rows[start:end] if entry['header'] else [header] + rows[start:end]
+            first_row = start + 2 if entry['header'] else 1
+            self.call(self.spreadsheet.values_update, f"'{worksheet.title}'!A{first_row}",
+                      params={'valueInputOption': 'RAW'}, body={'values': values})
+            self.journal.mark_written(key, start, end, header=True)
+
+        self.journal.complete(key)
+        return {'sheet_name': entry['sheet_name'], 'rows': len(rows), 'resumed': resumed}
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本文の類似度計算バックエンド
+重複チェックの文字列類似度（正規化済み本文どうし）を差し替えられるようにする
+
+    exact   : difflib.SequenceMatcher.ratio()（従来の計算、既定）
+    shingle : 文字n-gram集合の Dice / コサイン / Jaccard（純Python）
+    numpy   : shingle と同じ値を、履歴側を疎行列（CSR形式の配列）にして1回の行列演算で計算
+              （NumPy がない環境では shingle と同じ純Python計算にフォールバック）
+
+どのバックエンドも prepare() で履歴側を1回だけ前処理し、similarities() で
+1件の候補を複数の履歴と一括で比較する
+"""
+
+import difflib
+import math
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # NumPy は任意（なければ純Python計算）
+    np = None
+
+# 文字n-gramの長さ
+SHINGLE_SIZE = 2
+
+# 集合類似度の計算式（共通部分の数, 集合Aの大きさ, 集合Bの大きさ → 類似度）
+SHINGLE_METRICS = {
+    'dice': lambda common, size1, size2: 2 * common / (size1 + size2) if size1 + size2 else 0.0,
+    'cosine': lambda common, size1, size2: common / math.sqrt(size1 * size2) if size1 and size2 else 0.0,
+    'jaccard': lambda common, size1, size2: common / (size1 + size2 - common) if size1 + size2 - common else 0.0
+}
+
+# 既定のバックエンド（calibrate_similarity.py で判定の一致を確認してから変更する）
+DEFAULT_BACKEND = 'exact'
+
+
+class SequenceMatcherBackend:
+    """difflib.SequenceMatcher による従来の類似度"""
+
+    name = 'exact'
+
+    def similarity(self, text1: str, text2: str) -> float:
+        return difflib.SequenceMatcher(None, text1, text2).ratio()
+
+    def prepare(self, texts: Sequence[str]):
+        return list(texts)
+
+    def similarities(self, text: str, prepared, rows: Optional[Sequence[int]] = None) -> List[float]:
+        """候補1件と履歴（rows 指定時はその行のみ）の類似度"""
+        if rows is None:
+            rows = range(len(prepared))
+        # similarity(候補, 履歴) と同じ向きで比較する（ratio() は引数の順で結果が変わることがある）
+        matcher = difflib.SequenceMatcher(None, text, '')
+        results = []
+        for row in rows:
+            matcher.set_seq2(prepared[row])
+            results.append(matcher.ratio())
+        return results
+
+
+class ShingleBackend:
+    """文字n-gram集合の類似度（純Python）"""
+
+    name = 'shingle'
+
+    def __init__(self, metric: str = 'dice', size: int = SHINGLE_SIZE):
+        self.metric = metric
+        self.score = SHINGLE_METRICS[metric]
+        self.size = size
+
+    def shingles(self, text: str) -> set:
+        """文字n-gramの集合（n文字未満の本文は本文全体を1つのn-gramとする）"""
+        if len(text) < self.size:
+            return {text} if text else set()
+        return {text[i:i + self.size] for i in range(len(text) - self.size + 1)}
+
+    def similarity(self, text1: str, text2: str) -> float:
+        shingles1 = self.shingles(text1)
+        shingles2 = self.shingles(text2)
+        return self.score(len(shingles1 & shingles2), len(shingles1), len(shingles2))
+
+    def prepare(self, texts: Sequence[str]):
+        return [self.shingles(text) for text in texts]
+
+    def similarities(self, text: str, prepared, rows: Optional[Sequence[int]] = None) -> List[float]:
+        if rows is None:
+            rows = range(len(prepared))
+        shingles = self.shingles(text)
+        return [self.score(len(shingles & prepared[row]), len(shingles), len(prepared[row])) for row in rows]
+
+
+class ShingleMatrix:
+    """履歴側のn-gram集合を CSR 形式の疎行列（行ごとのn-gram ID配列）で保持"""
+
+    def __init__(self, shingle_sets: Sequence[set]):
+        self.vocabulary: Dict[str, int] = {}
+        indices = []
+        row_ids = []
+        for row, shingles in enumerate(shingle_sets):
+            for shingle in shingles:
+                indices.append(self.vocabulary.setdefault(shingle, len(self.vocabulary)))
+            row_ids.extend([row] * len(shingles))
+        self.rows = len(shingle_sets)
+        self.indices = np.array(indices, dtype=np.int64)
+        self.row_ids = np.array(row_ids, dtype=np.int64)
+        self.sizes = np.array([len(shingles) for shingles in shingle_sets], dtype=np.float64)
+
+    def common_counts(self, shingles: set):
+        """候補の0/1ベクトルとの積（行ごとの共通n-gram数）"""
+        vector = np.zeros(len(self.vocabulary) + 1, dtype=np.float64)
+        vector[[self.vocabulary[shingle] for shingle in shingles if shingle in self.vocabulary]] = 1.0
+        return np.bincount(self.row_ids, weights=vector[self.indices], minlength=self.rows)
+
+
+class NumpyShingleBackend(ShingleBackend):
+    """ShingleBackend と同じ値を NumPy の一括演算で計算"""
+
+    name = 'numpy'
+
+    def prepare(self, texts: Sequence[str]):
+        shingle_sets = super().prepare(texts)
+        if np is None:
+            return shingle_sets
+        return ShingleMatrix(shingle_sets)
+
+    def similarities(self, text: str, prepared, rows: Optional[Sequence[int]] = None) -> List[float]:
+        if not isinstance(prepared, ShingleMatrix):
+            return super().similarities(text, prepared, rows)
+
+        shingles = self.shingles(text)
+        common = prepared.common_counts(shingles)
+        size = float(len(shingles))
+        sizes = prepared.sizes
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if self.metric == 'dice':
+                scores = 2 * common / (size + sizes)
+            elif self.metric == 'cosine':
+                scores = common / np.sqrt(size * sizes)
+            else:
+                scores = common / (size + sizes - common)
+        scores = np.nan_to_num(scores, nan=0.0, posinf=0.0)
+        if rows is not None:
+            scores = scores[np.asarray(rows, dtype=np.int64)]
+        return scores.tolist()
+
+
+BACKENDS = {
+    'exact': SequenceMatcherBackend,
+    'shingle': ShingleBackend,
+    'numpy': NumpyShingleBackend
+}
+
+
+def get_backend(name: str = DEFAULT_BACKEND, metric: str = 'dice'):
+    """名前からバックエンドを作成（exact 以外は集合類似度の計算式を指定できる）"""
+    if name not in BACKENDS:
+        raise ValueError(f"未対応の類似度バックエンドです: {name}（{', '.join(BACKENDS)}）")
+    if name == 'exact':
+        return SequenceMatcherBackend()
+    return BACKENDS[name](metric)
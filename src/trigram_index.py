@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+正規化本文・主要ポイントの文字3-gram全文検索インデックス（SQLite FTS5）
+post_history を外部コンテンツとする trigram トークナイザのFTS5テーブルをトリガーで同期し、
+「候補と特徴的な3-gramを N 個以上共有する投稿」をSQLだけで求める
+
+    - 多くの投稿に現れる3-gram（定型句・URLなど）は特徴的でないとして数えない
+    - FTS5 を使えないSQLiteでは作成せず、問い合わせは空の結果を返す
+    - 登録するのは直近の投稿（post_history）のみ。post_history_archive に移した古い投稿は
+      削除トリガーで登録から外れ、古い投稿の候補はLSHバケットで探す
+    - 使うのはプールの類似度行列の比較対象の追加のみ（重複チェックの候補はメモリ上のLSHで絞り込む）
+"""
+
+import json
+import math
+import sqlite3
+from typing import Dict, Iterable, List
+
+# 特徴的でない3-gramとみなす出現投稿数の割合（この割合を超える投稿に現れるもの）
+COMMON_TRIGRAM_RATIO = 0.05
+
+# 履歴が少ないうちはこの投稿数までの出現を特徴的とみなす
+COMMON_TRIGRAM_MIN_DOCS = 20
+
+# 共有する特徴的な3-gramの数の下限（候補の特徴的な3-gramに対する割合と、最小の個数）
+SHARED_TRIGRAM_RATIO = 0.3
+MIN_SHARED_TRIGRAMS = 5
+
+# 1回のSQLで渡す3-gramの数の上限（SQLITE_MAX_VARIABLE_NUMBER の旧既定値 999 未満）
+# 共有数の問い合わせでは、これを超える分は出現投稿数の多い3-gramから除く
+QUERY_CHUNK_SIZE = 500
+
+TRIGGERS = [
+    '''
+    CREATE TRIGGER IF NOT EXISTS post_trigrams_insert AFTER INSERT ON post_history BEGIN
+        INSERT INTO post_trigrams (rowid, normalized_content, main_points)
+        VALUES (new.id, new.normalized_content, new.main_points);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS post_trigrams_delete AFTER DELETE ON post_history BEGIN
+        INSERT INTO post_trigrams (post_trigrams, rowid, normalized_content, main_points)
+        VALUES ('delete', old.id, old.normalized_content, old.main_points);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS post_trigrams_update AFTER UPDATE OF normalized_content, main_points
+    ON post_history BEGIN
+        INSERT INTO post_trigrams (post_trigrams, rowid, normalized_content, main_points)
+        VALUES ('delete', old.id, old.normalized_content, old.main_points);
+        INSERT INTO post_trigrams (rowid, normalized_content, main_points)
+        VALUES (new.id, new.normalized_content, new.main_points);
+    END
+    '''
+]
+
+
+def trigrams(text: str) -> set:
+    """FTS5 の trigram トークナイザと同じ3文字ずつの部分文字列"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    def __init__(self):
+        self.available = True  # FTS5 の trigram トークナイザを使えるか（create_schema で判定）
+
+    def create_schema(self, cursor):
+        """FTS5テーブル・語彙テーブル・同期用トリガーを作成（新規作成時は既存の投稿を登録）"""
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'post_trigrams'")
+        exists = cursor.fetchone() is not None
+        try:
+            cursor.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS post_trigrams USING fts5(
+                    normalized_content, main_points,
+                    content='post_history', content_rowid='id',
+                    tokenize='trigram', detail='none'
+                )
+            ''')
+        except sqlite3.OperationalError as e:
+            # FTS5 または trigram トークナイザ（SQLite 3.34以降）がない
+            print(f"⚠️ 3-gram全文検索インデックスを作成できません: {e}")
+            self.available = False
+            return
+
+        cursor.execute('CREATE VIRTUAL TABLE IF NOT EXISTS post_trigram_terms USING fts5vocab(post_trigrams, row)')
+        cursor.execute('CREATE VIRTUAL TABLE IF NOT EXISTS post_trigram_docs USING fts5vocab(post_trigrams, instance)')
+        for trigger in TRIGGERS:
+            cursor.execute(trigger)
+        if not exists:
+            cursor.execute("INSERT INTO post_trigrams (post_trigrams) VALUES ('rebuild')")
+
+    def optimize(self, cursor):
+        """追加のたびに増えたインデックスの断片を1つにまとめる（ファイルサイズの縮小）"""
+        cursor.execute("INSERT INTO post_trigrams (post_trigrams) VALUES ('optimize')")
+
+    def distinctive(self, cursor, terms: Iterable[str]) -> List[str]:
+        """多くの投稿に現れる3-gramを除き、出現投稿数の少ない順に並べたもの"""
+        terms = sorted(terms)
+        cursor.execute('SELECT COUNT(*) FROM post_history')
+        max_docs = max(COMMON_TRIGRAM_MIN_DOCS, cursor.fetchone()[0] * COMMON_TRIGRAM_RATIO)
+        docs = {}
+        for start in range(0, len(terms), QUERY_CHUNK_SIZE):
+            batch = terms[start:start + QUERY_CHUNK_SIZE]
+            cursor.execute(f'''
+                SELECT term, doc FROM post_trigram_terms WHERE term IN ({', '.join(['?'] * len(batch))})
+            ''', batch)
+            docs.update(cursor.fetchall())
+        # 履歴にない3-gramは共有されようがないので除く
+        terms = [term for term in terms if 0 < docs.get(term, 0) <= max_docs]
+        return sorted(terms, key=lambda term: (docs[term], term))
+
+    def overlapping(self, cursor, normalized_content: str, main_points: Iterable[str] = (),
+                    after_id: int = 0, max_id: int = None) -> Dict[int, int]:
+        """
+        候補と特徴的な3-gramを一定数以上共有する直近の投稿（post_history_archive の投稿は含まない）
+
+        Args:
+            normalized_content: 候補の正規化本文
+            main_points: 候補の主要ポイント（保存時と同じくJSONにして3-gramを取る）
+            after_id, max_id: 対象にする投稿IDの範囲（after_id より大きく max_id 以下）
+
+        Returns:
+            投稿ID → 共有する特徴的な3-gramの数
+        """
+        if not self.available:
+            return {}
+        terms = trigrams(normalized_content) | trigrams(json.dumps(list(main_points), ensure_ascii=False))
+        terms = self.distinctive(cursor, terms)[:QUERY_CHUNK_SIZE]
+        if not terms:
+            return {}
+        min_shared = max(MIN_SHARED_TRIGRAMS, math.ceil(len(terms) * SHARED_TRIGRAM_RATIO))
+
+        id_filter = '' if max_id is None else ' AND doc <= ?'
+        cursor.execute(f'''
+            SELECT doc, COUNT(DISTINCT term) FROM post_trigram_docs
+            WHERE term IN ({', '.join(['?'] * len(terms))}) AND doc > ?{id_filter}
+            GROUP BY doc HAVING COUNT(DISTINCT term) >= ?
+        ''', terms + [after_id] + ([] if max_id is None else [max_id]) + [min_shared])
+        return dict(cursor.fetchall())
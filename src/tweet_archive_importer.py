@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+X（旧Twitter）アーカイブの投稿取り込み
+window.YTD.tweets.part* の配列を1件ずつストリーミングで解析し、
+ツイートIDとコンテンツハッシュで重複を除いてバッチ単位で投稿履歴に追加する
+（ファイルごとのチェックポイントから再開でき、複数パートのアーカイブにも対応）
+"""
+
+import json
+import os
+import re
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from history_partitions import ALL_POSTS
+from veterinary_vocabulary import ANIMAL_HASHTAGS
+
+# 1回に読み込む文字数（メモリ使用量はおおよそ この値 + 最大の1件分 に収まる）
+CHUNK_SIZE = 1 << 16
+
+# 配列の開始位置（例: window.YTD.tweets.part0 = [ ）
+ARCHIVE_PREFIX = re.compile(r'window\.YTD\.tweets\.part\d+\s*=\s*\[')
+
+# 分割アーカイブのファイル名（tweets.js, tweets-part1.js, tweets-part2.js, ...）
+ARCHIVE_FILE_NAME = re.compile(r'^tweets(?:-part(\d+))?\.js$')
+
+# ツイートの投稿日時の形式（例: Wed Aug 06 09:00:00 +0000 2025）
+TWEET_DATE_FORMAT = '%a %b %d %H:%M:%S %z %Y'
+
+
+def archive_files(tweets_file: str) -> List[str]:
+    """tweets.js と同じフォルダにある分割ファイルをパート番号順に返す"""
+    directory = os.path.dirname(os.path.abspath(tweets_file))
+    parts = []
+    for name in os.listdir(directory):
+        match = ARCHIVE_FILE_NAME.match(name)
+        if match:
+            parts.append((int(match.group(1) or 0), os.path.join(directory, name)))
+    return [path for _, path in sorted(parts)]
+
+
+def tweet_created_at(tweet: Dict) -> Optional[str]:
+    """ツイートの投稿日時をUTCの 'YYYY-MM-DD HH:MM:SS' に変換（ない・読めない場合は None）"""
+    try:
+        created_at = datetime.strptime(tweet['created_at'], TWEET_DATE_FORMAT)
+    except (KeyError, TypeError, ValueError):
+        return None
+    return created_at.astimezone(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def iter_archive_items(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[Dict]:
+    """アーカイブファイルの配列要素を1件ずつ返す（ファイル全体は読み込まない）"""
+    decoder = json.JSONDecoder()
+
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        # 先頭の代入部分（window.YTD.tweets.partN = [）を読み飛ばす
+        buffer = ''
+        while True:
+            chunk = f.read(chunk_size)
+            buffer += chunk
+            match = ARCHIVE_PREFIX.search(buffer)
+            if match:
+                buffer = buffer[match.end():]
+                break
+            if not chunk:
+                raise ValueError(f"ツイートアーカイブの形式ではありません: {path}")
+
+        pos = 0
+        eof = False
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+
+            if pos < len(buffer) and buffer[pos] == ']':
+                return
+
+            if pos < len(buffer):
+                try:
+                    item, pos = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    # 要素がチャンクの境界をまたいでいる場合は続きを読んでから解析し直す
+                    if eof:
+                        raise
+                else:
+                    yield item
+                    continue
+
+            if eof:
+                raise ValueError(f"ツイートアーカイブの配列が閉じていません: {path}")
+
+            # 解析済みの部分を捨ててから続きを読む
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+
+
+class TweetArchiveImporter:
+    def __init__(self, monitor, batch_size: int = 500):
+        self.monitor = monitor  # 特徴量抽出・接続・LSHインデックスは監視システムのものを使う
+        self.batch_size = batch_size
+
+    def create_schema(self, cursor):
+        """取り込み済みツイートIDとチェックポイントのテーブルを作成"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS archive_tweets (
+                tweet_id TEXT PRIMARY KEY,
+                post_id INTEGER,
+                FOREIGN KEY (post_id) REFERENCES post_history (id)
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS archive_import_checkpoints (
+                file_path TEXT PRIMARY KEY,
+                file_size INTEGER,
+                file_mtime REAL,
+                items_done INTEGER DEFAULT 0,
+                completed INTEGER DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+    def import_archive(self, tweets_file: str) -> Dict:
+        """アーカイブ（全パート）を取り込み、件数の集計を返す"""
+        stats = {'files': 0, 'parsed': 0, 'inserted': 0, 'duplicates': 0, 'skipped_files': 0, 'archived': 0}
+
+        for path in archive_files(tweets_file):
+            stats['files'] += 1
+            file_stats = self.import_file(path)
+            if file_stats is None:
+                stats['skipped_files'] += 1
+                continue
+            for key in ('parsed', 'inserted', 'duplicates'):
+                stats[key] += file_stats[key]
+
+        # 投稿日時が直近の期間より古い投稿は、取り込み後に古い投稿のテーブルへ移す
+        if stats['inserted']:
+            stats['archived'] = self.monitor.rotate_history()
+        return stats
+
+    def import_file(self, path: str):
+        """1ファイルを取り込む（前回から変更のない取り込み済みファイルは None を返す）"""
+        path = os.path.abspath(path)
+        file_stat = os.stat(path)
+
+        cursor = self.monitor.store.cursor()
+        cursor.execute('''
+            SELECT file_size, file_mtime, items_done, completed
+            FROM archive_import_checkpoints WHERE file_path = ?
+        ''', (path,))
+        checkpoint = cursor.fetchone()
+        cursor.close()
+
+        items_done = 0
+        if checkpoint and checkpoint[0] == file_stat.st_size and checkpoint[1] == file_stat.st_mtime:
+            if checkpoint[3]:
+                return None
+            items_done = checkpoint[2]  # 中断した位置から再開
+
+        stats = {'parsed': 0, 'inserted': 0, 'duplicates': 0}
+        batch = []
+        index = 0
+
+        for index, item in enumerate(iter_archive_items(path), 1):
+            if index <= items_done:
+                continue
+            stats['parsed'] += 1
+
+            tweet = item.get('tweet', item)
+            if 'full_text' in tweet:
+                batch.append((tweet.get('id_str') or str(tweet.get('id', '')), tweet['full_text'],
+                              tweet_created_at(tweet)))
+
+            if index - items_done >= self.batch_size:
+                self._import_batch(batch, stats, path, file_stat, index, completed=False)
+                batch = []
+                items_done = index
+
+        self._import_batch(batch, stats, path, file_stat, index, completed=True)
+        return stats
+
+    def _import_batch(self, tweets: List[Tuple[str, str, Optional[str]]], stats: Dict, path: str,
+                      file_stat, items_done: int, completed: bool):
+        """1バッチ分を挿入し、チェックポイントと同じトランザクションでコミット"""
+        monitor = self.monitor
+
+        with monitor.store.transaction() as cursor:
+            tweet_ids = [tweet_id for tweet_id, _, _ in tweets if tweet_id]
+            known_ids = set()
+            if tweet_ids:
+                cursor.execute(
+                    f"SELECT tweet_id FROM archive_tweets WHERE tweet_id IN ({', '.join(['?'] * len(tweet_ids))})",
+                    tweet_ids
+                )
+                known_ids = {row[0] for row in cursor.fetchall()}
+
+            # 猫または犬の投稿のみ
+            new_posts = []
+            for tweet_id, full_text, created_at in tweets:
+                if tweet_id in known_ids:
+                    stats['duplicates'] += 1
+                elif any(hashtag in full_text for hashtag in ANIMAL_HASHTAGS):
+                    new_posts.append((tweet_id, full_text, monitor.calculate_content_hash(full_text), created_at))
+
+            hashes = list({content_hash for _, _, content_hash, _ in new_posts})
+            existing_hashes = set()
+            if hashes:
+                cursor.execute(
+                    f"SELECT content_hash FROM {ALL_POSTS} WHERE content_hash IN ({', '.join(['?'] * len(hashes))})",
+                    hashes
+                )
+                existing_hashes = {row[0] for row in cursor.fetchall()}
+
+            insert_ids = []
+            insert_posts = []
+            for tweet_id, full_text, content_hash, created_at in new_posts:
+                if content_hash in existing_hashes:
+                    stats['duplicates'] += 1
+                    continue
+                existing_hashes.add(content_hash)  # バッチ内の重複も除く
+                insert_ids.append(tweet_id)
+                insert_posts.append((full_text, content_hash, created_at))
+
+            post_ids = monitor.save_historical_posts(insert_posts, cursor)
+            post_id_by_tweet = dict(zip(insert_ids, post_ids))
+            stats['inserted'] += len(post_ids)
+
+            cursor.executemany(
+                'INSERT OR IGNORE INTO archive_tweets (tweet_id, post_id) VALUES (?, ?)',
+                [(tweet_id, post_id_by_tweet.get(tweet_id)) for tweet_id in tweet_ids if tweet_id not in known_ids]
+            )
+            cursor.execute('''
+                INSERT OR REPLACE INTO archive_import_checkpoints
+                (file_path, file_size, file_mtime, items_done, completed, updated_at)
+                VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ''', (path, file_stat.st_size, file_stat.st_mtime, items_done, int(completed)))
+
+        # コミット後に追加分を重複チェック用のキャッシュに反映させる
+        if post_ids:
+            monitor.history_cache.refresh()
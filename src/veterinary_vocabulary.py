@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+獣医学用語ボキャブラリ
+疾患名・猫種/犬種・医療用語・投稿ハッシュタグを1つの正規表現にまとめてコンパイルし、
+1回の走査でキーワード・トピック・動物種を抽出する
+
+    - 正規表現は先読みだけで照合し、すべての位置から語を探す（「感染症状」の 感染症 と 症状 のように
+      別の分類の語が重なっていても両方数える）
+    - 同じ分類の中で重なった語は、従来の分類別パターンと同じく左から1つだけ数える
+"""
+
+import re
+from typing import Dict, List
+
+
+# 疾患・症状（分類ごと）
+DISEASE_GROUPS = [
+    ['腎臓病', '腎不全', '心臓病', '糖尿病', '甲状腺', '肝臓', '膀胱', '尿路', '結石', '感染症', 'アレルギー'],
+    ['白内障', '緑内障', '結膜炎', '皮膚炎', '外耳炎', '歯周病', '口内炎', '関節炎'],
+    ['嘔吐', '下痢', '便秘', '発熱', '食欲不振', '体重減少', '呼吸困難', '多飲多尿'],
+    ['血尿', 'よだれ', '口臭', '歩行異常', '震え', '痙攣', '意識障害']
+]
+
+# 猫種・犬種（分類ごと）
+BREED_GROUPS = [
+    ['アメリカンショートヘア', 'ペルシャ', 'ロシアンブルー', 'スコティッシュフォールド', 'マンチカン'],
+    ['メインクーン', 'ラグドール', 'ベンガル', 'アビシニアン', 'ブリティッシュ'],
+    ['トイプードル', 'チワワ', 'ダックスフント', 'ポメラニアン', 'シーズー'],
+    ['ゴールデンレトリーバー', 'ラブラドール', '柴犬', 'フレンチブルドッグ']
+]
+
+# 医療・ケア用語（分類ごと）
+MEDICAL_GROUPS = [
+    ['診断', '治療', '手術', '薬', 'ワクチン', '検査', '血液検査', 'レントゲン', 'エコー', 'MRI'],
+    ['症状', '予防', 'ケア', '管理', '観察', '対処法', '応急処置', '健康診断'],
+    ['フード', '食事', '給餌', '水分', '栄養', 'サプリメント', 'おやつ'],
+    ['トイレ', '排尿', '排便', 'グルーミング', 'ブラッシング', '爪切り']
+]
+
+# キーワードの分類（1つの分類の中で重なった語は左から1つだけ数える）
+KEYWORD_GROUPS = DISEASE_GROUPS + BREED_GROUPS + MEDICAL_GROUPS
+
+DISEASE_TERMS = [term for group in DISEASE_GROUPS for term in group]
+BREED_TERMS = [term for group in BREED_GROUPS for term in group]
+MEDICAL_TERMS = [term for group in MEDICAL_GROUPS for term in group]
+
+# トピック判定に使う疾患名・品種名（リストの先頭ほど優先）
+TOPIC_DISEASES = [
+    '腎臓病', '腎不全', '心臓病', '糖尿病', '甲状腺', '歯周病', '関節炎',
+    '尿路結石', '皮膚炎', '外耳炎', '白内障', '緑内障'
+]
+
+TOPIC_BREEDS = [
+    'アメリカンショートヘア', 'ペルシャ', 'マンチカン', 'スコティッシュフォールド',
+    'トイプードル', 'チワワ', 'ゴールデンレトリーバー', '柴犬'
+]
+
+# 投稿ハッシュタグと動物種
+ANIMAL_HASHTAGS = {
+    '#猫のあれこれ': 'cat',
+    '#獣医が教える犬のはなし': 'dog'
+}
+
+
+def _char_pattern(char: str) -> str:
+    """大文字小文字を区別しない1文字分のパターン（re.IGNORECASE は全体が遅くなるため使わない）"""
+    if char.upper() != char.lower():
+        return '[' + re.escape(char.lower()) + re.escape(char.upper()) + ']'
+    return re.escape(char)
+
+
+def _trie_pattern(terms) -> str:
+    """用語リストから接頭辞を共有するトライ型の正規表現を組み立てる"""
+    trie = {}
+    for term in terms:
+        node = trie
+        for char in term.casefold():
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node) -> str:
+        is_terminal = '' in node
+        branches = [_char_pattern(char) + build(child) for char, child in node.items() if char != '']
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if is_terminal:
+            # 貪欲な省略可能グループにして、同じ位置から始まる語は最長一致させる
+            return '(?:' + body + ')?'
+        return body
+
+    return build(trie)
+
+
+class VeterinaryVocabulary:
+    def __init__(self):
+        # キーワード → (分類の番号, 分類内の順番)
+        self.keyword_groups = {
+            term: (group, rank) for group, terms in enumerate(KEYWORD_GROUPS) for rank, term in enumerate(terms)
+        }
+        self.topic_priority = {term: rank for rank, term in enumerate(TOPIC_DISEASES)}
+        self.breed_priority = {term: rank for rank, term in enumerate(TOPIC_BREEDS)}
+
+        terms = set(self.keyword_groups) | set(TOPIC_DISEASES) | set(TOPIC_BREEDS) | set(ANIMAL_HASHTAGS)
+        # 正規表現は同じ位置から始まる語のうち最長のものに一致するため、その語の接頭辞になっている語も
+        # 一緒に調べる（「尿路結石」の 尿路 など）。同じ分類の語は従来のパターンの順に並べる
+        self._prefixes = {
+            term.casefold(): sorted(
+                (prefix for prefix in terms if term.casefold().startswith(prefix.casefold())),
+                key=lambda prefix: self.keyword_groups.get(prefix, (-1, 0))
+            )
+            for term in terms
+        }
+
+        # 先頭文字で分岐するトライ型の1つの正規表現にまとめる
+        # 先頭文字クラスの先読みを付けると、候補にならない位置を正規表現エンジン内で読み飛ばせる
+        first_chars = {'【'} | {char for term in terms for char in (term[0].lower(), term[0].upper())}
+        first_char_class = '[' + ''.join(re.escape(char) for char in sorted(first_chars)) + ']'
+        # 語の部分も先読みにして文字を消費しない（重なった語を次の位置から探せる）
+        self.pattern = re.compile(
+            '(?=' + first_char_class + ')'
+            r'(?:(?=【(?P<bracket>[^】]+)】)|(?=(?P<term>' + _trie_pattern(terms) + ')))'
+        )
+
+    def scan(self, content: str) -> Dict:
+        """1回の走査でキーワード・トピック・動物種を抽出"""
+        keywords = []
+        bracket_topic = None
+        disease_topic = None
+        breed_topic = None
+        animal_type = "dog"
+        group_ends = {}  # 分類ごとの、最後に数えたキーワードの終了位置
+
+        for match in self.pattern.finditer(content):
+            bracket = match.group('bracket')
+            if bracket is not None:
+                if bracket_topic is None:
+                    bracket_topic = bracket
+                continue
+
+            start = match.start()
+            for term in self._prefixes[match.group('term').casefold()]:
+                if term in ANIMAL_HASHTAGS:
+                    if ANIMAL_HASHTAGS[term] == "cat":
+                        animal_type = "cat"
+                    continue
+
+                if term in self.keyword_groups:
+                    group = self.keyword_groups[term][0]
+                    if start >= group_ends.get(group, 0):
+                        end = start + len(term)
+                        keywords.append(content[start:end])
+                        group_ends[group] = end
+
+                if term in self.topic_priority:
+                    if disease_topic is None or self.topic_priority[term] < self.topic_priority[disease_topic]:
+                        disease_topic = term
+                elif term in self.breed_priority:
+                    if breed_topic is None or self.breed_priority[term] < self.breed_priority[breed_topic]:
+                        breed_topic = term
+
+        return {
+            'keywords': list(set(keywords)),
+            'topic': bracket_topic or disease_topic or breed_topic or "一般",
+            'animal_type': animal_type
+        }
+
+    def extract_keywords(self, content: str) -> List[str]:
+        """キーワードのみを抽出"""
+        return self.scan(content)['keywords']
+
+
+# モジュール読み込み時に1度だけコンパイルして共有する
+VOCABULARY = VeterinaryVocabulary()
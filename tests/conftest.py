@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+"""
+テスト共通設定
+src/ 配下のモジュールを直接インポートできるようにする
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+高度重複監視システムのテスト
+"""
+
+import json
+import sqlite3
+
+from advanced_duplicate_monitor import AdvancedDuplicateMonitor, FEATURE_VERSION
+
+
+CAT_POST = "【猫の歯の健康】意外と見落としがち🦷\n\n猫も歯周病になります！\n\n⚠️口臭\n⚠️よだれ\n\n予防は歯磨きが一番。\n#猫のあれこれ"
+
+
+def test_backfill_features_migrates_stale_rows(tmp_path):
+    db_path = str(tmp_path / "posts.db")
+    monitor = AdvancedDuplicateMonitor(db_path)
+
+    # 特徴量列が空の旧形式の行を再現
+    conn = sqlite3.connect(db_path)
+    conn.execute('''
+        INSERT INTO post_history (content, content_hash, normalized_content, keywords, main_points, feature_version)
+        VALUES (?, '', '', NULL, NULL, 0)
+    ''', (CAT_POST,))
+    conn.commit()
+
+    assert monitor.backfill_features() == 1
+    assert monitor.backfill_features() == 0
+
+    normalized, keywords, version = conn.execute(
+        'SELECT normalized_content, keywords, feature_version FROM post_history'
+    ).fetchone()
+    assert normalized == monitor.normalize_content(CAT_POST)
+    assert set(json.loads(keywords)) == set(monitor.extract_keywords(CAT_POST))
+    assert version == FEATURE_VERSION
+
+
+def test_stored_features_match_recomputed_similarity(tmp_path):
+    monitor = AdvancedDuplicateMonitor(str(tmp_path / "posts.db"))
+    monitor.similarity_threshold = 0.0
+    monitor.save_approved_post(CAT_POST, "cat")
+
+    candidate = CAT_POST.replace("一番", "基本")
+    _, duplicates = monitor.check_duplicate_comprehensive(candidate, "cat")
+    assert duplicates[0]['similarity'] == monitor.calculate_similarity(candidate, CAT_POST)
+
+
+def test_batch_check_matches_single_checks_and_flags_intra_batch(tmp_path):
+    monitor = AdvancedDuplicateMonitor(str(tmp_path / "posts.db"))
+    monitor.save_approved_post(CAT_POST, "cat")
+
+    near_copy = CAT_POST.replace("一番", "基本")
+    fresh = "【犬の散歩】季節ごとの注意点🐕\n\n夏はアスファルトの温度に注意。\n\n早朝か夕方がおすすめです。\n#獣医が教える犬のはなし"
+    results = monitor.check_duplicates_batch([
+        {'content': near_copy, 'animal_type': 'cat'},
+        {'content': fresh, 'animal_type': 'dog'},
+        {'content': fresh, 'animal_type': 'dog'},
+    ])
+
+    assert results[0] == monitor.check_duplicate_comprehensive(near_copy, "cat")
+    assert results[1] == (False, [])
+    assert results[2][0]
+    assert results[2][1][0]['type'] == 'batch_duplicate'
+
+
+def test_unmigrated_rows_are_scored_and_details_read_for_matches(tmp_path):
+    db_path = str(tmp_path / "posts.db")
+    monitor = AdvancedDuplicateMonitor(db_path, load_archive=False)
+    monitor.save_approved_post(CAT_POST, "cat")
+
+    # 特徴量列が古い版の行は本文から特徴量を抽出して比較する
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE post_history SET normalized_content = '', keywords = NULL, feature_version = 0")
+    conn.commit()
+    monitor.history_cache.invalidate()
+
+    near_copy = CAT_POST.replace("一番", "基本")
+    is_duplicate, duplicates = monitor.check_duplicate_comprehensive(near_copy, "cat")
+    assert is_duplicate
+    assert duplicates[0]['similarity'] == monitor.calculate_similarity(near_copy, CAT_POST)
+    assert (duplicates[0]['content'], duplicates[0]['source']) == (CAT_POST, 'generated')
+    assert duplicates[0]['created_at'] is not None
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本文ごとの正規化・ハッシュ・特徴量のメモ化のテスト
+"""
+
+from advanced_duplicate_monitor import AdvancedDuplicateMonitor, hash_normalized, normalize_text
+from content_memo import ContentMemo
+
+
+CAT_POST = "【猫の歯の健康】意外と見落としがち🦷\n\n猫も歯周病になります！\n\n⚠️口臭\n⚠️よだれ\n\n予防は歯磨きが一番。\n#猫のあれこれ"
+
+
+def test_least_recently_used_entry_is_evicted():
+    memo = ContentMemo(normalize_text, hash_normalized, max_size=2)
+    memo.entry("a")
+    memo.entry("b")
+    memo.entry("a")  # b が最も長く参照されていない
+    memo.entry("c")
+
+    assert list(memo.entries) == ["a", "c"]
+    assert memo.stats() == {'size': 2, 'max_size': 2, 'hits': 1, 'misses': 3, 'hit_rate': 0.25}
+
+
+def test_memoized_values_match_direct_computation(tmp_path):
+    monitor = AdvancedDuplicateMonitor(str(tmp_path / "posts.db"), load_archive=False)
+    monitor.content_memo = ContentMemo(normalize_text, hash_normalized)
+    normalized = normalize_text(CAT_POST)
+
+    assert monitor.normalize_content(CAT_POST) == normalized
+    assert monitor.calculate_content_hash(CAT_POST) == hash_normalized(normalized)
+    assert monitor.extract_features(CAT_POST)['normalized'] == normalized
+    assert monitor.get_statistics()['content_memo']['misses'] == 1
+    monitor.close()
+
+
+def test_candidate_is_normalized_and_extracted_once_per_check(tmp_path):
+    monitor = AdvancedDuplicateMonitor(str(tmp_path / "posts.db"), load_archive=False)
+    monitor.save_approved_post(CAT_POST, "cat")
+
+    calls = {'normalize': 0, 'extract': 0}
+    extract = monitor._extract_features
+
+    def counting_normalize(content):
+        calls['normalize'] += 1
+        return normalize_text(content)
+
+    def counting_extract(content, normalized):
+        calls['extract'] += 1
+        return extract(content, normalized)
+
+    monitor.content_memo = ContentMemo(counting_normalize, hash_normalized)
+    monitor._extract_features = counting_extract
+
+    candidate = CAT_POST.replace("一番", "基本")
+    assert monitor.check_duplicate_comprehensive(candidate, "cat")[0]
+    for _ in range(3):
+        monitor.calculate_similarity(candidate, CAT_POST)
+    assert calls == {'normalize': 2, 'extract': 2}  # 候補と CAT_POST で1回ずつ
+    monitor.close()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+重複検出記録のバッファと整理のテスト
+"""
+
+import sqlite3
+
+from advanced_duplicate_monitor import AdvancedDuplicateMonitor
+
+
+CAT_POST = "【猫の歯の健康】意外と見落としがち🦷\n\n猫も歯周病になります！\n\n⚠️口臭\n⚠️よだれ\n\n予防は歯磨きが一番。\n#猫のあれこれ"
+
+
+def count_rows(db_path, table):
+    return sqlite3.connect(db_path).execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+
+
+def test_detections_are_buffered_and_stored_once(tmp_path):
+    db_path = str(tmp_path / "posts.db")
+    monitor = AdvancedDuplicateMonitor(db_path, load_archive=False)
+    monitor.save_approved_post(CAT_POST, "cat")
+
+    # 再生成の試行ごとに同じ本文で検出されても、書き込むまではDBに残らない
+    near_copy = CAT_POST.replace("一番", "基本")
+    for _ in range(5):
+        assert monitor.check_duplicate_comprehensive(near_copy, "cat")[0]
+    assert count_rows(db_path, 'duplicate_detections') == 0
+    assert monitor.get_statistics()['duplicate_detections'] == 5
+
+    monitor.close()
+    conn = sqlite3.connect(db_path)
+    assert conn.execute('SELECT hits, detection_reason FROM duplicate_detections').fetchall() == [(5, 'similar_content')]
+    assert conn.execute('SELECT content FROM attempted_contents').fetchall() == [(near_copy,)]
+    assert monitor.get_statistics()['duplicate_detections'] == 5
+
+
+def test_buffer_flushes_when_full(tmp_path):
+    db_path = str(tmp_path / "posts.db")
+    monitor = AdvancedDuplicateMonitor(db_path, load_archive=False)
+    monitor.detection_log.buffer_size = 3
+    monitor.save_approved_post(CAT_POST, "cat")
+
+    for _ in range(3):
+        monitor.check_duplicate_comprehensive(CAT_POST, "cat")
+    assert monitor.detection_log.pending() == 0
+    assert count_rows(db_path, 'duplicate_detections') == 1
+
+
+def test_legacy_detections_are_migrated(tmp_path):
+    db_path = str(tmp_path / "posts.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute('''
+        CREATE TABLE duplicate_detections (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            attempted_content TEXT NOT NULL,
+            similar_post_id INTEGER,
+            similarity_score REAL,
+            detection_reason TEXT,
+            detected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.executemany(
+        'INSERT INTO duplicate_detections (attempted_content, similar_post_id, similarity_score, detection_reason) '
+        'VALUES (?, ?, ?, ?)',
+        [(CAT_POST, 1, 0.7, 'similar_content'), (CAT_POST, 1, 0.8, 'similar_content'), (CAT_POST, 2, 1.0, 'exact_match')]
+    )
+    conn.commit()
+    conn.close()
+
+    monitor = AdvancedDuplicateMonitor(db_path, load_archive=False)
+    conn = sqlite3.connect(db_path)
+    assert conn.execute('''
+        SELECT similar_post_id, similarity_score, hits FROM duplicate_detections ORDER BY similar_post_id
+    ''').fetchall() == [(1, 0.8, 2), (2, 1.0, 1)]
+    assert count_rows(db_path, 'attempted_contents') == 1
+    assert monitor.get_statistics()['duplicate_detections'] == 3
+
+
+def test_compaction_applies_retention_and_row_limit(tmp_path):
+    db_path = str(tmp_path / "posts.db")
+    monitor = AdvancedDuplicateMonitor(db_path, load_archive=False)
+    log = monitor.detection_log
+    for index in range(4):
+        log.record(f"hash{index}", f"本文{index}", index, 0.9, 'similar_content')
+    log.record("hash0", "本文0", 0, 0.95, 'similar_content')
+    monitor.flush_detections()
+    assert count_rows(db_path, 'duplicate_detections') == 4
+
+    conn = sqlite3.connect(db_path)
+    conn.executemany("UPDATE duplicate_detections SET detected_at = datetime('now', ?) WHERE attempted_hash = ?", [
+        ('-3 days', 'hash0'), ('-2 days', 'hash1'), ('-1 days', 'hash2'), ('-200 days', 'hash3')
+    ])
+    conn.execute("INSERT INTO duplicate_detections (attempted_hash, similar_post_id, similarity_score, detection_reason) "
+                 "VALUES ('hash1', 1, 0.99, 'similar_content')")
+    conn.commit()
+
+    # 期限切れ(hash3)を削除し、hash1 の2行を1行にまとめ、上限2行を超えた最も古い hash0 を削除
+    log.max_rows = 2
+    stats = monitor.compact_detections()
+    assert stats == {'expired': 1, 'merged': 1, 'trimmed': 1, 'orphaned_contents': 2}
+    assert conn.execute(
+        'SELECT attempted_hash, hits, similarity_score FROM duplicate_detections ORDER BY attempted_hash'
+    ).fetchall() == [('hash1', 2, 0.99), ('hash2', 1, 0.9)]
+    assert conn.execute('SELECT content_hash FROM attempted_contents ORDER BY content_hash').fetchall() == [
+        ('hash1',), ('hash2',)
+    ]
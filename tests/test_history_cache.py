@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+投稿履歴メモリキャッシュのテスト
+"""
+
+import sqlite3
+
+from advanced_duplicate_monitor import AdvancedDuplicateMonitor
+
+
+CAT_POST = "【猫の歯の健康】意外と見落としがち🦷\n\n猫も歯周病になります！\n\n⚠️口臭\n⚠️よだれ\n\n予防は歯磨きが一番。\n#猫のあれこれ"
+DOG_POST = "【犬の散歩】季節ごとの注意点🐕\n\n夏はアスファルトの温度に注意。\n\n早朝か夕方がおすすめです。\n#獣医が教える犬のはなし"
+
+
+def trace_selects(monitor):
+    """呼び出し元スレッドの接続で実行された SELECT 文を記録"""
+    statements = []
+    monitor.store.connection().set_trace_callback(
+        lambda sql: statements.append(sql) if sql.lstrip().upper().startswith('SELECT') else None
+    )
+    return statements
+
+
+def test_repeated_checks_do_not_read_sqlite(tmp_path):
+    monitor = AdvancedDuplicateMonitor(str(tmp_path / "posts.db"), load_archive=False)
+    monitor.save_approved_post(CAT_POST, "cat")
+    monitor.check_duplicate_comprehensive(DOG_POST, "dog")  # 初回はキャッシュを読み込む
+
+    statements = trace_selects(monitor)
+    near_copy = CAT_POST.replace("一番", "基本")
+    is_duplicate, duplicates = monitor.check_duplicate_comprehensive(near_copy, "cat")
+    assert is_duplicate and duplicates[0]['content'] == CAT_POST
+    assert monitor.check_duplicate_comprehensive(CAT_POST, "cat")[1][0]['type'] == 'exact_match'
+    assert monitor.check_duplicates_batch([{'content': near_copy, 'animal_type': 'cat'}])[0][0]
+
+    # 保存した投稿は読み直さずにキャッシュへ追加される
+    assert monitor.save_approved_post(DOG_POST, "dog")
+    assert monitor.check_duplicate_comprehensive(DOG_POST.replace("注意。", "注意！"), "dog")[0]
+
+    # 読むのは重複と判定した投稿の表示用の列だけ（類似度の計算のための読み込みはしない）
+    reads = [sql for sql in statements if 'post_history' in sql and 'created_at FROM' not in sql]
+    assert reads and all(sql.startswith('SELECT id, content, topic, created_at, source') for sql in reads)
+    assert monitor.check_duplicate_comprehensive("全く関係のない文章です", "dog") == (False, [])
+    assert len([sql for sql in statements if 'post_history' in sql and 'created_at FROM' not in sql]) == len(reads)
+
+
+def test_window_slides_and_evicts_old_posts(tmp_path):
+    db_path = str(tmp_path / "posts.db")
+    monitor = AdvancedDuplicateMonitor(db_path, load_archive=False)
+    monitor.save_approved_post(CAT_POST, "cat")
+    monitor.save_approved_post(DOG_POST, "dog")
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE post_history SET created_at = datetime('now', '-100 days') WHERE animal_type = 'cat'")
+    conn.commit()
+    monitor.history_cache.invalidate()
+
+    monitor.check_duplicate_comprehensive(DOG_POST + "追加", "dog", months_back=6)
+    assert len(monitor.history_cache) == 2
+
+    # 対象期間が過ぎた投稿は追い出されるが、完全一致は期間に関係なく判定される
+    assert monitor.history_cache.evict('9999-12-31 00:00:00') == 2
+    assert len(monitor.history_cache) == 0
+    assert monitor.history_cache.buckets == {}
+    assert monitor.check_duplicate_comprehensive(CAT_POST, "cat")[1][0]['type'] == 'exact_match'
+
+
+def test_window_extends_for_longer_periods(tmp_path):
+    db_path = str(tmp_path / "posts.db")
+    monitor = AdvancedDuplicateMonitor(db_path, load_archive=False)
+    monitor.save_approved_post(CAT_POST, "cat")
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE post_history SET created_at = datetime('now', '-200 days')")
+    conn.commit()
+    monitor.history_cache.invalidate()
+
+    near_copy = CAT_POST.replace("一番", "基本")
+    assert not monitor.check_duplicate_comprehensive(near_copy, "cat", months_back=3)[0]
+    assert monitor.check_duplicate_comprehensive(near_copy, "cat", months_back=12)[0]
+    assert not monitor.check_duplicate_comprehensive(near_copy, "cat", months_back=3)[0]
+
+
+def test_archive_import_is_picked_up_after_commit(tmp_path):
+    monitor = AdvancedDuplicateMonitor(str(tmp_path / "posts.db"), load_archive=False)
+    monitor.check_duplicate_comprehensive(DOG_POST, "dog")
+
+    with monitor.store.transaction() as cursor:
+        monitor.save_historical_posts([(CAT_POST, monitor.calculate_content_hash(CAT_POST), None)], cursor)
+    monitor.history_cache.refresh()
+
+    assert monitor.check_duplicate_comprehensive(CAT_POST.replace("一番", "基本"), "cat")[0]
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+投稿履歴の期間による分割（直近の投稿と古い投稿のテーブル）のテスト
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from advanced_duplicate_monitor import AdvancedDuplicateMonitor
+from history_partitions import ALL_POSTS, ARCHIVE_TABLE, HOT_TABLE, HistoryPartitions, to_epoch
+
+
+CAT_POST = "【猫の歯の健康】意外と見落としがち🦷\n\n猫も歯周病になります！\n\n⚠️口臭\n⚠️よだれ\n\n予防は歯磨きが一番。\n#猫のあれこれ"
+DOG_POST = "【犬の散歩】季節ごとの注意点🐕\n\n夏はアスファルトの温度に注意。\n\n早朝か夕方がおすすめです。\n#獣医が教える犬のはなし"
+
+
+@pytest.fixture
+def monitor(tmp_path):
+    monitor = AdvancedDuplicateMonitor(str(tmp_path / "posts.db"), load_archive=False)
+    yield monitor
+    monitor.close()
+
+
+def days_ago(days: int) -> str:
+    return (datetime.utcnow() - timedelta(days=days)).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def set_created_at(monitor, post_id: int, created_at: str):
+    with monitor.store.transaction() as cursor:
+        cursor.execute('UPDATE post_history SET created_at = ? WHERE id = ?', (created_at, post_id))
+
+
+def ids(monitor, table: str) -> list:
+    cursor = monitor.store.cursor()
+    cursor.execute(f'SELECT id FROM {table} ORDER BY id')
+    return [row[0] for row in cursor.fetchall()]
+
+
+def test_epoch_follows_created_at(monitor):
+    monitor.save_approved_post(CAT_POST, "cat")
+    cursor = monitor.store.cursor()
+    cursor.execute('SELECT created_at, created_epoch FROM post_history WHERE id = 1')
+    created_at, created_epoch = cursor.fetchone()
+    assert created_epoch == to_epoch(created_at)
+
+    set_created_at(monitor, 1, '2020-01-02 03:04:05')
+    cursor.execute('SELECT created_epoch FROM post_history WHERE id = 1')
+    assert cursor.fetchone()[0] == to_epoch('2020-01-02 03:04:05')
+
+
+def test_rotation_moves_old_posts_and_keeps_ids(monitor):
+    monitor.save_approved_post(CAT_POST, "cat")
+    monitor.save_approved_post(DOG_POST, "dog")
+    set_created_at(monitor, 1, days_ago(1000))
+
+    assert monitor.rotate_history() == 1
+    assert ids(monitor, HOT_TABLE) == [2]
+    assert ids(monitor, ARCHIVE_TABLE) == [1]
+    assert ids(monitor, ALL_POSTS) == [1, 2]
+    assert monitor.rotate_history() == 0
+    assert monitor.get_statistics()['total_posts'] == 2
+
+    # 古い投稿のテーブルに移した投稿とも、完全一致は期間に関係なく検出する
+    is_duplicate, duplicates = monitor.check_duplicate_comprehensive(CAT_POST, "cat")
+    assert is_duplicate
+    assert duplicates[0]['post_id'] == 1
+    assert duplicates[0]['content'] == CAT_POST
+
+
+def test_recent_window_reads_only_hot_table(monitor):
+    monitor.save_approved_post(CAT_POST, "cat")
+    monitor.save_approved_post(DOG_POST, "dog")
+    set_created_at(monitor, 1, days_ago(1000))
+    monitor.rotate_history()
+
+    statements = []
+    monitor.store.connection().set_trace_callback(statements.append)
+    monitor.check_duplicate_comprehensive(DOG_POST.replace("おすすめ", "おすすめ！"), "dog", months_back=6)
+    feature_reads = [sql for sql in statements if 'feature_version' in sql]
+    assert feature_reads
+    assert not any(ALL_POSTS in sql for sql in feature_reads)
+
+    # 直近の範囲を超える期間では古い投稿も読む
+    statements.clear()
+    monitor.check_duplicate_comprehensive(DOG_POST, "dog", months_back=36)
+    assert any(ALL_POSTS in sql for sql in statements if 'feature_version' in sql)
+    assert 1 in monitor.history_cache.records
+
+
+def test_longer_window_moves_posts_back(monitor):
+    monitor.save_approved_post(CAT_POST, "cat")
+    set_created_at(monitor, 1, days_ago(1000))
+    monitor.rotate_history()
+    assert ids(monitor, HOT_TABLE) == []
+
+    with monitor.store.transaction() as cursor:
+        assert HistoryPartitions(hot_window_days=2000).rotate(cursor) == 1
+        assert monitor.history_partitions.table_for(cursor, to_epoch(days_ago(1500))) == HOT_TABLE
+        assert monitor.history_partitions.table_for(cursor, to_epoch(days_ago(2500))) == ALL_POSTS
+    assert ids(monitor, HOT_TABLE) == [1]
+    assert ids(monitor, ARCHIVE_TABLE) == []
+
+
+def test_clean_old_posts_deletes_from_both_tables(monitor):
+    monitor.save_approved_post(CAT_POST, "cat")
+    monitor.save_approved_post(DOG_POST, "dog")
+    set_created_at(monitor, 1, days_ago(1000))
+    set_created_at(monitor, 2, days_ago(200))
+    monitor.rotate_history()
+
+    assert monitor.clean_old_posts(days_to_keep=180) == 2
+    assert ids(monitor, ALL_POSTS) == []
+    cursor = monitor.store.cursor()
+    cursor.execute('SELECT COUNT(*) FROM post_lsh_buckets')
+    assert cursor.fetchone()[0] == 0
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+処理時間の計測（スパン・カウンタ）のテスト
+"""
+
+import json
+
+import pytest
+
+from advanced_duplicate_monitor import AdvancedDuplicateMonitor
+from instrumentation import NULL_SPAN, PROFILER, Profiler, profile_path
+
+
+CAT_POST = "【猫の歯の健康】意外と見落としがち🦷\n\n猫も歯周病になります！\n\n⚠️口臭\n⚠️よだれ\n\n予防は歯磨きが一番。\n#猫のあれこれ"
+
+
+@pytest.fixture
+def profiler():
+    PROFILER.reset()
+    PROFILER.enable()
+    yield PROFILER
+    PROFILER.disable()
+    PROFILER.reset()
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler()
+
+    @profiler.timed('work')
+    def work():
+        return 42
+
+    assert profiler.span('work') is NULL_SPAN
+    with profiler.span('work'):
+        pass
+    profiler.count('calls')
+    assert work() == 42
+    assert profiler.snapshot()['spans'] == {}
+    assert profiler.snapshot()['counters'] == {}
+
+
+def test_spans_counters_and_timed_functions():
+    profiler = Profiler()
+    profiler.enable()
+
+    @profiler.timed('work')
+    def work(value):
+        return value * 2
+
+    assert work(2) == 4
+    assert work(3) == 6
+    with profiler.span('block'):
+        pass
+    profiler.count('calls')
+    profiler.count('calls', 2)
+
+    snapshot = profiler.snapshot()
+    assert snapshot['spans']['work']['count'] == 2
+    assert snapshot['spans']['block']['count'] == 1
+    assert snapshot['spans']['work']['max_ms'] >= snapshot['spans']['work']['mean_ms']
+    assert snapshot['counters'] == {'calls': 3}
+
+    lines = profiler.summary_lines()
+    assert lines[0].startswith("⏱️ 処理時間の内訳")
+    assert any(line.strip().startswith("work:") for line in lines)
+    assert lines[-1].strip() == "calls=3"
+
+
+def test_exception_inside_span_is_recorded_and_raised():
+    profiler = Profiler()
+    profiler.enable()
+
+    with pytest.raises(ValueError):
+        with profiler.span('failing'):
+            raise ValueError("失敗")
+    assert profiler.snapshot()['spans']['failing']['count'] == 1
+
+
+def test_monitor_hot_path_is_profiled_and_dumped(tmp_path, profiler):
+    monitor = AdvancedDuplicateMonitor(str(tmp_path / "posts.db"), load_archive=False)
+    monitor.save_approved_post(CAT_POST, "cat")
+    assert monitor.check_duplicate_comprehensive(CAT_POST, "cat")[0]
+    monitor.close()
+
+    path = profiler.dump(profile_path(str(tmp_path / "profiles"), "test"), label="test")
+    with open(path, encoding='utf-8') as f:
+        profile = json.load(f)
+    assert profile['label'] == "test"
+    assert profile['spans']['monitor.check_duplicate']['count'] == 1
+    assert profile['spans']['monitor.save_approved_post']['count'] == 1
+    assert profile['counters']['monitor.duplicates'] == 1
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MinHash-LSH 候補インデックスのテスト
+"""
+
+import sqlite3
+
+from advanced_duplicate_monitor import AdvancedDuplicateMonitor
+from history_cache import window_cutoff
+
+
+NEAR_DUPLICATE = "【猫の腎臓病予防】水分摂取のコツ💧\n\n✅複数の水場を設置\n✅新鮮な水を毎日交換\n✅ウェットフードを活用\n#猫のあれこれ"
+UNRELATED = "【犬の熱中症対策】夏の危険を回避🌡️\n\n散歩時間の調整、水分補給、日陰の確保\n#獣医が教える犬のはなし"
+
+
+def test_near_duplicate_shares_bucket(tmp_path):
+    monitor = AdvancedDuplicateMonitor(str(tmp_path / "posts.db"), load_archive=False)
+    monitor.save_approved_post(NEAR_DUPLICATE, "cat")
+    monitor.save_approved_post(UNRELATED, "dog")
+
+    def candidates(content):
+        features = monitor.extract_features(content)
+        with monitor.store.transaction() as cursor:
+            monitor.history_cache.ensure(cursor, 6)
+        keys = monitor.lsh_index.band_keys(features['normalized'], features['keywords'])
+        return [record.id for record in monitor.history_cache.candidates(keys, window_cutoff(6))]
+
+    assert 1 in candidates(NEAR_DUPLICATE.replace("毎日", "こまめに"))
+    assert candidates("全く関係のない文章です") == []
+    monitor.close()
+
+
+def test_missing_buckets_are_indexed_on_creation_and_migrate(tmp_path):
+    db_path = str(tmp_path / "posts.db")
+    monitor = AdvancedDuplicateMonitor(db_path, load_archive=False)
+    monitor.save_approved_post(NEAR_DUPLICATE, "cat")
+    monitor.close()
+
+    # バケットテーブルがない既存DBは作成時に全投稿を登録
+    conn = sqlite3.connect(db_path)
+    conn.execute("DROP TABLE post_lsh_buckets")
+    conn.commit()
+    monitor = AdvancedDuplicateMonitor(db_path, load_archive=False)
+    monitor.close()
+    count = "SELECT COUNT(DISTINCT post_id) FROM post_lsh_buckets"
+    assert conn.execute(count).fetchone()[0] == 1
+
+    # 登録漏れは起動のたびには確認せず、migrate（backfill_features）で補完する
+    conn.execute("DELETE FROM post_lsh_buckets")
+    conn.commit()
+    monitor = AdvancedDuplicateMonitor(db_path, load_archive=False)
+    assert conn.execute(count).fetchone()[0] == 0
+    monitor.backfill_features()
+    monitor.close()
+    assert conn.execute(count).fetchone()[0] == 1
+    conn.close()
+
+
+def test_saved_posts_are_indexed_and_found(tmp_path):
+    monitor = AdvancedDuplicateMonitor(str(tmp_path / "posts.db"))
+    monitor.similarity_threshold = 0.5
+    assert monitor.save_approved_post(NEAR_DUPLICATE, "cat")
+    assert monitor.save_approved_post(UNRELATED, "dog")
+
+    is_duplicate, duplicates = monitor.check_duplicate_comprehensive(
+        NEAR_DUPLICATE.replace("毎日", "こまめに"), "cat"
+    )
+    assert is_duplicate
+    assert duplicates[0]['content'] == NEAR_DUPLICATE
+
+    indexed = sqlite3.connect(str(tmp_path / "posts.db")).execute(
+        "SELECT COUNT(DISTINCT post_id) FROM post_lsh_buckets"
+    ).fetchone()[0]
+    assert indexed == 2
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+コンテンツプールの利用可能インデックスのテスト
+"""
+
+import random
+
+from advanced_duplicate_monitor import AdvancedDuplicateMonitor
+from pool_availability import QA_FIELDS, PoolAvailabilityIndex
+from post_generation_engine import PostGenerationEngine
+
+
+HEALTH_POOL = [
+    "【猫の歯の健康】意外と見落としがち🦷\n\n猫も歯周病になります！\n\n⚠️口臭\n⚠️よだれ\n\n予防は歯磨きが一番。\n#猫のあれこれ",
+    "【猫の水分補給】冬は特に注意💧\n\n猫はあまり水を飲みません。\n\n器を増やすのがおすすめです。\n#猫のあれこれ",
+    "【猫の爪とぎ】ストレス発散にも🐾\n\n爪とぎは本能的な行動です。\n\n場所を決めて用意しましょう。\n#猫のあれこれ",
+]
+QA_POOL = [
+    {'question': "猫が毛玉を吐くのは大丈夫？", 'answer': "週1回程度なら心配いりません。ブラッシングで減らせます。"},
+    {'question': "猫に牛乳をあげてもいい？", 'answer': "お腹を壊す子が多いので、猫用ミルクがおすすめです。"},
+]
+
+
+def make_index(tmp_path, seed=0):
+    monitor = AdvancedDuplicateMonitor(str(tmp_path / "posts.db"), load_archive=False)
+    pools = {'cat_health': HEALTH_POOL, 'cat_questions': QA_POOL}
+    return monitor, PoolAvailabilityIndex(monitor, pools, random.Random(seed))
+
+
+def test_posted_entries_are_not_eligible(tmp_path):
+    monitor, index = make_index(tmp_path)
+    monitor.save_approved_post(HEALTH_POOL[0], "cat", "猫の健康")
+    monitor.save_approved_post(QA_POOL[1]['answer'], "cat", "猫の健康")
+
+    assert index.eligible('cat_health', "cat", "猫の健康", 6) == [1, 2]
+    # 質問・回答のどちらかが重複する項目は使えない
+    assert index.eligible('cat_questions', "cat", "猫の健康", 6, QA_FIELDS) == [0]
+    assert index.choose('cat_questions', "cat", "猫の健康", 6, QA_FIELDS, exclude=[0]) is None
+    # 検出を記録しない
+    assert monitor.get_statistics()['duplicate_detections'] == 0
+
+
+def test_saved_posts_block_entries_without_recheck(tmp_path):
+    monitor, index = make_index(tmp_path)
+    assert index.eligible('cat_health', "cat", "猫の健康", 6) == [0, 1, 2]
+
+    near_copy = HEALTH_POOL[1].replace("おすすめ", "効果的")
+    monitor.save_approved_post(near_copy, "cat", "猫の健康")
+    index.note_saved(near_copy, "cat", "猫の健康")
+    assert index.eligible('cat_health', "cat", "猫の健康", 6) == [0, 2]
+
+    # 別の動物種の投稿は類似していても重複にならない
+    index.note_saved(HEALTH_POOL[2].replace("用意", "準備"), "dog", "犬の健康")
+    assert index.eligible('cat_health', "cat", "猫の健康", 6) == [0, 2]
+
+
+def test_choose_prefers_least_recently_used(tmp_path):
+    _, index = make_index(tmp_path)
+    index.mark_used('cat_health', 0)
+    index.mark_used('cat_health', 1)
+
+    # 一度も使っていない項目が最も選ばれやすく、最近使った項目ほど選ばれにくい
+    counts = {0: 0, 1: 0, 2: 0}
+    for _ in range(600):
+        counts[index.choose('cat_health', "cat", "猫の健康", 6)] += 1
+    assert counts[2] > counts[0] > counts[1]
+
+
+def test_engine_picks_eligible_content_first(tmp_path):
+    monitor = AdvancedDuplicateMonitor(str(tmp_path / "posts.db"), load_archive=False)
+    engine = PostGenerationEngine(monitor, log=lambda message: None, rng=random.Random(0))
+    pool = engine.content_pools['cat_health']
+    for content in pool[:-1]:
+        monitor.save_approved_post(content, "cat", "猫の健康")
+
+    checks = []
+    check = monitor.check_duplicate_comprehensive
+    monitor.check_duplicate_comprehensive = lambda *args, **kwargs: checks.append(args) or check(*args, **kwargs)
+
+    # 残り1件を最初の試行で選ぶ
+    assert engine.generate_content_with_monitoring('cat_health', "cat", "猫の健康") == pool[-1]
+    assert len(checks) == 1
+    # 使える項目がなくなったら重複チェックを繰り返さずに諦める
+    assert engine.generate_content_with_monitoring('cat_health', "cat", "猫の健康") is None
+    assert len(checks) == 1
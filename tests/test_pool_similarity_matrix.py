@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+コンテンツプールと投稿履歴の類似度行列のテスト
+"""
+
+import sqlite3
+
+from advanced_duplicate_monitor import AdvancedDuplicateMonitor
+from history_cache import window_cutoff
+from similarity_backends import get_backend
+
+
+CAT_POST = "【猫の歯の健康】意外と見落としがち🦷\n\n猫も歯周病になります！\n\n⚠️口臭\n⚠️よだれ\n\n予防は歯磨きが一番。\n#猫のあれこれ"
+DOG_POST = "【犬の散歩】季節ごとの注意点🐕\n\n夏はアスファルトの温度に注意。\n\n早朝か夕方がおすすめです。\n#獣医が教える犬のはなし"
+POOL = [
+    CAT_POST.replace("一番", "基本"),
+    DOG_POST.replace("早朝", "朝"),
+    "【猫の爪とぎ】ストレス発散にも🐾\n\n爪とぎは本能的な行動です。\n\n場所を決めて用意しましょう。\n#猫のあれこれ",
+    CAT_POST,
+]
+
+
+def update(monitor, texts):
+    with monitor.store.transaction() as cursor:
+        return monitor.pool_similarity.update(cursor, texts)
+
+
+def test_lookup_matches_duplicate_check(tmp_path):
+    monitor = AdvancedDuplicateMonitor(str(tmp_path / "posts.db"), load_archive=False)
+    monitor.save_approved_post(CAT_POST, "cat", "猫の健康")
+    monitor.save_approved_post(DOG_POST, "dog", "犬の健康")
+
+    for animal_type, topic in ((None, None), ("cat", "猫の健康"), ("dog", None)):
+        results = monitor.check_duplicates_batch(
+            [{'content': text, 'animal_type': animal_type, 'topic': topic} for text in POOL],
+            record_detections=False
+        )
+        expected = {position for position, (is_duplicate, _) in enumerate(results) if is_duplicate}
+        blocked = monitor.pool_similarity.blocked(POOL, animal_type, topic, window_cutoff(6),
+                                                  monitor.similarity_threshold)
+        assert blocked == expected
+
+    # 完全一致は期間外・別の動物種でも使えない
+    assert monitor.pool_similarity.blocked(POOL, "dog", None, '9999-12-31 00:00:00', 0.65) == {3}
+
+
+def test_only_new_posts_and_changed_texts_are_computed(tmp_path):
+    db_path = str(tmp_path / "posts.db")
+    monitor = AdvancedDuplicateMonitor(db_path, load_archive=False)
+    monitor.save_approved_post(CAT_POST, "cat")
+    first = update(monitor, POOL)
+    assert first > 0
+    assert update(monitor, POOL) == 0
+
+    # 類似度行列は次のセッションでも使われる
+    monitor.close()
+    monitor = AdvancedDuplicateMonitor(db_path, load_archive=False)
+    assert update(monitor, POOL) == 0
+
+    # 追加された投稿と、本文が変わったプール項目の分だけ計算する
+    monitor.save_approved_post(DOG_POST, "dog")
+    assert 0 < update(monitor, POOL) < first + len(POOL)
+    assert update(monitor, POOL[:3] + [POOL[3] + "追記"]) > 0
+
+    # 類似度の計算方法が変わったら計算し直す
+    monitor.similarity_backend = get_backend('shingle')
+    assert update(monitor, POOL) >= first
+
+
+def test_deleted_posts_are_removed(tmp_path):
+    db_path = str(tmp_path / "posts.db")
+    monitor = AdvancedDuplicateMonitor(db_path, load_archive=False)
+    monitor.save_approved_post(CAT_POST, "cat")
+    update(monitor, POOL)
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE post_history SET created_at = datetime('now', '-400 days')")
+    conn.commit()
+    assert monitor.clean_old_posts(180) == 1
+    assert conn.execute('SELECT COUNT(*) FROM pool_similarity').fetchone()[0] == 0
+    assert monitor.pool_similarity.blocked(POOL, None, None, window_cutoff(6), 0.65) == set()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ヘッドレス投稿生成エンジンのテスト
+"""
+
+import os
+import subprocess
+import sys
+from datetime import datetime
+
+from advanced_duplicate_monitor import AdvancedDuplicateMonitor
+from content_library import WEEK_THEMES
+import post_generation_engine
+from post_generation_engine import MAX_POST_LENGTH, PostGenerationEngine
+
+
+def test_simple_posts_fit_length_for_every_theme():
+    engine = PostGenerationEngine(log=lambda message: None)
+    start_date = datetime(2025, 8, 4, 7)
+
+    for theme_type in WEEK_THEMES:
+        posts = engine.generate_simple_posts(start_date, theme_type)
+        assert len(posts) == 14
+        assert all(post['char_count'] <= MAX_POST_LENGTH for post in posts)
+        assert posts[0]['time'] == "2025-08-04 07:00"
+        assert posts[7]['time'] == "2025-08-04 18:00"
+
+
+def test_ai_mode_registers_approved_posts(tmp_path):
+    monitor = AdvancedDuplicateMonitor(str(tmp_path / "posts.db"))
+    engine = PostGenerationEngine(monitor, log=lambda message: None)
+
+    first = engine.generate_week('ai', datetime(2025, 8, 4, 7), "専門テーマ")
+    assert first['successful'] + first['failed'] == 14
+    assert monitor.get_statistics()['total_posts'] == first['successful']
+
+    # 同じ週をもう一度生成すると、登録済みの投稿との重複として検出される
+    second = engine.generate_week('ai', datetime(2025, 8, 4, 7), "専門テーマ")
+    assert second['successful'] < first['successful']
+
+
+def test_engine_does_not_import_tkinter():
+    code = "import sys, post_generation_engine; print('tkinter' in sys.modules)"
+    src_dir = os.path.dirname(post_generation_engine.__file__)
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                            env={**os.environ, 'PYTHONPATH': src_dir}).stdout
+    assert output.strip() == "False"
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+投稿履歴データベース接続管理のテスト
+"""
+
+import sqlite3
+import threading
+
+import pytest
+
+from post_history_store import PostHistoryStore
+
+
+def test_connection_is_reused_per_thread_and_uses_wal(tmp_path):
+    store = PostHistoryStore(str(tmp_path / "posts.db"))
+    conn = store.connection()
+
+    assert store.connection() is conn
+    assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+
+    # 別スレッドは専用の接続を持つ
+    worker_conns = []
+    worker = threading.Thread(target=lambda: (worker_conns.append(store.connection()), store.close()))
+    worker.start()
+    worker.join()
+
+    assert worker_conns[0] is not conn
+    assert store.open_connections() == 1
+
+
+def test_transaction_rolls_back_on_error(tmp_path):
+    store = PostHistoryStore(str(tmp_path / "posts.db"))
+    with store.transaction() as cursor:
+        cursor.execute('CREATE TABLE items (name TEXT)')
+
+    with pytest.raises(RuntimeError):
+        with store.transaction() as cursor:
+            cursor.execute("INSERT INTO items VALUES ('lost')")
+            raise RuntimeError("abort")
+
+    assert store.cursor().execute('SELECT COUNT(*) FROM items').fetchone()[0] == 0
+
+
+def test_read_only_store_reads_but_rejects_writes(tmp_path):
+    store = PostHistoryStore(str(tmp_path / "posts.db"))
+    with store.transaction() as cursor:
+        cursor.execute("CREATE TABLE items (name TEXT)")
+        cursor.execute("INSERT INTO items VALUES ('kept')")
+
+    reader = PostHistoryStore(str(tmp_path / "posts.db"), read_only=True)
+    assert reader.cursor().execute('SELECT name FROM items').fetchall() == [('kept',)]
+    with pytest.raises(sqlite3.OperationalError):
+        with reader.transaction() as cursor:
+            cursor.execute("INSERT INTO items VALUES ('lost')")
+    reader.close()
+    store.close()
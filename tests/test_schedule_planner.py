@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+複数週スケジュールプランナーのテスト
+"""
+
+from datetime import datetime
+
+from advanced_duplicate_monitor import AdvancedDuplicateMonitor
+from schedule_planner import SchedulePlanner, _worker_monitor, _worker_monitors, themes_from
+
+
+START_DATE = datetime(2025, 8, 4, 7, 0)
+
+
+def test_themes_rotate_from_selected_theme():
+    assert themes_from("専門テーマ") == ["専門テーマ", "健康管理", "参加型", "猫種特集"]
+
+
+def test_parallel_plan_is_deterministic_and_has_no_cross_week_duplicates(tmp_path):
+    monitor = AdvancedDuplicateMonitor(str(tmp_path / "posts.db"), load_archive=False)
+    monitor.similarity_threshold = 0.5
+
+    # テーマが1周して同じ定型投稿が出る週も、コンテンツプールの投稿で全枠を埋める
+    serial = SchedulePlanner(monitor, workers=1, log=lambda message: None).plan(START_DATE, 5, register=False)
+    parallel = SchedulePlanner(monitor, workers=2, log=lambda message: None).plan(START_DATE, 5, register=False)
+
+    assert parallel['posts'] == serial['posts']
+    assert serial['successful'] == 5 * 14
+    assert serial['failed'] == 0 and serial['unfilled'] == []
+
+    contents = [content for _, content, _ in serial['posts']]
+    assert len(set(contents)) == len(contents)
+    times = [time for time, _, _ in serial['posts']]
+    assert times == sorted(times)
+
+    result = SchedulePlanner(monitor, workers=2, log=lambda message: None).plan(START_DATE, 5)
+    assert monitor.get_statistics()['total_posts'] == result['successful']
+
+
+def test_dry_run_does_not_record_detections(tmp_path):
+    monitor = AdvancedDuplicateMonitor(str(tmp_path / "posts.db"), load_archive=False)
+    monitor.similarity_threshold = 0.5
+    SchedulePlanner(monitor, workers=1, log=lambda message: None).plan(START_DATE, 1)
+    detections = monitor.get_statistics()['duplicate_detections']
+
+    # 履歴と重複する週を言い換え・プールの投稿で埋めても、登録しない計画では検出記録を残さない
+    result = SchedulePlanner(monitor, workers=1, log=lambda message: None).plan(START_DATE, 1, register=False)
+    assert result['successful'] == 14
+    cursor = monitor.store.cursor()
+    cursor.execute('SELECT content FROM post_history')
+    registered = {row[0] for row in cursor.fetchall()}
+    assert not registered & {content for _, content, _ in result['posts']}
+    monitor.flush_detections()
+    assert monitor.get_statistics()['duplicate_detections'] == detections
+    monitor.close()
+
+
+def test_unfilled_slots_are_reported_by_time(tmp_path):
+    monitor = AdvancedDuplicateMonitor(str(tmp_path / "posts.db"), load_archive=False)
+    monitor.similarity_threshold = 0.5
+    messages = []
+
+    # コンテンツライブラリの投稿数を超える期間では、埋まらなかった枠を日時で返す
+    result = SchedulePlanner(monitor, workers=1, log=messages.append).plan(START_DATE, 13, register=False)
+    assert result['unfilled'] and result['failed'] == len(result['unfilled'])
+    assert result['successful'] + result['failed'] == 13 * 14
+    planned = {time for time, _, _ in result['posts']}
+    assert not planned & set(result['unfilled'])
+    assert any(result['unfilled'][0] in message for message in messages if message.startswith("❌"))
+    monitor.close()
+
+
+def test_worker_monitor_is_read_only(tmp_path):
+    db_path = str(tmp_path / "posts.db")
+    AdvancedDuplicateMonitor(db_path, load_archive=False).close()
+
+    worker = _worker_monitor(db_path, 0.5)
+    assert worker.store.read_only
+    assert worker.check_duplicates_batch([{'content': "新しい投稿"}], 6, record_detections=False) == [(False, [])]
+    _worker_monitors.clear()
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+スプレッドシートアップロードパイプラインのテスト（ローカルの偽スプレッドシートを使用）
+"""
+
+import pytest
+
+from post_generation_engine import write_csv
+from sheets_upload_pipeline import (
+    SheetsUploadPipeline, TokenBucket, UploadJournal, as_post_records, diff_schedule,
+    post_records, request_size, schedule_rows, upload_key
+)
+
+
+class FakeAPIError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.response = type('Response', (), {'status_code': status_code})()
+
+
+class FakeWorksheet:
+    def __init__(self, sheet_id, title, rows):
+        self.id = sheet_id
+        self.title = title
+        self.row_count = rows
+        self.cells = {}  # (行, 列) → 値
+
+    def clear(self):
+        self.cells.clear()
+
+    def get_all_values(self):
+        """表示値を文字列で返す（末尾の空行は含まない）"""
+        if not self.cells:
+            return []
+        height = max(row for row, _ in self.cells) + 1
+        width = max(column for _, column in self.cells) + 1
+        return [[str(self.cells.get((row, column), "")) for column in range(width)] for row in range(height)]
+
+
+class FakeSpreadsheet:
+    """gspread.Spreadsheet と同じメソッドを持ち、指定した呼び出しでエラーを返す"""
+
+    def __init__(self):
+        self.sheets = []
+        self.failures = {}  # メソッド名 → 順番に送出するエラー（None は成功）
+        self.calls = []
+        self.requests = []
+        self.batches = []  # batch_update ごとのリクエスト
+
+    def _call(self, name):
+        self.calls.append(name)
+        failures = self.failures.get(name)
+        if failures:
+            error = failures.pop(0)
+            if error is not None:
+                raise error
+
+    def worksheets(self):
+        self._call('worksheets')
+        return list(self.sheets)
+
+    def add_worksheet(self, title, rows, cols):
+        self._call('add_worksheet')
+        worksheet = FakeWorksheet(len(self.sheets) + 100, title, rows)
+        self.sheets.append(worksheet)
+        return worksheet
+
+    def del_worksheet(self, worksheet):
+        self._call('del_worksheet')
+        self.sheets.remove(worksheet)
+
+    def batch_update(self, body):
+        self._call('batch_update')
+        self.batches.append(body['requests'])
+        for request in body['requests']:
+            self.requests.append(request)
+            (kind, params), = request.items()
+            target = params.get('start') or params.get('range') or params
+            worksheet = next(sheet for sheet in self.sheets if sheet.id == target['sheetId'])
+            if kind == 'updateCells':
+                start = params['start']
+                for row_offset, row in enumerate(params['rows']):
+                    for column_offset, cell in enumerate(row['values']):
+                        value, = cell['userEnteredValue'].values()
+                        worksheet.cells[(start['rowIndex'] + row_offset, start['columnIndex'] + column_offset)] = value
+            elif kind == 'appendDimension':
+                worksheet.row_count += params['length']
+            elif kind == 'sortRange':
+                grid = worksheet.get_all_values()
+                body_rows = sorted(grid[1:params['range']['endRowIndex']], key=lambda row: row[0])
+                for row_index, row in enumerate(body_rows, 1):
+                    for column, value in enumerate(row):
+                        worksheet.cells[(row_index, column)] = value
+
+
+def make_rows(count):
+    return schedule_rows([
+        {'投稿日時': f"2025-08-{day:02d} 07:00", '投稿内容': f"{day}日目の投稿\n#猫のあれこれ", '文字数': 14}
+        for day in range(1, count + 1)
+    ])
+
+
+def make_pipeline(spreadsheet, journal_path, sleeps):
+    return SheetsUploadPipeline(
+        spreadsheet, UploadJournal(str(journal_path)),
+        bucket=TokenBucket(rate=1000, capacity=1000, sleep=sleeps.append),
+        sleep=sleeps.append, log=lambda message: None
+    )
+
+
+def test_schedule_upload_merges_header_format_and_validation_and_chunks_rows(tmp_path):
+    rows = make_rows(25)
+    assert rows[0][3:] == ['未投稿', "", '#猫のあれこれ']
+
+    spreadsheet = FakeSpreadsheet()
+    pipeline = make_pipeline(spreadsheet, tmp_path / "journal.json", [])
+    pipeline.upload_schedule("week", "1週目", rows[:14])
+    assert [[list(request)[0] for request in batch] for batch in spreadsheet.batches] == [
+        ['updateCells', 'repeatCell', 'setDataValidation', 'updateCells']
+    ]
+
+    # 行数・文字数の上限ごとに分割（ヘッダーなどは1回目のみ）
+    spreadsheet.batches.clear()
+    pipeline.max_rows = 10
+    pipeline.upload_schedule("rows", "行数で分割", rows)
+    assert [batch[-1]['updateCells']['start']['rowIndex'] for batch in spreadsheet.batches] == [1, 11, 21]
+    assert [len(batch) for batch in spreadsheet.batches] == [4, 1, 1]
+
+    spreadsheet.batches.clear()
+    pipeline.max_rows = 500
+    long_rows = rows[9:]  # 同じ長さの16行
+    pipeline.max_chars = sum(len(str(value)) for value in long_rows[0]) * 5
+    pipeline.upload_schedule("chars", "文字数で分割", long_rows)
+    assert [batch[-1]['updateCells']['start']['rowIndex'] for batch in spreadsheet.batches] == [1, 6, 11, 16]
+
+
+def test_rate_limited_calls_are_retried_with_jittered_backoff(tmp_path):
+    spreadsheet = FakeSpreadsheet()
+    spreadsheet.failures['batch_update'] = [FakeAPIError(429), FakeAPIError(503)]
+    sleeps = []
+    pipeline = make_pipeline(spreadsheet, tmp_path / "journal.json", sleeps)
+
+    result = pipeline.upload_schedule("key", "スケジュール", make_rows(14))
+
+    assert result == {'sheet_name': "スケジュール", 'rows': 14, 'resumed': False}
+    assert spreadsheet.calls.count('batch_update') == 3
+    assert len(sleeps) == 2 and 0 <= sleeps[0] <= 1.0 and 0 <= sleeps[1] <= 2.0
+    assert len(spreadsheet.sheets[0].get_all_values()) == 15
+
+    # 再試行できないエラーはそのまま送出
+    spreadsheet.failures['worksheets'] = [FakeAPIError(403)]
+    with pytest.raises(FakeAPIError):
+        pipeline.upload_schedule("other", "スケジュール", make_rows(1))
+
+
+def test_interrupted_upload_resumes_from_journal(tmp_path):
+    spreadsheet = FakeSpreadsheet()
+    spreadsheet.failures['batch_update'] = [None, FakeAPIError(403)]
+    rows = make_rows(25)
+    sleeps = []
+
+    pipeline = make_pipeline(spreadsheet, tmp_path / "journal.json", sleeps)
+    pipeline.max_rows = 10
+    with pytest.raises(FakeAPIError):
+        pipeline.upload_schedule("key", "スケジュール", rows)
+    assert UploadJournal(str(tmp_path / "journal.json")).entry("key")['ranges'] == [[0, 10]]
+
+    # 別のプロセスから再実行: シートを作り直さず、残りの行だけ書き込む
+    spreadsheet.calls.clear()
+    pipeline = make_pipeline(spreadsheet, tmp_path / "journal.json", sleeps)
+    pipeline.max_rows = 10
+    result = pipeline.upload_schedule("key", "別の名前", rows)
+
+    assert result['resumed'] and result['sheet_name'] == "スケジュール"
+    assert 'del_worksheet' not in spreadsheet.calls and 'add_worksheet' not in spreadsheet.calls
+    assert spreadsheet.calls.count('batch_update') == 2
+    worksheet = spreadsheet.sheets[0]
+    assert [row[0] for row in worksheet.get_all_values()[1:]] == [row[0] for row in rows]
+    assert UploadJournal(str(tmp_path / "journal.json")).entry("key") is None
+
+
+def test_sync_writes_only_changed_cells_and_keeps_manual_columns(tmp_path):
+    spreadsheet = FakeSpreadsheet()
+    rows = make_rows(14)
+    sleeps = []
+    pipeline = make_pipeline(spreadsheet, tmp_path / "journal.json", sleeps)
+    assert pipeline.sync_schedule("v1", "スケジュール", rows)['created']
+
+    # スタッフが投稿済み・備考を入力
+    worksheet = spreadsheet.sheets[0]
+    worksheet.cells[(1, 3)] = '投稿済み'
+    worksheet.cells[(1, 4)] = "反応が良かった"
+
+    # 変更なしの再実行は読み込み1回のみ
+    spreadsheet.calls.clear()
+    result = pipeline.sync_schedule("v2", "スケジュール", rows)
+    assert result['updated_cells'] == 0 and result['unchanged_rows'] == 14
+    assert spreadsheet.calls == ['worksheets']
+
+    # 1投稿の本文を修正し、前の日付の投稿を1件追加
+    edited = [list(row) for row in rows]
+    edited[0][1] = "1日目の投稿（修正）\n#猫のあれこれ"
+    edited.append(make_rows(1)[0][:])
+    edited[-1][0] = "2025-07-31 07:00"
+    spreadsheet.requests.clear()
+    result = pipeline.sync_schedule("v3", "スケジュール", edited)
+
+    assert (result['updated_cells'], result['appended_rows'], result['unchanged_rows']) == (1, 1, 13)
+    assert spreadsheet.calls.count('batch_update') == 1
+    assert 'del_worksheet' not in spreadsheet.calls
+    grid = worksheet.get_all_values()
+    assert [row[0] for row in grid[1:]] == sorted(row[0] for row in edited)
+    assert grid[2][1:5] == [edited[0][1], '14', '投稿済み', "反応が良かった"]
+    assert grid[1][3] == '未投稿'
+
+
+def test_sync_with_stale_journal_entry_keeps_existing_sheet(tmp_path):
+    spreadsheet = FakeSpreadsheet()
+    rows = make_rows(3)
+    pipeline = make_pipeline(spreadsheet, tmp_path / "journal.json", [])
+    pipeline.sync_schedule("v1", "スケジュール", rows)
+    worksheet = spreadsheet.sheets[0]
+    worksheet.cells[(1, 4)] = "反応が良かった"
+
+    # 前回の作成が中断し、そのシート（ID 999）はもうない
+    pipeline.journal.start("v2", "スケジュール", 999, len(rows))
+    spreadsheet.calls.clear()
+    edited = [list(row) for row in rows]
+    edited[1][1] = "2日目の投稿（修正）\n#猫のあれこれ"
+    result = pipeline.sync_schedule("v2", "スケジュール", edited)
+
+    assert not result['created'] and result['updated_cells'] == 1
+    assert 'del_worksheet' not in spreadsheet.calls and 'add_worksheet' not in spreadsheet.calls
+    assert spreadsheet.sheets == [worksheet]
+    assert worksheet.get_all_values()[1][4] == "反応が良かった"
+    assert pipeline.journal.entry("v2") is None
+
+
+def test_sync_splits_requests_by_row_and_char_budget(tmp_path):
+    spreadsheet = FakeSpreadsheet()
+    rows = make_rows(20)
+    pipeline = make_pipeline(spreadsheet, tmp_path / "journal.json", [])
+    pipeline.sync_schedule("v1", "スケジュール", rows[:10])
+
+    # 長い本文に変えた10行と、追加の10行
+    edited = [list(row) for row in rows]
+    for row in edited[:10]:
+        row[1] = "長い本文" * 50 + "\n#猫のあれこれ"
+    pipeline.max_chars = 1000
+    spreadsheet.batches.clear()
+    result = pipeline.sync_schedule("v2", "スケジュール", edited)
+
+    assert (result['updated_cells'], result['appended_rows']) == (10, 10)
+    assert len(spreadsheet.batches) > 1
+    for batch in spreadsheet.batches:
+        sizes = [request_size(request) for request in batch]
+        assert sum(chars for _, chars in sizes) <= 1000 or len(batch) == 1
+    grid = spreadsheet.sheets[0].get_all_values()
+    assert [row[1] for row in grid[1:]] == [row[1] for row in edited]
+
+
+def test_diff_schedule_compares_display_values():
+    rows = make_rows(2)
+    existing = [["投稿日時", "投稿内容", "文字数", "投稿済み", "備考", "ハッシュタグ"]]
+    existing += [[str(value) for value in row] for row in rows]
+    existing[1][3] = '下書き'
+
+    assert diff_schedule(existing, rows) == {'cells': [], 'append': [], 'unchanged': 2}
+    assert diff_schedule([], rows)['cells'][0] == (0, 0, "投稿日時")
+
+
+def test_csv_and_in_memory_posts_give_the_same_records(tmp_path):
+    rows = [["2025-08-04 07:00", "猫の投稿\n#猫のあれこれ", "13"], ["2025-08-04 18:00", "犬の投稿, 2行目", "9"]]
+    path = write_csv(str(tmp_path / "posts.csv"), rows, encoding='utf-8-sig')
+
+    records = as_post_records(path)
+    assert records == post_records(rows)
+    assert records[0] == {'投稿日時': "2025-08-04 07:00", '投稿内容': "猫の投稿\n#猫のあれこれ", '文字数': 13}
+    assert as_post_records(records) == records
+    assert upload_key("url", records, 'formatted') == upload_key("url", post_records(rows), 'formatted')
+
+
+def test_token_bucket_waits_for_refill():
+    now = [0.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    bucket = TokenBucket(rate=2, capacity=2, clock=lambda: now[0], sleep=sleep)
+    for _ in range(4):
+        bucket.acquire()
+    assert sleeps == [0.5, 0.5]
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+類似度バックエンドのテスト
+"""
+
+import difflib
+
+import pytest
+
+from advanced_duplicate_monitor import AdvancedDuplicateMonitor
+from similarity_backends import SHINGLE_METRICS, NumpyShingleBackend, ShingleMatrix, get_backend
+
+
+TEXTS = [
+    "猫も歯周病になります口臭よだれ予防は歯磨きが一番",
+    "猫も歯周病になります口臭よだれ予防は歯磨きが基本",
+    "夏はアスファルトの温度に注意早朝か夕方がおすすめです",
+    "猫",
+    ""
+]
+
+
+def test_exact_backend_matches_sequence_matcher():
+    backend = get_backend('exact')
+    prepared = backend.prepare(TEXTS)
+    for text in TEXTS:
+        expected = [difflib.SequenceMatcher(None, text, other).ratio() for other in TEXTS]
+        assert backend.similarities(text, prepared) == expected
+        assert backend.similarities(text, prepared, [2, 0]) == [expected[2], expected[0]]
+
+
+@pytest.mark.parametrize("metric", list(SHINGLE_METRICS))
+def test_shingle_backend_scores(metric):
+    backend = get_backend('shingle', metric)
+    assert backend.similarity(TEXTS[0], TEXTS[0]) == pytest.approx(1.0)
+    assert backend.similarity(TEXTS[0], TEXTS[1]) > backend.similarity(TEXTS[0], TEXTS[2])
+    assert backend.similarity(TEXTS[0], "") == 0.0
+    assert backend.similarities(TEXTS[0], backend.prepare(TEXTS)) == [backend.similarity(TEXTS[0], other) for other in TEXTS]
+
+
+@pytest.mark.parametrize("metric", list(SHINGLE_METRICS))
+def test_numpy_backend_matches_pure_python(metric):
+    pytest.importorskip("numpy")
+    backend = get_backend('numpy', metric)
+    prepared = backend.prepare(TEXTS)
+    assert isinstance(prepared, ShingleMatrix)
+
+    reference = get_backend('shingle', metric)
+    for text in TEXTS + ["歯磨き"]:
+        expected = reference.similarities(text, reference.prepare(TEXTS))
+        assert backend.similarities(text, prepared) == pytest.approx(expected)
+        assert backend.similarities(text, prepared, [3, 1]) == pytest.approx([expected[3], expected[1]])
+
+
+def test_numpy_backend_falls_back_without_numpy(monkeypatch):
+    import similarity_backends
+    monkeypatch.setattr(similarity_backends, "np", None)
+    backend = NumpyShingleBackend()
+    prepared = backend.prepare(TEXTS)
+    assert not isinstance(prepared, ShingleMatrix)
+    assert backend.similarities(TEXTS[0], prepared) == get_backend('shingle').similarities(TEXTS[0], prepared)
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        get_backend('fuzzy')
+
+
+def test_batch_similarities_match_pairwise(tmp_path):
+    monitor = AdvancedDuplicateMonitor(str(tmp_path / "posts.db"), load_archive=False, similarity_backend='shingle')
+    posts = [
+        "【猫の歯の健康】猫も歯周病になります！予防は歯磨きが一番。#猫のあれこれ",
+        "【猫の歯の健康】猫も歯周病になります！予防は歯磨きが基本。#猫のあれこれ",
+        "【犬の散歩】夏はアスファルトの温度に注意。#獣医が教える犬のはなし"
+    ]
+    features = [monitor.extract_features(post) for post in posts]
+    assert monitor.calculate_feature_similarities(features[0], features) == [
+        monitor.calculate_feature_similarity(features[0], other) for other in features
+    ]
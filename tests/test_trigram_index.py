@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+3-gram全文検索インデックス（FTS5）のテスト
+"""
+
+import sqlite3
+
+import pytest
+
+from advanced_duplicate_monitor import AdvancedDuplicateMonitor
+from history_partitions import HistoryPartitions
+
+
+CAT_POST = "【猫の歯の健康】意外と見落としがち🦷\n\n猫も歯周病になります！\n\n⚠️口臭\n⚠️よだれ\n\n予防は歯磨きが一番。\n#猫のあれこれ"
+DOG_POST = "【犬の散歩】季節ごとの注意点🐕\n\n夏はアスファルトの温度に注意。\n\n早朝か夕方がおすすめです。\n#獣医が教える犬のはなし"
+
+
+@pytest.fixture
+def monitor(tmp_path):
+    monitor = AdvancedDuplicateMonitor(str(tmp_path / "posts.db"), load_archive=False)
+    if not monitor.trigram_index.available:
+        pytest.skip("FTS5 の trigram トークナイザがないSQLite")
+    yield monitor
+    monitor.close()
+
+
+def overlapping(monitor, content, **kwargs):
+    features = monitor.extract_features(content)
+    with monitor.store.transaction() as cursor:
+        return monitor.trigram_index.overlapping(cursor, features['normalized'], features['main_points'], **kwargs)
+
+
+def test_overlap_follows_inserts_updates_and_deletes(monitor):
+    monitor.save_approved_post(CAT_POST, "cat")
+    monitor.save_approved_post(DOG_POST, "dog")
+
+    near_copy = CAT_POST.replace("一番", "基本")
+    assert list(overlapping(monitor, near_copy)) == [1]
+    assert overlapping(monitor, near_copy, after_id=1) == {}
+    assert overlapping(monitor, "全く関係のない文章です") == {}
+
+    # 特徴量列の更新・投稿の削除はトリガーでインデックスに反映される
+    with monitor.store.transaction() as cursor:
+        cursor.execute("UPDATE post_history SET normalized_content = 'x', main_points = '[]' WHERE id = 1")
+    assert overlapping(monitor, near_copy) == {}
+
+    with monitor.store.transaction() as cursor:
+        cursor.execute('DELETE FROM post_history WHERE id = 2')
+    assert overlapping(monitor, DOG_POST) == {}
+    with monitor.store.transaction() as cursor:
+        cursor.execute("INSERT INTO post_trigrams (post_trigrams) VALUES ('integrity-check')")
+
+
+def test_index_covers_only_recent_posts(monitor):
+    monitor.save_approved_post(CAT_POST, "cat")
+    near_copy = CAT_POST.replace("一番", "基本")
+    with monitor.store.transaction() as cursor:
+        cursor.execute("UPDATE post_history SET created_at = '2020-01-01 00:00:00' WHERE id = 1")
+    assert monitor.rotate_history() == 1
+    assert overlapping(monitor, near_copy) == {}
+
+    # 直近の範囲に戻した投稿は再び登録される
+    with monitor.store.transaction() as cursor:
+        assert HistoryPartitions(hot_window_days=100000).rotate(cursor) == 1
+    assert list(overlapping(monitor, near_copy)) == [1]
+
+
+def test_common_trigrams_are_not_counted(monitor):
+    for index in range(30):
+        monitor.save_approved_post(f"【猫の歯の健康】{index}回目の投稿です\n#猫のあれこれ", "cat")
+    with monitor.store.transaction() as cursor:
+        terms = monitor.trigram_index.distinctive(cursor, ["猫の歯", "回目の", "9回目", "存在しない"])
+    assert terms == ["9回目"]
+
+
+def test_existing_database_is_indexed_and_btree_index_dropped(tmp_path):
+    db_path = str(tmp_path / "posts.db")
+    monitor = AdvancedDuplicateMonitor(db_path, load_archive=False)
+    monitor.save_approved_post(CAT_POST, "cat")
+    monitor.close()
+
+    # FTS5テーブルがなく、正規化本文のB-treeインデックスがある旧スキーマを再現
+    conn = sqlite3.connect(db_path)
+    for name in ('post_trigrams_insert', 'post_trigrams_delete', 'post_trigrams_update'):
+        conn.execute(f'DROP TRIGGER {name}')
+    for name in ('post_trigram_terms', 'post_trigram_docs', 'post_trigrams'):
+        conn.execute(f'DROP TABLE {name}')
+    conn.execute('CREATE INDEX idx_normalized_content ON post_history(normalized_content)')
+    conn.commit()
+
+    monitor = AdvancedDuplicateMonitor(db_path, load_archive=False)
+    if not monitor.trigram_index.available:
+        pytest.skip("FTS5 の trigram トークナイザがないSQLite")
+    assert list(overlapping(monitor, CAT_POST.replace("一番", "基本"))) == [1]
+    assert conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE name = 'idx_normalized_content'").fetchone()[0] == 0
+    assert monitor.vacuum() >= 0
+    monitor.close()
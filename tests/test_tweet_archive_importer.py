@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Xアーカイブ取り込みのテスト
+"""
+
+import json
+
+from advanced_duplicate_monitor import AdvancedDuplicateMonitor
+from history_partitions import ARCHIVE_TABLE, HOT_TABLE
+from tweet_archive_importer import archive_files, iter_archive_items, tweet_created_at
+
+
+def write_archive(path, part, tweets):
+    items = [{'tweet': {'id_str': tweet_id, 'full_text': text}} for tweet_id, text in tweets]
+    path.write_text(f"window.YTD.tweets.part{part} = {json.dumps(items, ensure_ascii=False, indent=2)}",
+                    encoding='utf-8')
+
+
+CAT_TWEETS = [
+    ('1', "【猫の腎臓病】早期発見のポイント\n\n✅多飲多尿\n✅体重減少\n#猫のあれこれ"),
+    ('2', "【猫の歯周病】口臭に注意\n\n⚠️よだれ\n⚠️食欲不振\n#猫のあれこれ"),
+    ('3', "今日は学会に参加しました"),
+]
+
+
+def test_streaming_parser_handles_items_across_chunk_boundaries(tmp_path):
+    path = tmp_path / "tweets.js"
+    write_archive(path, 0, CAT_TWEETS)
+
+    items = list(iter_archive_items(str(path), chunk_size=7))
+    assert [item['tweet']['id_str'] for item in items] == ['1', '2', '3']
+    assert items[1]['tweet']['full_text'] == CAT_TWEETS[1][1]
+
+
+def test_import_is_incremental_across_parts(tmp_path):
+    archive_dir = tmp_path / "archive"
+    archive_dir.mkdir()
+    write_archive(archive_dir / "tweets.js", 0, CAT_TWEETS)
+    monitor = AdvancedDuplicateMonitor(str(tmp_path / "posts.db"))
+    importer = monitor.archive_importer
+    importer.batch_size = 2
+
+    stats = importer.import_archive(str(archive_dir / "tweets.js"))
+    assert stats['inserted'] == 2
+
+    # 新しいパートが増えた場合は、取り込み済みのファイルを飛ばして新しい分だけ追加する
+    # （ID違いでも本文が同じ投稿はコンテンツハッシュで除外）
+    write_archive(archive_dir / "tweets-part1.js", 1, [
+        ('4', CAT_TWEETS[0][1]),
+        ('5', "【犬の関節炎】歩き方の変化\n\n🐾階段を嫌がる\n#獣医が教える犬のはなし"),
+    ])
+    assert archive_files(str(archive_dir / "tweets.js"))[-1].endswith("tweets-part1.js")
+
+    stats = importer.import_archive(str(archive_dir / "tweets.js"))
+    assert stats['skipped_files'] == 1
+    assert stats['inserted'] == 1
+    assert stats['duplicates'] == 1
+
+    assert monitor.get_statistics()['animal_counts'] == {'cat': 2, 'dog': 1}
+    is_duplicate, _ = monitor.check_duplicate_comprehensive(CAT_TWEETS[1][1])
+    assert is_duplicate
+
+
+def test_tweet_dates_are_kept_and_old_tweets_are_archived(tmp_path):
+    path = tmp_path / "tweets.js"
+    items = [
+        {'tweet': {'id_str': '1', 'full_text': CAT_TWEETS[0][1], 'created_at': "Wed Aug 06 09:00:00 +0000 2020"}},
+        {'tweet': {'id_str': '2', 'full_text': CAT_TWEETS[1][1]}},
+    ]
+    path.write_text(f"window.YTD.tweets.part0 = {json.dumps(items, ensure_ascii=False)}", encoding='utf-8')
+    assert tweet_created_at({'created_at': "Wed Aug 06 18:00:00 +0900 2025"}) == '2025-08-06 09:00:00'
+    assert tweet_created_at({}) is None
+
+    monitor = AdvancedDuplicateMonitor(str(tmp_path / "posts.db"), load_archive=False)
+    stats = monitor.archive_importer.import_archive(str(path))
+    assert stats['inserted'] == 2
+    assert stats['archived'] == 1
+
+    # 投稿日時のあるツイートはその日時で古い投稿のテーブルへ、ない場合は取り込んだ日時で直近のテーブルに入る
+    cursor = monitor.store.cursor()
+    cursor.execute(f'SELECT content, created_at FROM {ARCHIVE_TABLE}')
+    assert cursor.fetchall() == [(CAT_TWEETS[0][1], '2020-08-06 09:00:00')]
+    cursor.execute(f'SELECT content FROM {HOT_TABLE}')
+    assert cursor.fetchall() == [(CAT_TWEETS[1][1],)]
+    assert monitor.check_duplicate_comprehensive(CAT_TWEETS[0][1])[0]
+    monitor.close()
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+獣医学用語ボキャブラリのテスト
+"""
+
+from veterinary_vocabulary import VOCABULARY
+
+
+def test_scan_extracts_keywords_topic_and_animal_in_one_pass():
+    result = VOCABULARY.scan("【ケース⑤：排尿の変化】\n症例：7歳のダックスフント\n尿路結石を疑い血液検査とMRIを実施\n#獣医が教える犬のはなし")
+
+    assert result['topic'] == "ケース⑤：排尿の変化"
+    assert result['animal_type'] == "dog"
+    assert set(result['keywords']) == {"排尿", "ダックスフント", "尿路", "結石", "血液検査", "MRI"}
+
+
+def test_topic_priority_follows_disease_then_breed_lists():
+    assert VOCABULARY.scan("柴犬の関節炎と腎臓病について #猫のあれこれ") == {
+        'keywords': VOCABULARY.scan("柴犬の関節炎と腎臓病について")['keywords'],
+        'topic': "腎臓病",
+        'animal_type': "cat"
+    }
+    assert VOCABULARY.scan("チワワとトイプードル")['topic'] == "トイプードル"
+    assert VOCABULARY.scan("健康診断のすすめ")['keywords'].count("診断") == 1
+    assert VOCABULARY.scan("特になし")['topic'] == "一般"
+
+
+def test_overlapping_terms_from_different_groups_are_all_counted():
+    assert set(VOCABULARY.extract_keywords("感染症状")) == {"感染症", "症状"}
+    assert set(VOCABULARY.extract_keywords("排便秘")) == {"排便", "便秘"}
+    assert set(VOCABULARY.extract_keywords("尿路結石の健康診断")) == {"尿路", "結石", "健康診断", "診断"}
+    # 同じ分類の中で重なった語は左から1つだけ数える
+    assert VOCABULARY.extract_keywords("血液検査") == ["血液検査"]
+    assert VOCABULARY.scan("糖尿路結石")['topic'] == "尿路結石"